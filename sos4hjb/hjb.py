@@ -0,0 +1,100 @@
+'''
+Lower bounds on the value function of continuous-time optimal control
+problems via SOS programming. Given the dynamics dx/dt = f(x, u), the running
+cost l(x, u), the state set X = {x : g(x) >= 0 for all g in X}, and the input
+set U = {u : h(u) >= 0 for all h in U}, any polynomial J such that J(0) <= 0
+and the Bellman inequality
+
+    dJ/dx(x) f(x, u) + l(x, u) >= 0 for all x in X and u in U
+
+holds is a lower bound on the value function in X. The inequality is
+certified with the S-procedure, and the integral of J over a box is
+maximized.
+'''
+
+from functools import lru_cache
+
+from sos4hjb.polynomials import Polynomial, MonomialVector
+from sos4hjb.polynomials.operators import derivative_map, moment_vector
+
+def box_constraints(variables, lbs, ubs, vector_type=MonomialVector):
+    '''
+    Polynomials (v - lb) (ub - v), one per variable, that are all
+    nonnegative if and only if lbs <= variables <= ubs.
+    '''
+    if not len(variables) == len(lbs) == len(ubs):
+        raise ValueError(f'box limits and variables have different lenghts.')
+    make = vector_type.make_polynomial
+    return [(make(v) - make(lb)) * (make(ub) - make(v)) for v, lb, ub in zip(variables, lbs, ubs)]
+
+@lru_cache(maxsize=256)
+def hjb_bases(vector_type, x, u, degree, odd=True):
+    '''
+    Basis of the value function (in the states x) and basis of the
+    S-procedure multipliers (in the states x and the inputs u) for the given
+    degree. If odd is False, the value function has only even terms, which
+    is exact only for problems symmetric with respect to the origin. Bases
+    are cached and returned as tuples, so that programs constructed
+    repeatedly (e.g. in a sweep over the problem data) share the Gram maps
+    and the moment vectors cached in the polynomials module.
+    '''
+    value_basis = vector_type.construct_basis(list(x), degree, odd=odd)
+    multiplier_basis = vector_type.construct_basis(list(x + u), degree // 2)
+    return tuple(value_basis), tuple(multiplier_basis)
+
+def add_value_function_lower_bound(prog, x, u, f, l, X, U, degree, lbs, ubs,
+    odd=True, even_multipliers=False, **options):
+    '''
+    Adds to prog the decision polynomial J of the given degree, the cost
+    given by minus the integral of J over the box lbs <= x <= ubs, and the
+    constraints that make J a lower bound on the value function. The
+    dynamics f is a list with one polynomial per state in x, and X and U are
+    lists of polynomials (or single polynomials). The keyword options (e.g.
+    cone or newton_polytope) are passed to add_sos_constraint for the Bellman
+    inequality; the cone is also used for the multipliers. If
+    even_multipliers is True, the Gram matrices of the multipliers are block
+    diagonal (even and odd vectors of the basis), which gives a smaller but
+    more conservative program unless the problem is symmetric. odd=False and
+    even_multipliers=True reproduce the programs of the notebooks. Returns J
+    and the Gram matrices of the Bellman inequality.
+    '''
+    if len(f) != len(x):
+        raise ValueError(f'got {len(f)} dynamics polynomials for {len(x)} states.')
+    X = [X] if isinstance(X, Polynomial) else list(X)
+    U = [U] if isinstance(U, Polynomial) else list(U)
+    vector_type = l.vector_type
+    value_basis, multiplier_basis = hjb_bases(vector_type, tuple(x), tuple(u), degree, odd)
+
+    # Maximize volume beneath the value function.
+    J, c = prog.add_polynomial(list(value_basis), 'c')
+    prog.add_linear_cost(- moment_vector(value_basis, x, lbs, ubs) @ c)
+
+    # S-procedure for the state and input limits.
+    cone = options.get('cone', 'psd')
+    add_multiplier = prog.add_even_sos_polynomial if even_multipliers else prog.add_sos_polynomial
+    multipliers = [add_multiplier(list(multiplier_basis), f'lam_{{{i}}}', cone)[0]
+                   for i in range(len(X + U))]
+    sprocedure = [lam * g for lam, g in zip(multipliers, X + U)]
+
+    # Bellman inequality, with all the terms summed in a single pass.
+    Jdot = [derivative_map(value_basis, xi)(c) * fi for xi, fi in zip(x, f)]
+    bellman = Polynomial._sum(Jdot + [l] + sprocedure, [1] * (len(Jdot) + 1) + [- 1] * len(sprocedure))
+    gram = prog.add_sos_constraint(bellman, **options)[1]
+
+    # Value function nonpositive in the origin.
+    prog.add_linear_constraint(J({xi: 0 for xi in x}) <= 0)
+
+    return J, gram
+
+def value_function_lower_bound(SosProgram, x, u, f, l, X, U, degree, lbs, ubs,
+    odd=True, even_multipliers=False, warm_start=None, **options):
+    '''
+    Constructs and solves the program of add_value_function_lower_bound with
+    a new instance of the given SosProgram class. Returns the optimal lower
+    bound and the integral of it over the box lbs <= x <= ubs.
+    '''
+    prog = SosProgram()
+    J = add_value_function_lower_bound(prog, x, u, f, l, X, U, degree, lbs, ubs,
+        odd, even_multipliers, **options)[0]
+    prog.solve(warm_start)
+    return prog.substitute_minimizer(J), - prog.minimum()
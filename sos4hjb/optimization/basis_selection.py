@@ -0,0 +1,72 @@
+'''
+Selection of the basis of the auxiliary SOS polynomials. If p = sum_i q_i^2,
+the monomials of each q_i lie in half the Newton polytope of p (the convex
+hull of the monomials of p), hence the remaining basis vectors can be dropped
+without loss of generality.
+'''
+
+import numpy as np
+from scipy.optimize import linprog
+
+from sos4hjb.polynomials import Polynomial, MonomialVector
+from sos4hjb.polynomials.terms import sort_variables, align_powers, unique_terms
+
+def newton_polytope_basis(p, basis):
+    '''
+    Subset of the given basis that suffices to represent p as an SOS
+    polynomial. The basis vectors outside half the Newton polytope of p are
+    removed first. Then the ones whose square cannot be matched, neither by a
+    term of p nor by the product of two other basis vectors, are removed
+    iteratively (diagonal consistency). Chebyshev polynomials are analyzed in
+    the monomial basis. If the coefficients of p are decision variables, all
+    the terms of p are assumed to be in its support, which gives a
+    conservative estimate.
+    '''
+    if len(p) == 0 or len(basis) == 0:
+        return list(basis)
+
+    # Support of p and powers of the basis in the monomial basis.
+    monomial = p if p.vector_type is MonomialVector else p.in_monomial_basis()
+    basis_type, basis_variables, powers = Polynomial._basis_arrays(basis)
+    variables = sort_variables(list(basis_variables) + monomial.variables())
+    support = monomial.to_arrays(variables)[0]
+    powers = align_powers(powers, basis_variables, variables)
+
+    # Newton polytope and diagonal consistency.
+    kept = powers[_in_convex_hull(2 * powers, support)]
+    while len(kept) > 0:
+        rows, columns = np.triu_indices(len(kept), 1)
+        products = np.vstack((support, kept[rows] + kept[columns]))
+        consistent = _rows_in(2 * kept, products)
+        if consistent.all():
+            break
+        kept = kept[consistent]
+
+    # A Chebyshev basis vector is kept if its power is dominated by one of the
+    # monomials that are kept.
+    if basis_type is MonomialVector:
+        selected = _rows_in(powers, kept)
+    else:
+        selected = np.array([np.all(power <= kept, axis=1).any() for power in powers], dtype=bool)
+    return [v for v, s in zip(basis, selected) if s]
+
+def _rows_in(rows, table):
+    if len(table) == 0:
+        return np.zeros(len(rows), dtype=bool)
+    inverse = unique_terms(np.vstack((rows, table)))[1]
+    return np.isin(inverse[:len(rows)], inverse[len(rows):])
+
+def _in_convex_hull(points, vertices):
+
+    # Cheap necessary conditions: bounding box and total degree.
+    inside = np.all((points >= vertices.min(axis=0)) & (points <= vertices.max(axis=0)), axis=1)
+    degrees = vertices.sum(axis=1)
+    inside &= (points.sum(axis=1) >= degrees.min()) & (points.sum(axis=1) <= degrees.max())
+
+    # Feasibility of the convex combination of the vertices.
+    A_eq = np.vstack((vertices.T, np.ones(len(vertices))))
+    c = np.zeros(len(vertices))
+    for i in np.flatnonzero(inside):
+        b_eq = np.append(points[i], 1)
+        inside[i] = linprog(c, A_eq=A_eq, b_eq=b_eq, bounds=(0, None), method='highs').status == 0
+    return inside
@@ -0,0 +1,44 @@
+'''
+Batches of SOS programs (e.g. sweeps over degrees, dynamics, or bounds)
+constructed and solved in parallel by a pool of processes. Polynomials are
+sent back to the main process in their compact picklable form (variables,
+matrix of powers, and coefficients).
+'''
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+def solve_one(builder, config):
+    '''
+    Constructs the program with builder(config), which must return the
+    program and a dictionary of the decision quantities to retrieve (e.g.
+    polynomials or Gram matrices), solves it, and returns a dictionary with
+    the config, the minimum, the optimal values of the decision quantities,
+    and the construction and solution times in seconds.
+    '''
+    start = time.perf_counter()
+    prog, decisions = builder(config)
+    built = time.perf_counter()
+    prog.solve()
+    solved = time.perf_counter()
+    return {
+        'config': config,
+        'minimum': prog.minimum(),
+        'values': {name: prog.substitute_minimizer(d) for name, d in decisions.items()},
+        'build_time': built - start,
+        'solve_time': solved - built
+    }
+
+def solve_many(builder, configs, workers=None, mp_context=None):
+    '''
+    Calls solve_one(builder, config) for all the configs in a pool of workers
+    processes (by default, as many as the processors), and returns the
+    results in the order of the configs. The builder must be picklable, e.g.
+    a function defined at the top level of a module. With workers=1 the
+    programs are solved sequentially in the current process.
+    '''
+    configs = list(configs)
+    if workers == 1:
+        return [solve_one(builder, config) for config in configs]
+    with ProcessPoolExecutor(workers, mp_context) as executor:
+        return list(executor.map(solve_one, [builder] * len(configs), configs))
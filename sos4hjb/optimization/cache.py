@@ -0,0 +1,179 @@
+'''
+Opt-in cache of the solutions of SOS programs on disk. A program is
+identified by the SHA-256 hash of its canonical conic data (cost vector and
+offset, sparse constraint matrix, constraint vector, and cone dimensions, as
+given by the backend), so that programs constructed again from scratch (e.g.
+in another session or by another process) hit the cache as long as their
+data is identical. Each entry stores the minimum and the optimal values of
+the primal variables, which are restored in the program so that minimum and
+substitute_minimizer work without calling the solver. The least recently
+used entries are deleted when the total size of the cache exceeds a bound.
+'''
+
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+import scipy.sparse as sp
+
+# Bumped whenever the format of the hashed data or of the entries changes.
+VERSION = 1
+
+def fingerprint(prog):
+    '''
+    Hexadecimal SHA-256 hash of the canonical data of the program, as
+    returned by its method _fingerprint_data.
+    '''
+    digest = hashlib.sha256(f'sos4hjb-{VERSION}-{type(prog).__module__}'.encode())
+    for name, value in sorted(prog._fingerprint_data().items()):
+        digest.update(name.encode() + b'\0')
+        if sp.issparse(value):
+
+            # Sparse matrices in CSR form without duplicates or explicit
+            # zeros, and with sorted indices.
+            value = sp.csr_matrix(value, dtype=float, copy=True)
+            value.sum_duplicates()
+            value.eliminate_zeros()
+            value.sort_indices()
+            digest.update(json.dumps(value.shape).encode())
+            for array in (value.indptr, value.indices):
+                digest.update(array.astype('<i8').tobytes())
+            digest.update(_canonical_floats(value.data))
+        elif isinstance(value, (np.ndarray, float, int)):
+            value = np.asarray(value, dtype=float)
+            digest.update(json.dumps(value.shape).encode())
+            digest.update(_canonical_floats(value))
+        else:
+            digest.update(json.dumps(value, sort_keys=True, default=str).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def _canonical_floats(array):
+    # Adding zero turns - 0.0 into 0.0.
+    return (np.ascontiguousarray(array, dtype='<f8').reshape(-1) + 0.0).tobytes()
+
+class SolveCache:
+    '''
+    Directory of solutions of SOS programs indexed by the fingerprint of the
+    programs. Programs must come from a backend that implements the methods
+    _fingerprint_data, _primal_values, and _restore_solution.
+
+    Attributes
+    ----------
+    directory : str
+        Directory of the entries, one .npz file per program, created if it
+        does not exist.
+    max_bytes : int
+        Bound on the total size of the entries. Least recently used entries
+        are deleted after each new entry is written.
+    hits, misses : int
+        Number of solves served from the cache and by the solver.
+    '''
+
+    def __init__(self, directory, max_bytes=2 ** 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def solve(self, prog, warm_start=None):
+        '''
+        Restores the solution of prog if the cache has an entry for it, and
+        otherwise solves it with prog.solve(warm_start) and stores the
+        solution. Returns True if the solution was found in the cache.
+        '''
+        key = fingerprint(prog)
+        path = self._path(key)
+        entry = self._read(path)
+        if entry is not None:
+            prog._restore_solution(*entry)
+            self.hits += 1
+            return True
+        prog.solve(warm_start)
+        self.misses += 1
+        self._write(path, prog.minimum(), prog._primal_values())
+        self._evict(keep=path)
+        return False
+
+    def _read(self, path):
+        try:
+            with np.load(path) as data:
+                minimum = float(data['minimum'])
+                values = data['values'] if 'values' in data else None
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # Hits count as uses for the eviction.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return minimum, values
+
+    def _write(self, path, minimum, values):
+
+        # Programs without solution (e.g. with an unknown solver status)
+        # are not stored.
+        if minimum is None:
+            return
+        arrays = {'minimum': np.float64(minimum)}
+        if values is not None:
+            arrays['values'] = np.asarray(values, dtype=float)
+
+        # Written to a temporary file and renamed, so that concurrent readers
+        # never see a partial entry.
+        descriptor, temporary = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self):
+        '''
+        Total size in bytes of the entries of the cache.
+        '''
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self, keep=None):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        '''
+        Deletes all the entries of the cache.
+        '''
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
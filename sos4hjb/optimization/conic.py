@@ -0,0 +1,571 @@
+'''
+SOS programs assembled directly in the standard conic form
+
+    minimize    c' x
+    subject to  A x + s = b,  s in K,
+
+with K a product of zero, nonnegative, second-order, and semidefinite cones,
+and handed to SCS or Clarabel without a modeling layer. Decision polynomials
+store their coefficients as AffineExpression objects, which the polynomial
+operations act on through sparse matrix products only. Parameters are data:
+expressions are affine in the decision variables with coefficients affine in
+the parameters, and A, b, and c are evaluated again when the parameters
+change.
+'''
+
+import warnings
+import numpy as np
+import scipy.sparse as sp
+from numbers import Number
+
+from sos4hjb.polynomials import Polynomial
+from sos4hjb.optimization import SosProgramParent
+from sos4hjb.optimization.warm_start import warm_start_pairs
+
+def _columns(M, n):
+    '''
+    Sparse matrix M padded with zero columns up to n columns.
+    '''
+    M = sp.csr_matrix(M)
+    if M.shape[1] == n:
+        return M
+    return sp.csr_matrix((M.data, M.indices, M.indptr), (M.shape[0], n))
+
+def _row_kron(B, A):
+    '''
+    Row-wise Kronecker product of two sparse matrices with the same number of
+    rows: row i of the result is kron(B[i], A[i]).
+    '''
+    B = sp.csr_matrix(B)
+    A = sp.csr_matrix(A)
+    rows = np.repeat(np.arange(B.shape[0]), np.diff(B.indptr))
+    counts = np.diff(A.indptr)[rows]
+    entries = np.repeat(np.arange(B.nnz), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    positions = A.indptr[rows][entries] + offsets
+    data = B.data[entries] * A.data[positions]
+    columns = B.indices[entries] * A.shape[1] + A.indices[positions]
+    return sp.csr_matrix((data, (rows[entries], columns)), (B.shape[0], B.shape[1] * A.shape[1]))
+
+class AffineExpression:
+    '''
+    Affine function of the decision variables x of a conic program, whose
+    coefficients are affine functions of the parameters theta of the program:
+
+        (A + sum_k theta_k C_k) x + b + B theta.
+
+    Parameters are data, hence an expression in the parameters can multiply
+    an expression in the decision variables (e.g. an S-procedure multiplier
+    times a parametric bound), while two expressions in the decision
+    variables cannot be multiplied.
+
+    Attributes
+    ----------
+    A : scipy.sparse.csr_matrix
+        Linear part, with one row per entry of the expression (entries are
+        flattened in row-major order), and one column per decision variable
+        that existed when the expression was created.
+    b : numpy.ndarray
+        Constant part, one entry per entry of the expression.
+    B : scipy.sparse.csr_matrix
+        Linear part in the parameters, with one column per parameter that
+        existed when the expression was created.
+    C : scipy.sparse.csr_matrix
+        Bilinear part, with the column k n + j for the product of the
+        parameter k and the decision variable j (n is the number of columns
+        of A).
+    shape : tuple
+        Shape of the expression: () for scalars, (n,) for vectors, and
+        (m, n) for matrices.
+    '''
+
+    # Let numpy arrays defer to the methods of this class.
+    __array_ufunc__ = None
+
+    def __init__(self, A, b, shape, B=None, C=None):
+        self.A = sp.csr_matrix(A)
+        self.b = np.asarray(b, dtype=float).reshape(-1)
+        rows = self.A.shape[0]
+        self.B = sp.csr_matrix((rows, 0)) if B is None else sp.csr_matrix(B)
+        self.C = sp.csr_matrix((rows, self.B.shape[1] * self.A.shape[1])) if C is None else sp.csr_matrix(C)
+        self.shape = tuple(shape)
+
+    @classmethod
+    def constant(cls, value, shape=None):
+        value = np.asarray(value, dtype=float)
+        if shape is not None:
+            value = np.broadcast_to(value, shape)
+        return cls(sp.csr_matrix((value.size, 0)), value, value.shape)
+
+    @classmethod
+    def make(cls, other, shape=None):
+        return other if isinstance(other, cls) else cls.constant(other, shape)
+
+    @classmethod
+    def concatenate(cls, expressions):
+        '''
+        Concatenates the flattened expressions in a vector expression.
+        '''
+        n = max([e.A.shape[1] for e in expressions], default=0)
+        m = max([e.B.shape[1] for e in expressions], default=0)
+        parts = [e._padded(n, m) for e in expressions]
+        A, B, C = [sp.vstack([p[i] for p in parts] + [sp.csr_matrix((0, size))])
+                   for i, size in enumerate((n, m, m * n))]
+        b = np.concatenate([e.b for e in expressions] + [np.zeros(0)])
+        return cls(A, b, (len(b),), B, C)
+
+    @classmethod
+    def stack(cls, expressions):
+        '''
+        Stacks expressions of equal shape along a new first axis.
+        '''
+        return cls.concatenate(expressions).reshape((len(expressions),) + expressions[0].shape)
+
+    def reshape(self, shape):
+        return AffineExpression(self.A, self.b, shape, self.B, self.C)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    def _linear(self, n):
+        return _columns(self.A, n)
+
+    def _padded(self, n, m):
+        '''
+        Linear, parametric, and bilinear parts for n decision variables and m
+        parameters.
+        '''
+        n0 = self.A.shape[1]
+        if n0 == n or self.C.nnz == 0:
+            C = _columns(self.C, m * n) if n0 == n else sp.csr_matrix((self.C.shape[0], m * n))
+        else:
+            C = self.C.tocoo()
+            C = sp.csr_matrix((C.data, (C.row, C.col // n0 * n + C.col % n0)), (C.shape[0], m * n))
+        return _columns(self.A, n), _columns(self.B, m), C
+
+    def _has_variables(self):
+        return self.A.nnz > 0 or self.C.nnz > 0
+
+    def _has_parameters(self):
+        return self.B.nnz > 0 or self.C.nnz > 0
+
+    def _at(self, theta, n):
+        '''
+        Linear part (with n columns) and constant part of the expression for
+        the given values of the parameters.
+        '''
+        m = self.B.shape[1]
+        if theta is None or len(theta) < m:
+            if self._has_parameters():
+                raise ValueError('the values of the parameters are required.')
+            theta = np.zeros(m)
+        theta = np.asarray(theta, dtype=float)[:m]
+        A, B, C = self._padded(n, m)
+        if C.nnz > 0:
+            A = A + C @ sp.kron(theta.reshape(-1, 1), sp.eye(n), 'csr')
+        return sp.csr_matrix(A), self.b + B @ theta
+
+    def evaluate(self, x, theta=None):
+        '''
+        Value of the expression (as a numpy array) for the given values of the
+        decision variables and of the parameters.
+        '''
+        x = np.asarray(x, dtype=float)
+        A, b = self._at(theta, self.A.shape[1])
+        return (A @ x[:A.shape[1]] + b).reshape(self.shape)
+
+    def _transform(self, M, shape):
+        return AffineExpression(M @ self.A, M @ self.b, shape, M @ self.B, M @ self.C)
+
+    def _rows(self, indices, shape):
+        return AffineExpression(self.A[indices], self.b[indices], shape, self.B[indices], self.C[indices])
+
+    def __add__(self, other):
+        other = self.make(other, self.shape)
+        if other.shape != self.shape:
+            indices = np.broadcast_to(np.arange(other.size).reshape(other.shape), self.shape)
+            other = other._rows(indices.reshape(-1), self.shape)
+        n = max(self.A.shape[1], other.A.shape[1])
+        m = max(self.B.shape[1], other.B.shape[1])
+        A1, B1, C1 = self._padded(n, m)
+        A2, B2, C2 = other._padded(n, m)
+        return AffineExpression(A1 + A2, self.b + other.b, self.shape, B1 + B2, C1 + C2)
+
+    def __radd__(self, other):
+        return self + other
+
+    def __neg__(self):
+        return AffineExpression(- self.A, - self.b, self.shape, - self.B, - self.C)
+
+    def __sub__(self, other):
+        return self + (- self.make(other, self.shape))
+
+    def __rsub__(self, other):
+        return (- self) + other
+
+    def __mul__(self, other):
+        if isinstance(other, Number):
+            return AffineExpression(self.A * other, self.b * other, self.shape, self.B * other, self.C * other)
+        return NotImplemented
+
+    def __rmul__(self, other):
+        return self * other
+
+    def multiply(self, other):
+        '''
+        Elementwise product with an expression of the same shape. One of the
+        two factors must not depend on the decision variables, and the other
+        must not depend on the parameters.
+        '''
+        other = self.make(other, self.shape)
+        if other.shape != self.shape:
+            raise ValueError(f'cannot multiply expressions of shapes {self.shape} and {other.shape}.')
+        p, q = (other, self) if self._has_variables() else (self, other)
+        if p._has_variables() or q._has_parameters():
+            raise TypeError('cannot multiply two affine expressions, unless one depends only on the parameters and the other only on the decision variables.')
+
+        # (p.b + p.B theta) (q.A x + q.b).
+        A = sp.diags(p.b) @ q.A
+        B = sp.diags(q.b) @ p.B
+        C = _row_kron(p.B, q.A)
+        return AffineExpression(A, p.b * q.b, self.shape, B, C)
+
+    def __matmul__(self, M):
+        if isinstance(M, AffineExpression):
+            raise TypeError('cannot multiply two affine expressions.')
+        M = M if sp.issparse(M) else np.asarray(M, dtype=float)
+        if len(self.shape) == 1:
+            if M.ndim == 1:
+                return self._transform(sp.csr_matrix(M.reshape(1, -1)), ())
+            M = sp.csr_matrix(M)
+            return self._transform(M.T, (M.shape[1],))
+        if M.ndim == 1:
+            M = sp.csr_matrix(M.reshape(1, -1))
+            return self._transform(sp.kron(sp.eye(self.shape[0]), M), (self.shape[0],))
+        M = sp.csr_matrix(M)
+        return self._transform(sp.kron(sp.eye(self.shape[0]), M.T), (self.shape[0], M.shape[1]))
+
+    def __rmatmul__(self, M):
+        M = M if sp.issparse(M) else np.asarray(M, dtype=float)
+        if M.ndim == 1:
+            M = sp.csr_matrix(M.reshape(1, -1))
+            if len(self.shape) == 1:
+                return self._transform(M, ())
+            return self._transform(sp.kron(M, sp.eye(self.shape[1])), (self.shape[1],))
+        M = sp.csr_matrix(M)
+        if len(self.shape) == 1:
+            return self._transform(M, (M.shape[0],))
+        return self._transform(sp.kron(M, sp.eye(self.shape[1])), (M.shape[0], self.shape[1]))
+
+    @property
+    def T(self):
+        if len(self.shape) < 2:
+            return self
+        indices = np.arange(self.size).reshape(self.shape).T.reshape(-1)
+        return self._rows(indices, self.shape[::-1])
+
+    def __getitem__(self, key):
+        indices = np.arange(self.size).reshape(self.shape)[key]
+        return self._rows(np.reshape(indices, -1), np.shape(indices))
+
+    def __eq__(self, other):
+        return ConicConstraint('zero', self - other)
+
+    def __ge__(self, other):
+        return ConicConstraint('nonneg', self - other)
+
+    def __le__(self, other):
+        return ConicConstraint('nonneg', - (self - other))
+
+    __hash__ = None
+
+class ConicConstraint:
+    '''
+    Constraint that an affine expression lies in a cone.
+
+    Attributes
+    ----------
+    cone : str
+        'zero', 'nonneg', 'soc' (each row of the expression is a vector
+        (t, y) with ||y|| <= t), or 'psd' (the expression is a symmetric
+        matrix).
+    expression : AffineExpression
+        Expression constrained in the cone.
+    '''
+
+    cones = ('zero', 'nonneg', 'soc', 'psd')
+
+    def __init__(self, cone, expression):
+        if cone not in self.cones:
+            raise ValueError(f'cone must be one of {self.cones}, got {cone}.')
+        self.cone = cone
+        self.expression = expression
+
+class SosProgram(SosProgramParent):
+
+    solvers = ('clarabel', 'scs')
+
+    def __init__(self, solver='clarabel'):
+        if solver not in self.solvers:
+            raise ValueError(f'solver must be one of {self.solvers}, got {solver}.')
+        self.solver = solver
+        self.num_variables = 0
+        self.num_parameters = 0
+        self.theta = np.zeros(0)
+        self.constraints = []
+        self.cost = AffineExpression.constant(0)
+        self.data = None
+        self.x = None
+        self.value = None
+
+    def add_variables(self, size, name='c'):
+        return self._new_variables(size, (size,))
+
+    def add_parameters(self, size, name='theta', value=None):
+        '''
+        Parameters are data of the program (the expressions are affine in
+        their values theta), hence they can also multiply decision variables.
+        If not given, the initial value is zero.
+        '''
+        value = np.zeros(size) if value is None else np.asarray(value, dtype=float).reshape(-1)
+        if len(value) != size:
+            raise ValueError(f'got {len(value)} values for {size} parameters.')
+        B = sp.csr_matrix((np.ones(size), (np.arange(size), np.arange(size) + self.num_parameters)), (size, self.num_parameters + size))
+        self.num_parameters += size
+        self.theta = np.concatenate((self.theta, value))
+        return AffineExpression(sp.csr_matrix((size, 0)), np.zeros(size), (size,), B)
+
+    def set_parameter_values(self, parameters, value):
+        '''
+        Changes the values of the parameters. The assembled conic data are
+        evaluated again, without walking the constraints: only b and c change
+        if the parameters do not multiply decision variables.
+        '''
+        B = parameters.B if isinstance(parameters, AffineExpression) else None
+        if B is None or parameters._has_variables() or parameters.b.any() or B.shape[1] > self.num_parameters \
+            or np.any(np.diff(B.indptr) != 1) or np.any(B.data != 1):
+            raise ValueError('parameters do not belong to this program.')
+        self.theta[B.indices] = value
+        if self.data is not None:
+            self._evaluate_data(self.data)
+
+            # The SCS workspace is set up again if A changed.
+            if self.data['expression'].C.nnz > 0:
+                self.data.pop('scs', None)
+
+    def _new_variables(self, size, shape):
+        A = sp.csr_matrix((np.ones(size), (np.arange(size), np.arange(size) + self.num_variables)), (size, self.num_variables + size))
+        self.num_variables += size
+        return AffineExpression(A, np.zeros(size), shape)
+
+    def _symmetric_variable(self, size):
+        rows, columns = np.triu_indices(size)
+        upper = self._new_variables(len(rows), (len(rows),))
+        index = np.zeros((size, size), dtype=int)
+        index[rows, columns] = np.arange(len(rows))
+        index[columns, rows] = np.arange(len(rows))
+        return upper[index]
+
+    def add_psd_variable(self, size, name='Q', cone='psd'):
+        if cone == 'psd':
+            gram = self._symmetric_variable(size)
+            cons = [ConicConstraint('psd', gram)]
+        elif cone == 'dd':
+            gram = self._symmetric_variable(size)
+            rows, columns = np.triu_indices(size, 1)
+            bounds = self.add_variables(len(rows))
+            off_diagonal = gram[rows, columns]
+            cons = [bounds - off_diagonal >= 0, bounds + off_diagonal >= 0]
+            incidence = sp.csr_matrix((np.ones(2 * len(rows)), (np.concatenate((rows, columns)), np.tile(np.arange(len(rows)), 2))), (size, len(rows)))
+            diagonal = gram[np.arange(size), np.arange(size)]
+            cons.append(diagonal - incidence @ bounds >= 0)
+        elif cone == 'sdd':
+            gram, cons = self._add_sdd_variable(size)
+        else:
+            raise ValueError(f'cone must be psd, sdd, or dd, got {cone}.')
+        for c in cons:
+            if c.expression.size > 0:
+                self.add_linear_constraint(c)
+        return gram, cons
+
+    def _add_sdd_variable(self, size):
+
+        # Trivial case without pairs of indices.
+        if size < 2:
+            gram = self._new_variables(size, (size, size))
+            return gram, [gram >= 0]
+
+        # Sum of 2x2 PSD matrices [[a, b], [b, c]], one per pair of indices.
+        rows, columns = np.triu_indices(size, 1)
+        pairs = np.arange(len(rows))
+        abc = self._new_variables(3 * len(rows), (3, len(rows)))
+        embed = lambda i, j: sp.csr_matrix((np.ones(len(pairs)), (i * size + j, pairs)), (size ** 2, len(pairs)))
+        entries = embed(rows, rows) @ abc[0] + (embed(rows, columns) + embed(columns, rows)) @ abc[1] + embed(columns, columns) @ abc[2]
+        gram = entries.reshape((size, size))
+        a, b, c = abc[0], abc[1], abc[2]
+        cones = AffineExpression.stack([a + c, 2 * b, a - c]).T
+        return gram, [ConicConstraint('soc', cones)]
+
+    def add_linear_constraint(self, cons):
+        self.constraints.append(cons)
+        self.data = None
+
+    def add_linear_cost(self, expr):
+        self.cost = self.cost + AffineExpression.make(expr).reshape(())
+        self.data = None
+
+    def solve(self, warm_start=None):
+        '''
+        Solves the program. warm_start is an optional list of pairs (decision,
+        value) as in sos4hjb.optimization.warm_start.warm_start_pairs, used as
+        primal initial guess by SCS. Clarabel does not support warm starts,
+        and ignores it with a warning. Without it, SCS starts from the
+        previous solution of the same program.
+        '''
+
+        # The conic data are assembled only if constraints or costs were
+        # added, parameters update b in place.
+        if self.data is None:
+            self.data = self._assemble()
+        if warm_start is not None and self.solver == 'clarabel':
+            warnings.warn('Clarabel ignores warm_start, use the solver scs to warm start.')
+            warm_start = None
+        x0 = None if warm_start is None else self._initial_point(warm_start)
+        x, status = getattr(self, '_solve_' + self.solver)(x0)
+        c = self.data['c']
+
+        # Same conventions as cvxpy for infeasible and unbounded programs.
+        if status == 'solved':
+            self.x = x
+            self.value = c @ x + self.data['offset']
+        else:
+            self.x = None
+            self.value = {'infeasible': np.inf, 'unbounded': - np.inf}.get(status)
+
+    def _assemble(self):
+
+        # Rows of A x + s = b sorted by cone, as required by SCS, with s equal
+        # to the constrained expressions.
+        blocks = {cone: [] for cone in ConicConstraint.cones}
+        for cons in self.constraints:
+            blocks[cons.cone].append(cons)
+        expressions = []
+        dims = {}
+        for cone in ConicConstraint.cones:
+            dims[cone] = []
+            for cons in blocks[cone]:
+                e = cons.expression
+                if cone == 'psd':
+                    e, dim = self._svec(e)
+                elif cone == 'soc':
+                    dim = [e.shape[1]] * e.shape[0]
+                else:
+                    dim = [e.size]
+                expressions.append(e)
+                dims[cone] += dim
+        data = {'expression': AffineExpression.concatenate(expressions), 'dims': dims}
+        self._evaluate_data(data)
+        return data
+
+    def _evaluate_data(self, data):
+
+        # Conic data for the current values of the parameters.
+        n = self.num_variables
+        A, b = data['expression']._at(self.theta, n)
+        c, offset = self.cost._at(self.theta, n)
+        data.update({'c': c.toarray().reshape(-1), 'offset': offset[0], 'A': (- A).tocsc(), 'b': b})
+
+    def _svec(self, e):
+
+        # Scaled triangle of a symmetric matrix: SCS stores the lower triangle
+        # column-wise, and Clarabel the upper triangle column-wise.
+        size = e.shape[0]
+        rows, columns = np.triu_indices(size)
+        if self.solver == 'clarabel':
+            columns, rows = np.tril_indices(size)
+        scale = np.where(rows == columns, 1, np.sqrt(2))
+        entries = e[rows, columns]
+        return sp.diags(scale) @ entries, [size]
+
+    def _initial_point(self, warm_start):
+
+        # Entries that depend on a single variable fix its initial value.
+        x0 = np.zeros(self.num_variables)
+        for decision, value in warm_start_pairs(warm_start):
+            A = decision._linear(self.num_variables)
+            single = np.flatnonzero(np.diff(A.indptr) == 1)
+            entries = A.indptr[single]
+            x0[A.indices[entries]] = (value.reshape(-1)[single] - decision.b[single]) / A.data[entries]
+        return x0
+
+    def _solve_clarabel(self, x0):
+        import clarabel
+        c, A, b, dims = [self.data[key] for key in ('c', 'A', 'b', 'dims')]
+        cones = [clarabel.ZeroConeT(sum(dims['zero'])), clarabel.NonnegativeConeT(sum(dims['nonneg']))]
+        cones += [clarabel.SecondOrderConeT(d) for d in dims['soc']]
+        cones += [clarabel.PSDTriangleConeT(d) for d in dims['psd']]
+        settings = clarabel.DefaultSettings()
+        settings.verbose = False
+        P = sp.csc_matrix((len(c), len(c)))
+        solution = clarabel.DefaultSolver(P, c, A, b, cones, settings).solve()
+        status = str(solution.status)
+        if status in ('Solved', 'AlmostSolved'):
+            return np.array(solution.x), 'solved'
+        elif 'PrimalInfeasible' in status:
+            return None, 'infeasible'
+        elif 'DualInfeasible' in status:
+            return None, 'unbounded'
+        return None, status
+
+    def _solve_scs(self, x0):
+        import scs
+        c, A, b, dims = [self.data[key] for key in ('c', 'A', 'b', 'dims')]
+
+        # The SCS workspace (with the factorization of A) is kept with the
+        # conic data, and only b and c are updated when parameters change.
+        if 'scs' not in self.data:
+            cone = {'z': sum(dims['zero']), 'l': sum(dims['nonneg']), 'q': dims['soc'], 's': dims['psd']}
+            self.data['scs'] = scs.SCS({'A': A, 'b': b, 'c': c}, cone, verbose=False)
+        else:
+            self.data['scs'].update(b=b, c=c)
+        if x0 is None:
+            solution = self.data['scs'].solve(warm_start=True)
+        else:
+            solution = self.data['scs'].solve(warm_start=True, x=x0, y=np.zeros(len(b)), s=b - A @ x0)
+        status = solution['info']['status']
+        if status in ('solved', 'solved_inaccurate'):
+            return solution['x'], 'solved'
+        elif 'infeasible' in status:
+            return None, 'infeasible'
+        elif 'unbounded' in status:
+            return None, 'unbounded'
+        return None, status
+
+    def _fingerprint_data(self):
+        if self.data is None:
+            self.data = self._assemble()
+        keys = ('c', 'offset', 'A', 'b', 'dims')
+        return dict({key: self.data[key] for key in keys}, solver=self.solver)
+
+    def _primal_values(self):
+        return self.x
+
+    def _restore_solution(self, minimum, values):
+        self.x = values
+        self.value = minimum
+
+    def minimum(self):
+        return self.value
+
+    def substitute_minimizer(self, expr):
+        if self.x is None:
+            return None
+        if isinstance(expr, Polynomial):
+            powers, coefs = expr.to_arrays()
+            if isinstance(coefs, AffineExpression):
+                coefs = coefs.evaluate(self.x, self.theta)
+            return Polynomial.from_arrays(expr.vector_type, expr.variables(), powers, coefs)
+        elif isinstance(expr, AffineExpression):
+            return expr.evaluate(self.x, self.theta)
+        return expr
@@ -1,6 +1,10 @@
+import warnings
+import numpy as np
+import scipy.sparse as sp
 import cvxpy as cp
 
 from sos4hjb.polynomials import Polynomial
+from sos4hjb.polynomials.terms import is_expression
 from sos4hjb.optimization import SosProgramParent
 
 class SosProgram(SosProgramParent):
@@ -9,32 +13,118 @@ class SosProgram(SosProgramParent):
         self.constraints = []
         self.cost = 0
         self.value = None
+        self.problem = None
         
     def add_variables(self, size, name='c'):
         return cp.Variable(size, name)
 
-    def add_psd_variable(self, size, name='Q'):
-        gram = cp.Variable((size, size), name, symmetric=True)
-        cons = gram >> 0
-        self.constraints.append(cons)
+    def add_parameters(self, size, name='theta', value=None):
+        return cp.Parameter(size, name=name, value=value)
+
+    def set_parameter_values(self, parameters, value):
+        parameters.value = np.asarray(value, dtype=float)
+
+    def add_psd_variable(self, size, name='Q', cone='psd'):
+        if cone == 'psd':
+            gram = cp.Variable((size, size), name, symmetric=True)
+            cons = gram >> 0
+        elif cone == 'dd':
+            gram = cp.Variable((size, size), name, symmetric=True)
+            cons = 2 * cp.diag(gram) >= cp.sum(cp.abs(gram), axis=1)
+        elif cone == 'sdd':
+            gram, cons = self._add_sdd_variable(size, name)
+        else:
+            raise ValueError(f'cone must be psd, sdd, or dd, got {cone}.')
+
+        # An empty matrix is PSD, and cvxpy cannot canonicalize the constraint.
+        if size > 0:
+            self.add_linear_constraint(cons)
+        return gram, cons
+
+    @staticmethod
+    def _add_sdd_variable(size, name):
+
+        # Trivial case without pairs of indices.
+        if size < 2:
+            gram = cp.Variable((size, size), name)
+            return gram, gram >= 0
+
+        # Sum of 2x2 PSD matrices [[a, b], [b, c]], one per pair of indices.
+        rows, columns = np.triu_indices(size, 1)
+        pairs = np.arange(len(rows))
+        abc = cp.Variable((3, len(rows)), name)
+        embed = lambda i, j: sp.csr_matrix((np.ones(len(pairs)), (i * size + j, pairs)), (size ** 2, len(pairs)))
+        entries = embed(rows, rows) @ abc[0] + (embed(rows, columns) + embed(columns, rows)) @ abc[1] + embed(columns, columns) @ abc[2]
+        gram = cp.reshape(entries, (size, size), order='C')
+        cons = cp.SOC(abc[0] + abc[2], cp.vstack([2 * abc[1], abc[0] - abc[2]]))
         return gram, cons
     
     def add_linear_constraint(self, cons):
         self.constraints.append(cons)
+        self.problem = None
 
     def add_linear_cost(self, expr):
         self.cost += expr
+        self.problem = None
         
-    def solve(self):
-        prob = cp.Problem(cp.Minimize(self.cost), self.constraints)
-        prob.solve()
-        self.value = prob.value
+    def solve(self, warm_start=None):
+        '''
+        Solves the program with the default solver of cvxpy. warm_start is
+        ignored, with a warning: cvxpy passes initial values of the variables
+        only to solvers that accept them, and neither SCS nor Clarabel does
+        (SCS only reuses the previous solution of the same problem). Use the
+        conic backend with SCS to warm start from a lifted solution.
+        '''
+
+        # The problem is rebuilt only if constraints or costs were added, so
+        # that cvxpy reuses its canonicalization when only parameters change.
+        if self.problem is None:
+            self.problem = cp.Problem(cp.Minimize(self.cost), self.constraints)
+
+        if warm_start is not None:
+            warnings.warn('the cvx backend ignores warm_start, use conic.SosProgram(\'scs\') to warm start.')
+        self.problem.solve(warm_start=True)
+        self.value = self.problem.value
+
+    def _fingerprint_data(self):
+        if self.problem is None:
+            self.problem = cp.Problem(cp.Minimize(self.cost), self.constraints)
+
+        # Conic data of the solver that solve would call, with the current
+        # values of the parameters.
+        data = self.problem.get_problem_data(None)[0]
+        c, offset, A, b = data['param_prob'].apply_parameters()
+        return {'c': c, 'offset': offset, 'A': A, 'b': b, 'dims': str(data['dims'])}
+
+    def _primal_values(self):
+        if self.problem is None or any(v.value is None for v in self.problem.variables()):
+            return None
+        return np.concatenate([np.reshape(v.value, -1) for v in self.problem.variables()])
+
+    def _restore_solution(self, minimum, values):
+        start = 0
+        for v in self.problem.variables():
+            if values is None:
+                v.value = None
+            else:
+                v.value = np.reshape(values[start:start + v.size], v.shape)
+                start += v.size
+        self.value = minimum
 
     def minimum(self):
         return self.value
 
     def substitute_minimizer(self, expr):
+
+        # Infeasible and unbounded programs have no minimizer.
+        if self.value is None or not np.isfinite(self.value):
+            return None
         if isinstance(expr, Polynomial):
-            return Polynomial({v: c.value for v, c in expr})
+            powers, coefs = expr.to_arrays()
+            if is_expression(coefs):
+                values = coefs.value
+            else:
+                values = [getattr(c, 'value', c) for c in coefs]
+            return Polynomial.from_arrays(expr.vector_type, expr.variables(), powers, values)
         else:
             return expr.value
@@ -1,29 +1,84 @@
+import numpy as np
 from pydrake.all import MathematicalProgram, Expression, Solve
+from pydrake.symbolic import Polynomial as DrakePolynomial
 
 from sos4hjb.polynomials import Polynomial
+from sos4hjb.polynomials.terms import to_python
 from sos4hjb.optimization import SosProgramParent
+from sos4hjb.optimization.warm_start import warm_start_pairs
 
 class SosProgram(SosProgramParent, MathematicalProgram):
     
     def __init__(self):
         MathematicalProgram.__init__(self)
         self.result = None
+        self.parameters = []
 
     def add_variables(self, size, name='c'):
         return self.NewContinuousVariables(size, name)
 
-    def add_psd_variable(self, size, name='Q'):
+    def add_parameters(self, size, name='theta', value=None):
+        '''
+        Parameters are variables fixed by equality constraints, whose bounds
+        are updated when their value changes. Hence, unlike in the other
+        backends, they cannot multiply decision variables, and constraints
+        or costs where they do raise a ValueError. If not given, the initial
+        value is zero.
+        '''
+        parameters = self.NewContinuousVariables(size, name)
+        value = np.zeros(size) if value is None else np.asarray(value, dtype=float)
+        cons = self.AddLinearEqualityConstraint(np.eye(size), value, parameters)
+        self.parameters.append((parameters, cons))
+        return parameters
+
+    def set_parameter_values(self, parameters, value):
+        for p, cons in self.parameters:
+            if p is parameters:
+                value = np.broadcast_to(np.asarray(value, dtype=float), (len(p),))
+                cons.evaluator().UpdateCoefficients(np.eye(len(p)), value)
+                return
+        raise ValueError('parameters do not belong to this program.')
+
+    def add_psd_variable(self, size, name='Q', cone='psd'):
         gram = self.NewSymmetricContinuousVariables(size, name)
-        cons = self.AddPositiveSemidefiniteConstraint(gram)
+        if cone == 'psd':
+            cons = self.AddPositiveSemidefiniteConstraint(gram)
+        elif cone == 'dd':
+            cons = self.AddPositiveDiagonallyDominantMatrixConstraint(gram.astype(Expression))
+        elif cone == 'sdd':
+            cons = self.AddScaledDiagonallyDominantMatrixConstraint(gram.astype(Expression))
+        else:
+            raise ValueError(f'cone must be psd, sdd, or dd, got {cone}.')
         return gram, cons
 
+    def _verify_linear(self, exprs):
+        # Without parameters, the expressions of an SOS program are linear by
+        # construction.
+        if not self.parameters:
+            return
+        for e in np.reshape(exprs, -1):
+            if isinstance(e, Expression) and DrakePolynomial(e).TotalDegree() > 1:
+                raise ValueError('parameters of the Drake backend are decision variables '
+                                 'fixed by equality constraints, and cannot multiply '
+                                 f'decision variables, got {e}.')
+
     def add_linear_constraint(self, cons):
         self.AddLinearConstraint(cons)
 
+    def add_zero_polynomial_constraint(self, p):
+        coefs = p.to_arrays()[1]
+        self._verify_linear(coefs)
+        cons = self.AddLinearEqualityConstraint(coefs, np.zeros(len(coefs)))
+        return [cons]
+
     def add_linear_cost(self, expr):
+        self._verify_linear(expr)
         self.AddLinearCost(expr)
 
-    def solve(self):
+    def solve(self, warm_start=None):
+        if warm_start is not None:
+            for decision, value in warm_start_pairs(warm_start):
+                self.SetInitialGuess(decision, value)
         self.result = Solve(self)
 
     def minimum(self):
@@ -31,13 +86,16 @@ class SosProgram(SosProgramParent, MathematicalProgram):
             return self.result.get_optimal_cost()
 
     def substitute_minimizer(self, expr):
+        if self.result is None or not self.result.is_success():
+            return None
         if isinstance(expr, Polynomial):
-            p_opt = Polynomial({})
-            for v, c in expr:
+            powers, coefs = expr.to_arrays()
+            values = []
+            for c in to_python(coefs):
                 c_opt = self.result.GetSolution(c)
                 if isinstance(c_opt, Expression):
                     c_opt = c_opt.Evaluate()
-                p_opt[v] = c_opt
-            return p_opt
+                values.append(float(c_opt))
+            return Polynomial.from_arrays(expr.vector_type, expr.variables(), powers, values)
         else:
             return self.result.GetSolution(expr)
@@ -0,0 +1,53 @@
+'''
+Iterative change of basis for the DSOS and SDSOS inner approximations of SOS
+programs. At each iteration the Gram matrix G of an SOS polynomial is replaced
+by U' G U, where U' U is the Gram matrix found at the previous iteration, and
+G is constrained to be (scaled) diagonally dominant. Since the identity is
+diagonally dominant, the previous solution remains feasible and the optimal
+cost does not increase.
+'''
+
+import numpy as np
+
+def basis_change(gram, tol=1e-9):
+    '''
+    Matrix U such that U' U is the given Gram matrix. Small eigenvalues are
+    lifted to tol times the largest one, so that U is invertible.
+    '''
+    gram = np.atleast_2d(gram)
+    if gram.size == 0:
+        return np.zeros(gram.shape)
+    gram = (gram + gram.T) / 2
+    eigvals, eigvecs = np.linalg.eigh(gram)
+    floor = tol * max(eigvals.max(), tol)
+    return np.sqrt(np.maximum(eigvals, floor))[:, None] * eigvecs.T
+
+def basis_changes(grams):
+    '''
+    Applies basis_change to nested lists of Gram matrices, as returned by
+    SosProgramParent.add_sos_constraint.
+    '''
+    if isinstance(grams, list):
+        return [basis_changes(gram) for gram in grams]
+    return basis_change(grams)
+
+def refine_basis_changes(build, iterations):
+    '''
+    Runs the iterative change of basis. build(changes) must construct and
+    solve a program, passing changes to add_sos_constraint (None at the first
+    iteration), and return the program and the Gram matrices returned by
+    add_sos_constraint. Returns the program and the Gram matrices of the last
+    iteration, and the list of the optimal costs.
+    '''
+    changes = None
+    costs = []
+    for i in range(iterations + 1):
+        prog, grams = build(changes)
+        costs.append(prog.minimum())
+        changes = basis_changes(_substitute_minimizer(prog, grams))
+    return prog, grams, costs
+
+def _substitute_minimizer(prog, grams):
+    if isinstance(grams, list):
+        return [_substitute_minimizer(prog, gram) for gram in grams]
+    return prog.substitute_minimizer(grams)
@@ -1,36 +1,77 @@
+import numpy as np
+
 from sos4hjb.polynomials import Polynomial
+from sos4hjb.polynomials.terms import is_expression
+from sos4hjb.optimization.basis_selection import newton_polytope_basis
+from sos4hjb.optimization.sparsity import correlative_cliques
+from sos4hjb.optimization.symmetry import symmetry_adapted_blocks
 
 class SosProgramParent:
     '''
     Derived classes must implement the following methods:
         - add_variables(size, name)
-        - add_psd_variable(size, name)
+        - add_psd_variable(size, name, cone)
         - add_linear_constraint(constraint)
         - add_linear_cost(expression)
-        - solve()
+        - add_parameters(size, name, value)
+        - set_parameter_values(parameters, value)
+        - solve(warm_start)
         - minimum()
-        - substitute_minimizer(expression)
+        - substitute_minimizer(expression), which returns None if the program
+          has no solution (not solved yet, infeasible, or unbounded)
+    and can override add_zero_polynomial_constraint(polynomial) to constrain
+    vectors of coefficients at once. Parameters are data that can be changed
+    between solves without rebuilding the program. Backends whose solutions
+    can be stored by sos4hjb.optimization.cache.SolveCache implement
+    _fingerprint_data() (dictionary of the canonical data of the program),
+    _primal_values() (flat array of the optimal decision variables), and
+    _restore_solution(minimum, values).
     '''
     
     def add_polynomial(self, basis, name='c'):
         coef = self.add_variables(len(basis), name)
-        poly = Polynomial(dict(zip(basis, coef)))
+        poly = Polynomial.from_basis(basis, coef)
         return  poly, coef
 
-    def add_sos_polynomial(self, basis, name='Q'):
-        gram, cons = self.add_psd_variable(len(basis), name)
+    def add_parametric_polynomial(self, basis, name='theta', value=None):
+        '''
+        Polynomial whose coefficients are parameters of the program, with the
+        given initial values. The coefficients can be changed later with
+        set_parameter_values, and the program solved again without being
+        rebuilt.
+        '''
+        coef = self.add_parameters(len(basis), name, value)
+        poly = Polynomial.from_basis(basis, coef)
+        return poly, coef
+
+    def add_sos_polynomial(self, basis, name='Q', cone='psd', change=None):
+        gram, cons = self._add_gram_variable(len(basis), name, cone, change)
         poly = Polynomial.quadratic_form(basis, gram)
         return poly, gram, cons
+
+    def _add_gram_variable(self, size, name, cone, change):
+        '''
+        Gram matrix constrained in the given cone: 'psd' (semidefinite), 'sdd'
+        (scaled diagonally dominant, SOCP), or 'dd' (diagonally dominant, LP).
+        If change is given, the Gram matrix is change' G change, with G in the
+        cone: this is the change of basis that refines the DSOS and SDSOS
+        inner approximations (see sos4hjb.optimization.dsos).
+        '''
+        gram, cons = self.add_psd_variable(size, name, cone)
+        if change is not None:
+            gram = change.T @ gram @ change
+        return gram, cons
     
-    def add_even_sos_polynomial(self, basis, name='Q'):
+    def add_even_sos_polynomial(self, basis, name='Q', cone='psd', changes=None):
 
         # Split basis in even and odd vectors.
         basis_e = [v for v in basis if v.is_even()]
         basis_o = [v for v in basis if v.is_odd()]
 
         # Add two separate SOS constraints.
-        poly_e, gram_e, cons_e = self.add_sos_polynomial(basis_e, name + '_{e}')
-        poly_o, gram_o, cons_o = self.add_sos_polynomial(basis_o, name + '_{o}')
+        change_e, change_o = [None] * 2 if changes is None else changes
+        poly_e, gram_e, cons_e = self.add_sos_polynomial(basis_e, name + '_{e}', cone, change_e)
+        poly_o, gram_o, cons_o = self.add_sos_polynomial(basis_o, name + '_{o}', cone, change_o)
 
         # Gather the outputs.
         poly = poly_e + poly_o
@@ -39,31 +80,94 @@ class SosProgramParent:
 
         return poly, gram, cons
         
-    def add_sos_constraint(self, p, name='Q'):
+    def add_symmetric_sos_polynomial(self, basis, blocks, name='Q', cone='psd', changes=None):
+        '''
+        SOS polynomial with block-diagonal Gram matrix in the symmetry-adapted
+        basis. Each block is a sparse matrix whose rows are the coefficients
+        of the symmetry-adapted polynomials in the given basis. Blocks that
+        select a subset of the basis use that subset directly.
+        '''
+        polys = []
+        gram = []
+        cons = []
+        changes = [None] * len(blocks) if changes is None else changes
+        for i, (block, change) in enumerate(zip(blocks, changes)):
+            block_name = name + f'_{{{i}}}'
+            rows, columns = block.nonzero()
+            if np.array_equal(rows, np.arange(block.shape[0])) and np.allclose(block.data, 1):
+                poly_i, gram_i, cons_i = self.add_sos_polynomial([basis[j] for j in columns], block_name, cone, change)
+            else:
+                gram_i, cons_i = self._add_gram_variable(block.shape[0], block_name, cone, change)
+                T = block.toarray() if isinstance(gram_i, np.ndarray) else block
+                poly_i = Polynomial.quadratic_form(basis, T.T @ gram_i @ T)
+            polys.append(poly_i)
+            gram.append(gram_i)
+            cons.append(cons_i)
+        return Polynomial._sum(polys), gram, cons
+
+    def add_sos_constraint(self, p, name='Q', newton_polytope=False, correlative_sparsity=False,
+                           symmetry_reduction=False, cone='psd', changes=None):
+        '''
+        Constrains p to be SOS. The options newton_polytope,
+        correlative_sparsity, and symmetry_reduction reduce the size of the
+        Gram matrices, cone selects the constraint on the Gram matrices (see
+        add_sos_polynomial), and changes are the optional changes of basis of
+        the Gram matrices, nested as the returned Gram matrices.
+        '''
 
         # Raise error if polynomial has odd degree.
         if p.degree() % 2:
             raise ValueError(f'SOS polynomials must have even degree, got degree {p.degree()}.')
 
         # Construct basis for auxiliary SOS polynomial. If the given polynomial
-        # has zero length then it is zero, and the basis is empty list.
+        # has zero length then it is zero, and the basis is empty list. With
+        # correlative sparsity, there is one basis per clique of variables.
         if len(p) == 0:
             raise ValueError(f'The given polynomial is zero, cannot add SOS constraint.')
         else:
             vector = p.vectors()[0]
             basis_degree = p.degree() // 2
-            basis = vector.construct_basis(p.variables(), basis_degree)
+            if correlative_sparsity:
+                cliques = correlative_cliques(p)
+            else:
+                cliques = [p.variables()]
+            bases = [vector.construct_basis(clique, basis_degree) for clique in cliques]
+
+        # Optionally remove the basis vectors that cannot appear in any SOS
+        # decomposition of the given polynomial.
+        if newton_polytope:
+            bases = [newton_polytope_basis(p, basis) for basis in bases]
 
-        # Exploit even symmetry if present.
-        if p.is_even():
-            p_sos, gram_sos, cons_sos = self.add_even_sos_polynomial(basis, name)
+        # Exploit the symmetries of p, or at least the even symmetry if present.
+        def add_sos_polynomial(basis, name, changes):
+            if symmetry_reduction:
+                blocks = symmetry_adapted_blocks(p, basis)
+                return self.add_symmetric_sos_polynomial(basis, blocks, name, cone, changes)
+            elif p.is_even():
+                return self.add_even_sos_polynomial(basis, name, cone, changes)
+            return self.add_sos_polynomial(basis, name, cone, changes)
+        if correlative_sparsity:
+            changes = [None] * len(bases) if changes is None else changes
+            sos = [add_sos_polynomial(basis, name + f'_{{{i}}}', change) for i, (basis, change) in enumerate(zip(bases, changes))]
+            p_sos = Polynomial._sum([s[0] for s in sos])
+            gram_sos = [s[1] for s in sos]
+            cons_sos = [s[2] for s in sos]
         else:
-            p_sos, gram_sos, cons_sos = self.add_sos_polynomial(basis, name)
+            p_sos, gram_sos, cons_sos = add_sos_polynomial(bases[0], name, changes)
 
         # Constrain the coefficients of the given and auxiliary polynomials.
-        p_diff = p - p_sos
-        cons_eq = [coef == 0 for coef in p_diff.coefficients()]
-        for cons in cons_eq:
-            self.add_linear_constraint(cons)
+        cons_eq = self.add_zero_polynomial_constraint(p - p_sos)
 
         return p_sos, gram_sos, cons_sos, cons_eq
+
+    def add_zero_polynomial_constraint(self, p):
+        '''
+        Constrains all the coefficients of p to be zero. If the coefficients
+        are a vector expression, this is done with a single vector equality.
+        Returns the list of constraints added to the program.
+        '''
+        coefs = p.to_arrays()[1]
+        cons_eq = [coefs == 0] if is_expression(coefs) else [coef == 0 for coef in coefs]
+        for cons in cons_eq:
+            self.add_linear_constraint(cons)
+        return cons_eq
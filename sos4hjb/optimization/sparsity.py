@@ -0,0 +1,62 @@
+'''
+Correlative sparsity of SOS constraints. Two variables interact if they appear
+together in a term of the polynomial. If the interaction graph is chordal with
+maximal cliques C_1, ..., C_k, the polynomial is searched as a sum of SOS
+polynomials in the variables of each clique, which replaces one large Gram
+matrix with k small ones.
+'''
+
+import numpy as np
+
+from sos4hjb.polynomials.terms import sort_variables
+
+def correlative_sparsity_graph(p):
+    '''
+    Adjacency sets of the interaction graph of the variables of p.
+    '''
+    variables = p.variables()
+    powers = p.to_arrays()[0]
+    graph = {v: set() for v in variables}
+    for row in np.unique(powers > 0, axis=0):
+        term_variables = [v for v, used in zip(variables, row) if used]
+        for v in term_variables:
+            graph[v].update(term_variables)
+            graph[v].discard(v)
+    return graph
+
+def chordal_extension(graph):
+    '''
+    Chordal extension of the graph computed with the greedy minimum-degree
+    elimination ordering. Returns the extended graph and the cliques that are
+    formed when eliminating each vertex.
+    '''
+    extension = {v: set(neighbors) for v, neighbors in graph.items()}
+    remaining = {v: set(neighbors) for v, neighbors in graph.items()}
+    cliques = []
+    while remaining:
+        v = min(remaining, key=lambda v: (len(remaining[v]), v.name, v.index))
+        neighbors = remaining.pop(v)
+        for u in neighbors:
+            remaining[u] |= neighbors - {u}
+            remaining[u].discard(v)
+            extension[u] |= neighbors - {u}
+        cliques.append({v} | neighbors)
+    return extension, cliques
+
+def maximal_cliques(cliques):
+    '''
+    Removes the cliques that are contained in other ones.
+    '''
+    maximal = []
+    for clique in sorted(cliques, key=len, reverse=True):
+        if not any(clique <= other for other in maximal):
+            maximal.append(clique)
+    return maximal
+
+def correlative_cliques(p):
+    '''
+    Maximal cliques of the chordal extension of the interaction graph of p,
+    each one given as a sorted list of variables.
+    '''
+    cliques = chordal_extension(correlative_sparsity_graph(p))[1]
+    return sorted([list(sort_variables(c)) for c in maximal_cliques(cliques)], key=lambda c: [(v.name, v.index) for v in c])
@@ -0,0 +1,159 @@
+'''
+Symmetry reduction of SOS constraints. If p is invariant under a group of
+linear changes of variables, the Gram matrix can be taken invariant too, and
+in a symmetry-adapted basis it becomes block diagonal, with one block per
+isotypic component. The groups considered here are abelian and generated by
+involutions: sign flips of subsets of the variables (which generalize the
+even/odd splitting) and permutations of the variables that swap identical
+subsystems.
+'''
+
+import itertools
+import numpy as np
+import scipy.sparse as sp
+
+from sos4hjb.polynomials import Polynomial
+from sos4hjb.polynomials.terms import (sort_variables, align_powers,
+                                       lexsort_terms, is_numeric)
+
+def sign_symmetries(p):
+    '''
+    Generators of the group of sign flips that leave p invariant. Each row of
+    the returned binary matrix is the set of variables (ordered as
+    p.variables()) whose sign is flipped. Since the basis vector with powers
+    a changes by (-1)^(s' a) under the flip s, the generators span the null
+    space modulo 2 of the parities of the powers of p. This is structural and
+    holds also if the coefficients of p are decision variables.
+    '''
+    parities = p.to_arrays()[0] % 2
+    return _null_space_mod2(parities)
+
+def permutation_symmetries(p):
+    '''
+    Involutive permutations of the variables that leave p invariant, each one
+    given as a dictionary that maps every permuted variable to its image. The
+    candidates are the transpositions of two variables and the swaps of two
+    indices in all the multivariate names that have both. Permutations can
+    be verified only if the coefficients of p are numeric, otherwise none is
+    returned.
+    '''
+    powers, coefs = p.to_arrays()
+    if not is_numeric(coefs):
+        return []
+    variables = p.variables()
+    candidates = [{u: v, v: u} for u, v in itertools.combinations(variables, 2)]
+    indices = sorted(set(v.index for v in variables))
+    for i, j in itertools.combinations(indices, 2):
+        swap = {}
+        for u in variables:
+            if u.index == i:
+                for v in variables:
+                    if v.name == u.name and v.index == j:
+                        swap.update({u: v, v: u})
+        if len(swap) > 2:
+            candidates.append(swap)
+    position = {v: k for k, v in enumerate(variables)}
+    order = lexsort_terms(powers)
+    symmetries = []
+    for permutation in candidates:
+        columns = _column_permutation(permutation, position)
+        permuted = powers[:, columns]
+        permuted_order = lexsort_terms(permuted)
+        if np.array_equal(powers[order], permuted[permuted_order]) and np.allclose(coefs[order], coefs[permuted_order]):
+            symmetries.append(permutation)
+    return symmetries
+
+def symmetry_adapted_blocks(p, basis):
+    '''
+    Decomposes the span of the given basis in the isotypic components of the
+    symmetry group of p. Returns a list of sparse matrices T with orthonormal
+    rows, one per component: the rows of T are the coefficients of the
+    symmetry-adapted polynomials in the given basis. The permutations that do
+    not map the basis onto itself, or that do not commute with the sign flips
+    and with the permutations already selected, are discarded.
+    '''
+    if len(basis) == 0:
+        return []
+
+    # Powers of the basis with the columns ordered as p.variables().
+    basis_variables, powers = Polynomial._basis_arrays(basis)[1:]
+    variables = sort_variables(list(basis_variables) + p.variables())
+    powers = align_powers(powers, basis_variables, variables)
+    flips = align_powers(sign_symmetries(p), p.variables(), variables)
+    signatures = [tuple(s) for s in powers % 2 @ flips.T % 2]
+
+    # Permutations of the basis vectors induced by the symmetries of p.
+    position = {v: k for k, v in enumerate(variables)}
+    index = {tuple(power): i for i, power in enumerate(powers)}
+    permutations = []
+    selected = []
+    for permutation in permutation_symmetries(p):
+        columns = _column_permutation(permutation, position)
+        image = [index.get(tuple(power)) for power in powers[:, columns]]
+        if None in image or any(signatures[i] != signatures[j] for i, j in enumerate(image)):
+            continue
+        if all(_commute(permutation, other) for other in selected):
+            selected.append(permutation)
+            permutations.append(np.array(image))
+
+    # Elements of the group generated by the selected permutations, and the
+    # values of the characters on them.
+    elements = [np.arange(len(basis))]
+    exponents = [()]
+    for image in permutations:
+        elements = elements + [image[e] for e in elements]
+        exponents = [e + (0,) for e in exponents] + [e + (1,) for e in exponents]
+    characters = list(itertools.product((1, - 1), repeat=len(permutations)))
+
+    # Projection of one representative per orbit on each character.
+    blocks = {}
+    visited = np.zeros(len(basis), dtype=bool)
+    for i in range(len(basis)):
+        if visited[i]:
+            continue
+        orbit = [e[i] for e in elements]
+        visited[orbit] = True
+        for character in characters:
+            row = np.zeros(len(basis))
+            for j, exponent in zip(orbit, exponents):
+                row[j] += np.prod([c for c, e in zip(character, exponent) if e])
+            norm = np.linalg.norm(row)
+            if norm > 0:
+                blocks.setdefault((signatures[i], character), []).append(row / norm)
+    return [sp.csr_matrix(np.array(blocks[key])) for key in sorted(blocks)]
+
+def _null_space_mod2(A):
+    A = np.array(A, dtype=int) % 2
+    n = A.shape[1]
+    pivots = []
+    row = 0
+    for column in range(n):
+        nonzero = np.flatnonzero(A[row:, column]) + row
+        if len(nonzero) == 0:
+            continue
+        A[[row, nonzero[0]]] = A[[nonzero[0], row]]
+        others = np.flatnonzero(A[:, column])
+        others = others[others != row]
+        A[others] = (A[others] + A[row]) % 2
+        pivots.append(column)
+        row += 1
+        if row == A.shape[0]:
+            break
+    free = [c for c in range(n) if c not in pivots]
+    null_space = np.zeros((len(free), n), dtype=int)
+    for k, c in enumerate(free):
+        null_space[k, c] = 1
+        for r, pivot in enumerate(pivots):
+            null_space[k, pivot] = A[r, c]
+    return null_space
+
+def _column_permutation(permutation, position):
+    columns = np.arange(len(position))
+    for u, v in permutation.items():
+        columns[position[u]] = position[v]
+    return columns
+
+def _commute(permutation1, permutation2):
+    variables = set(permutation1) | set(permutation2)
+    compose = lambda f, g, v: f.get(g.get(v, v), g.get(v, v))
+    return all(compose(permutation1, permutation2, v) == compose(permutation2, permutation1, v) for v in variables)
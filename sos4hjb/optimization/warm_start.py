@@ -0,0 +1,62 @@
+'''
+Lifting of the solution of an SOS program into the decision variables of a
+program with larger bases (e.g. the next degree of a sweep), to warm start
+its solution. The lifted point is the initial primal point of SCS in the
+conic backend, and the initial guess of Drake. The cvx backend ignores it.
+'''
+
+import numpy as np
+
+from sos4hjb.polynomials import Polynomial, ChebyshevVector
+from sos4hjb.polynomials.terms import sort_variables, unique_terms
+
+def lift_coefficients(p, q):
+    '''
+    Coefficients of the decision polynomial p (ordered as in p.to_arrays())
+    that make it equal to the numeric polynomial q. The terms of q must be
+    terms of p.
+    '''
+    if len(q) == 0:
+        return np.zeros(len(p))
+    if q.vector_type is not p.vector_type:
+        q = q.in_chebyshev_basis() if p.vector_type is ChebyshevVector else q.in_monomial_basis()
+    variables = sort_variables(p.variables() + q.variables())
+    powers_p = p.to_arrays(variables)[0]
+    powers_q, coefs_q = q.to_arrays(variables)
+    inverse = unique_terms(np.vstack((powers_p, powers_q)))[1]
+    position = {key: i for i, key in enumerate(inverse[:len(powers_p)])}
+    missing = [k for k in inverse[len(powers_p):] if k not in position]
+    if missing:
+        raise ValueError(f'{len(missing)} terms of the given polynomial are not terms of the decision polynomial.')
+    lifted = np.zeros(len(powers_p))
+    lifted[[position[k] for k in inverse[len(powers_p):]]] = coefs_q
+    return lifted
+
+def lift_gram(gram, basis, new_basis):
+    '''
+    Embeds the Gram matrix associated with basis in the Gram matrix of
+    new_basis (a superset of basis), with zeros in the new rows and columns.
+    '''
+    index = {v: i for i, v in enumerate(new_basis)}
+    missing = [v for v in basis if v not in index]
+    if missing:
+        raise ValueError(f'basis vectors {missing} are not in the new basis.')
+    rows = [index[v] for v in basis]
+    lifted = np.zeros((len(new_basis), len(new_basis)))
+    lifted[np.ix_(rows, rows)] = gram
+    return lifted
+
+def warm_start_pairs(warm_start):
+    '''
+    Converts a list of pairs (decision, value), where decision is either a
+    decision polynomial with numeric value, or a vector or matrix of decision
+    variables with array value, into pairs of decision variables and arrays.
+    '''
+    pairs = []
+    for decision, value in warm_start:
+        if isinstance(decision, Polynomial):
+            if isinstance(value, Polynomial):
+                value = lift_coefficients(decision, value)
+            decision = decision.to_arrays()[1]
+        pairs.append((decision, np.asarray(value, dtype=float)))
+    return pairs
@@ -1,27 +1,40 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from sos4hjb.polynomials import Variable
+
 def level_plot(y, x_min, x_max, xlabel=r'$x_1$', ylabel=r'$x_2$', zlabel=None,
-    title=None, file_name=None):
-    
+    title=None, file_name=None, variables=None, resolution=101):
+    '''
+    Level plot of the polynomial y of two variables on the box x_min <= x <=
+    x_max. The variables associated with the horizontal and the vertical
+    axes are given by variables (by default, those of y sorted by name and
+    index), and the box is gridded with resolution points per side. If y
+    depends on fewer than two variables (e.g. a section of a polynomial
+    that does not depend on one of the remaining variables), the missing
+    axes are associated with variables y does not depend on. Pass variables
+    to fix which axis is which in this case.
+    '''
+
     # Grid state space.
-    n = 101
-    x1 = np.linspace(x_min[0], x_max[0], n)
-    x2 = np.linspace(x_min[1], x_max[1], n)
+    if variables is None:
+        variables = y.variables()
+        variables += [Variable('_level_plot', i) for i in range(len(variables), 2)]
+    if len(variables) != 2:
+        raise ValueError(f'level plots require 2 variables, got {len(variables)}.')
+    x1 = np.linspace(x_min[0], x_max[0], resolution)
+    x2 = np.linspace(x_min[1], x_max[1], resolution)
     X1, X2 = np.meshgrid(x1, x2)
-    
-    # Evaluate function on grid.
-    Y = np.empty(X1.shape)
-    for i in range(n):
-        for j in range(n):
-            xij = np.array([X1[i, j], X2[i, j]])
-            Y[i, j] = y(dict(zip(y.variables(), xij)))
-            
+
+    # Evaluate function on grid in a single batch, the rows of the grid are
+    # associated with the second variable.
+    Y = y.evaluate_grid([x2, x1], variables[::-1])
+
     # Plot the function.
     contours = plt.contour(X1, X2, Y, colors='black')
     plt.clabel(contours, fontsize=8)
     extent = np.vstack((x_min, x_max)).T.flatten()
-    plt.imshow(np.flip(Y, axis=1), extent=extent, cmap='RdGy', alpha=.5)
+    plt.imshow(Y, extent=extent, origin='lower', cmap='RdGy', alpha=.5)
 
     # Color bar.
     cbar = plt.colorbar()
@@ -3,3 +3,4 @@ from .basis_vector import BasisVector
 from .monomial_vector import MonomialVector
 from .chebyshev_vector import ChebyshevVector
 from .polynomial import Polynomial
+from .basis_index import BasisIndex
@@ -0,0 +1,140 @@
+import numpy as np
+import scipy.sparse as sp
+
+import sos4hjb.polynomials as poly
+from sos4hjb.polynomials.terms import align_powers, is_expression
+from sos4hjb.polynomials.enumeration import (basis_size, rank_powers,
+                                             unrank_powers)
+
+class BasisIndex:
+    '''
+    Index of the basis vectors of construct_basis(variables, degree, even,
+    odd), that maps each row of powers to its position in the basis in
+    closed form (combinatorial number system) and vice versa, without
+    storing the basis. Polynomials in these variables can be represented as
+    dense vectors of coefficients aligned to the basis, or as sparse vectors
+    (positions and coefficients), so that sums and coefficient matching are
+    array operations.
+
+    Attributes
+    ----------
+    vector_type : type (subclass of BasisVector)
+        Type of the basis vectors.
+    variables : tuple (of Variable)
+        Variables in the order used by construct_basis.
+    degree : int
+        Maximum total degree of the basis vectors.
+    even, odd : bool
+        Whether the basis vectors of even and odd degree are in the basis.
+    '''
+
+    def __init__(self, vector_type, variables, degree, even=True, odd=True):
+        vector_type._verify_power(degree)
+        if len(set(variables)) != len(variables):
+            raise ValueError(f'variables must be distinct, got {variables}.')
+        self.vector_type = vector_type
+        self.variables = tuple(variables)
+        self.degree = int(degree)
+        self.even = even
+        self.odd = odd
+
+    def __len__(self):
+        return basis_size(len(self.variables), self.degree, self.even, self.odd)
+
+    def __iter__(self):
+        return self.vector_type.iterate_basis(self.variables, self.degree, self.even, self.odd)
+
+    def __contains__(self, vector):
+        if not isinstance(vector, self.vector_type):
+            return False
+        try:
+            self.index(vector)
+        except ValueError:
+            return False
+        return True
+
+    def __eq__(self, other):
+        return isinstance(other, BasisIndex) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def _key(self):
+        return self.vector_type, self.variables, self.degree, self.even, self.odd
+
+    def rank(self, powers, variables=None):
+        '''
+        Positions in the basis of the rows of powers, whose columns are
+        associated with the given variables (by default, self.variables).
+        '''
+        if variables is None:
+            variables = self.variables
+        missing = set(variables) - set(self.variables)
+        powers = np.array(powers, dtype=int).reshape(len(powers), len(variables))
+        if missing:
+            if np.any(powers[:, [i for i, v in enumerate(variables) if v in missing]]):
+                raise ValueError(f'powers depend on variables {missing} that are not indexed.')
+            kept = [i for i, v in enumerate(variables) if v not in missing]
+            powers, variables = powers[:, kept], [variables[i] for i in kept]
+        powers = align_powers(powers, tuple(variables), self.variables)
+        return rank_powers(powers, self.degree, self.even, self.odd)
+
+    def index(self, vector):
+        variables = list(vector.power_dict)
+        return int(self.rank([[vector.power_dict[v] for v in variables]], variables)[0])
+
+    def powers(self, ranks=None):
+        '''
+        Rows of powers (columns associated with self.variables) in the given
+        positions of the basis, by default all of them.
+        '''
+        if ranks is None:
+            ranks = np.arange(len(self))
+        return unrank_powers(ranks, len(self.variables), self.degree, self.even, self.odd)
+
+    def vectors(self, ranks):
+        return [self.vector_type(dict(zip(self.variables, row))) for row in self.powers(ranks).tolist()]
+
+    def to_sparse(self, p):
+        '''
+        Positions (in increasing order) and coefficients of the terms of the
+        polynomial p. Raises a ValueError if a term is not in the basis.
+        '''
+        self._verify_polynomial(p)
+        powers, coefs = p.to_arrays()
+        ranks = self.rank(powers, p.variables())
+        order = np.argsort(ranks)
+        if is_expression(coefs):
+            return ranks[order], self._selection(np.arange(len(order)), order, len(order)) @ coefs
+        return ranks[order], coefs[order]
+
+    def to_dense(self, p):
+        '''
+        Vector of the coefficients of p aligned to the basis. If the
+        coefficients of p are a vector expression (e.g. a cvxpy Variable), the
+        returned vector is a vector expression too.
+        '''
+        self._verify_polynomial(p)
+        powers, coefs = p.to_arrays()
+        ranks = self.rank(powers, p.variables())
+        if is_expression(coefs):
+            return self._selection(ranks, np.arange(len(ranks)), len(self)) @ coefs
+        dense = np.zeros(len(self), dtype=coefs.dtype)
+        dense[ranks] = coefs
+        return dense
+
+    def from_sparse(self, ranks, coefs):
+        return poly.Polynomial.from_arrays(self.vector_type, self.variables, self.powers(ranks), coefs)
+
+    def from_dense(self, coefs):
+        if coefs.shape[0] != len(self):
+            raise ValueError(f'got {coefs.shape[0]} coefficients for a basis of size {len(self)}.')
+        return poly.Polynomial.from_arrays(self.vector_type, self.variables, self.powers(), coefs)
+
+    def _verify_polynomial(self, p):
+        if len(p) > 0 and p.vector_type is not self.vector_type:
+            raise TypeError(f'polynomial has basis vectors of type {p.vector_type.__name__}, index has {self.vector_type.__name__}.')
+
+    @staticmethod
+    def _selection(rows, columns, size):
+        return sp.csr_matrix((np.ones(len(columns)), (rows, columns)), (size, len(columns)))
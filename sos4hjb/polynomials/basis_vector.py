@@ -1,28 +1,60 @@
 from math import prod
-from itertools import combinations
 from numbers import Number
+from types import MappingProxyType
+from weakref import WeakValueDictionary
+import numpy as np
 
 import sos4hjb.polynomials as poly
+from sos4hjb.polynomials.terms import unique_terms
+from sos4hjb.polynomials.enumeration import graded_powers
 
 class BasisVector:
     '''
-    Element of the basis of a polynomial. Written in such a way that power_dict
-    never contains an item with value equal to zero.
+    Element of the basis of a polynomial. Basis vectors are immutable and
+    interned: constructing a vector with the same type and powers as an
+    existing one returns the existing object, hence equality is identity.
+    Written in such a way that no power is equal to zero, and the variables
+    are sorted by name and index.
 
     Attributes
     ----------
-    power_dict : dict (key : Variable, value : int)
-        Dictionary that maps each variable to its power.
+    _variables : tuple (of Variable)
+        Variables with nonzero power, sorted by name and index.
+    _powers : tuple (of int)
+        Power of each variable.
     _hash : int
         Stored (and not computed on the fly) to accelerate comparisons.
+    _table : WeakValueDictionary
+        Table of the existing vectors, keyed by type, variables, and powers.
     '''
-    
-    def __init__(self, power_dict):
+
+    __slots__ = ('_variables', '_powers', '_hash', '__weakref__')
+    _table = WeakValueDictionary()
+
+    def __new__(cls, power_dict):
         for variable, power in power_dict.items():
-            self._verify_variable(variable)
-            self._verify_power(power)
-        self.power_dict = {v: p for v, p in power_dict.items() if p != 0}
-        self._hash = self._do_hash()
+            cls._verify_variable(variable)
+            cls._verify_power(power)
+        items = sorted(((v, int(p)) for v, p in power_dict.items() if p != 0),
+                       key=lambda item: (item[0].name, item[0].index))
+        variables = tuple(v for v, p in items)
+        powers = tuple(p for v, p in items)
+        key = (cls, variables, powers)
+        vector = cls._table.get(key)
+        if vector is None:
+            vector = object.__new__(cls)
+            object.__setattr__(vector, '_variables', key[1])
+            object.__setattr__(vector, '_powers', key[2])
+            object.__setattr__(vector, '_hash', hash(key))
+            cls._table[key] = vector
+        return vector
+
+    def __setattr__(self, attribute, value):
+        raise AttributeError(f'{type(self).__name__} is immutable.')
+
+    @property
+    def power_dict(self):
+        return MappingProxyType(dict(self))
 
     def __call__(self, evaluation_dict):
         return prod(self._call_univariate(p, evaluation_dict[v]) for v, p in self)
@@ -34,36 +66,42 @@ class BasisVector:
 
     def __getitem__(self, variable):
         self._verify_variable(variable)
-        return self.power_dict[variable] if variable in self.power_dict else 0
-        
-    def __setitem__(self, variable, power):
+        for v, p in self:
+            if v is variable:
+                return p
+        return 0
+
+    def replace(self, variable, power):
+        '''
+        Basis vector equal to this one, but with the given power of the
+        given variable.
+        '''
         self._verify_variable(variable)
-        self._verify_power(power)
-        if power == 0:
-            self.power_dict.pop(variable, None)
-        else:
-            self.power_dict[variable] = power
-        self._hash = self._do_hash() 
+        return type(self)({**dict(self), variable: power})
 
     def __hash__(self):
         return self._hash
 
     def __eq__(self, vector):
-        return self._hash == vector._hash
+        return self is vector
     
     def __ne__(self, vector):
-        return not self == vector
+        return self is not vector
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
 
-    def _do_hash(self):
-        hash_list = sorted((v.name, v.index, p) for v, p in self)
-        hash_list.append(type(self).__name__)
-        return hash(tuple(hash_list))
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __len__(self):
-        return len(self.power_dict)
+        return len(self._variables)
 
     def __iter__(self):
-        return iter(self.power_dict.items())
+        return zip(self._variables, self._powers)
 
     def __repr__(self):
         if len(self) == 0:
@@ -74,10 +112,10 @@ class BasisVector:
         return '$' + self.__repr__() + '$'
 
     def variables(self):
-        return list(self.power_dict)
+        return list(self._variables)
 
     def powers(self):
-        return list(self.power_dict.values())
+        return list(self._powers)
 
     def degree(self):
         return sum(self.powers())
@@ -98,24 +136,52 @@ class BasisVector:
             raise TypeError(f'cannot make a polynomial out of a {type(other).__name__}.')
 
     @classmethod
-    def _vectors_of_degree(cls, variables, degree):
-        positions = len(variables) + degree - 1
-        breaks = len(variables) - 1
-        vectors = []
-        for c in combinations(range(positions), breaks):
-            c = (- 1, *c, positions)
-            powers = [p - q - 1 for q, p in zip(c, c[1:])]
-            vectors.append(cls(dict(zip(variables, powers))))
-        return vectors
+    def _multiply_terms(cls, variables, powers1, powers2):
+        '''
+        Lists the elementary products needed to multiply two polynomials with
+        the given matrices of powers (columns associated with variables).
+
+        Returns
+        -------
+        powers : numpy.ndarray
+            Distinct powers of the basis vectors of the product.
+        left, right : numpy.ndarray
+            Rows of powers1 and powers2 multiplied in each elementary product.
+        groups : numpy.ndarray
+            Row of powers each elementary product contributes to.
+        weights : numpy.ndarray
+            Coefficient of each elementary product.
+
+        This default implementation multiplies the basis vectors pairwise,
+        derived classes override it with vectorized kernels.
+        '''
+        vectors1 = [cls(dict(zip(variables, row))) for row in powers1.tolist()]
+        vectors2 = [cls(dict(zip(variables, row))) for row in powers2.tolist()]
+        rows, left, right, weights = [], [], [], []
+        for i, v1 in enumerate(vectors1):
+            for j, v2 in enumerate(vectors2):
+                p_powers, p_coefs = (v1 * v2).to_arrays(variables)
+                rows.append(p_powers)
+                left += [i] * len(p_coefs)
+                right += [j] * len(p_coefs)
+                weights.append(p_coefs)
+        powers, groups = unique_terms(np.vstack(rows))
+        return powers, np.array(left), np.array(right), groups, np.concatenate(weights)
 
     @classmethod
-    def construct_basis(cls, variables, degree, even=True, odd=True):
+    def iterate_basis(cls, variables, degree, even=True, odd=True):
+        '''
+        Generator of the basis vectors of construct_basis, whose powers are
+        enumerated lazily in blocks.
+        '''
         cls._verify_power(degree)
-        vectors = []
-        for d in range(degree + 1):
-            if (even and d % 2 == 0) or (odd and d % 2):
-                vectors += cls._vectors_of_degree(variables, d)
-        return vectors
+        for powers in graded_powers(len(variables), int(degree), even, odd):
+            for row in powers.tolist():
+                yield cls(dict(zip(variables, row)))
+
+    @classmethod
+    def construct_basis(cls, variables, degree, even=True, odd=True):
+        return list(cls.iterate_basis(variables, degree, even, odd))
 
     @staticmethod
     def _repr(variable, power):
@@ -1,9 +1,9 @@
 from math import cos, acos, cosh, acosh
-from copy import deepcopy
-from itertools import product
+import numpy as np
 from numpy.polynomial.chebyshev import cheb2poly
 
 import sos4hjb.polynomials as poly
+from sos4hjb.polynomials.terms import unique_terms, tabulated_univariate
 
 class ChebyshevVector(poly.BasisVector):
     '''
@@ -11,19 +11,36 @@ class ChebyshevVector(poly.BasisVector):
     T_p1(v1) * T_p2(v2) * ... * T_pn(vn).
     '''
 
-    def __init__(self, power_dict):
-        super().__init__(power_dict)
+    __slots__ = ()
 
     def __mul__(self, cheb):
         self._verify_multiplicand(cheb)
-        variables = set(self.variables() + cheb.variables())
-        prod_powers = ((self[v] + cheb[v], abs(self[v] - cheb[v])) for v in variables)
-        coef = .5 ** len(variables)
-        multiplication = poly.Polynomial({})
-        for powers in product(*prod_powers):
-            cheb = ChebyshevVector(dict(zip(variables, powers)))
-            multiplication += poly.Polynomial({cheb: coef})
-        return multiplication
+        return poly.Polynomial({self: 1}) * poly.Polynomial({cheb: 1})
+
+    @staticmethod
+    def _multiply_terms(variables, powers1, powers2):
+        '''
+        Vectorized multiplication based on T_a T_b = (T_{a+b} + T_{|a-b|}) / 2,
+        applied one variable at a time to all the pairs of terms at once. Each
+        elementary product is split in two for every variable that has nonzero
+        power in both factors.
+        '''
+        left, right = [i.reshape(-1) for i in np.indices((len(powers1), len(powers2)))]
+        powers = powers1[left] + powers2[right]
+        weights = np.ones(len(left))
+        for j in range(powers.shape[1]):
+            a = powers1[left, j]
+            b = powers2[right, j]
+            split = np.flatnonzero((a > 0) & (b > 0))
+            difference = powers[split]
+            difference[:, j] = abs(a[split] - b[split])
+            weights[split] *= .5
+            powers = np.vstack((powers, difference))
+            left = np.concatenate((left, left[split]))
+            right = np.concatenate((right, right[split]))
+            weights = np.concatenate((weights, weights[split]))
+        powers, groups = unique_terms(powers)
+        return powers, left, right, groups, weights
 
     def derivative(self, variable):
         '''
@@ -35,20 +52,14 @@ class ChebyshevVector(poly.BasisVector):
         derivative = poly.Polynomial({})
         for q in range(power):
             if power % 2 ^ q % 2:
-                cheb = deepcopy(self)
-                cheb[variable] = q
-                derivative[cheb] = power if q == 0 else power * 2
+                derivative[self.replace(variable, q)] = power if q == 0 else power * 2
         return derivative
 
     def integral(self, variable):
         power = self[variable]
         integral = poly.Polynomial({})
-        cheb = deepcopy(self)
-        cheb[variable] = power + 1
-        integral[cheb] = .5 / (1 + power)
-        cheb = deepcopy(self)
-        cheb[variable] = abs(power - 1)
-        integral[cheb] += .25 if power == 1 else .5 / (1 - power)
+        integral[self.replace(variable, power + 1)] = .5 / (1 + power)
+        integral[self.replace(variable, abs(power - 1))] += .25 if power == 1 else .5 / (1 - power)
         return integral
 
     def in_monomial_basis(self):
@@ -59,11 +70,72 @@ class ChebyshevVector(poly.BasisVector):
             res *= poly.Polynomial(dict(zip(basis, c)))
         return res
 
+    @staticmethod
+    def _derivative_univariate(powers):
+        '''
+        Vectorized version of derivative: the derivative of T_p is the sum of
+        2 * p * T_q for all q < p with p - q odd (halved for q = 0).
+        '''
+        counts = (powers + 1) // 2
+        terms = np.repeat(np.arange(len(powers)), counts)
+        offsets = np.arange(len(terms)) - np.repeat(np.cumsum(counts) - counts, counts)
+        column = powers[terms] - 1 - 2 * offsets
+        weights = np.where(column == 0, 1, 2) * powers[terms]
+        return terms, column, weights
+
+    @staticmethod
+    def _integral_univariate(powers):
+        '''
+        Vectorized version of integral: the integral of T_p is
+        T_{p+1} / (2 * (p + 1)) - T_{|p-1|} / (2 * (p - 1)), with the second
+        coefficient equal to 1 / 4 for p = 1.
+        '''
+        terms = np.arange(len(powers))
+        denominators = np.where(powers == 1, 2, 1 - powers)
+        terms = np.concatenate((terms, terms))
+        column = np.concatenate((powers + 1, abs(powers - 1)))
+        weights = np.concatenate((.5 / (1 + powers), .5 / denominators))
+        return terms, column, weights
+
     @staticmethod
     def _repr(variable, power):
         assert power != 0
         return f'T_{{{power}}}({variable})'
 
+    @staticmethod
+    def _basis_change_univariate(vector_type):
+        if vector_type != poly.MonomialVector:
+            raise TypeError(f'cannot express ChebyshevVector in terms of {vector_type.__name__}.')
+        return lambda powers: tabulated_univariate(powers, lambda p: cheb2poly([0] * p + [1]))
+
+    @staticmethod
+    def _univariate_table(values, degree):
+        '''
+        Table (len(values) x degree + 1) of the Chebyshev polynomials evaluated
+        at the given values, computed with the three-term recurrence
+        T_{p+1}(x) = 2 x T_p(x) - T_{p-1}(x).
+        '''
+        table = np.ones((len(values), degree + 1), dtype=values.dtype)
+        if degree > 0:
+            table[:, 1] = values
+        for p in range(2, degree + 1):
+            table[:, p] = 2 * values * table[:, p - 1] - table[:, p - 2]
+        return table
+
+    @classmethod
+    def _univariate_moments(cls, degree, lb, ub):
+        '''
+        Integrals of T_0, ..., T_degree over the interval [lb, ub], from the
+        primitive T_{p+1} / (2 * (p + 1)) - T_{|p-1|} / (2 * (p - 1)), where
+        the second term is dropped for p = 1.
+        '''
+        table = cls._univariate_table(np.array([lb, ub], dtype=float), degree + 1)
+        delta = table[1] - table[0]
+        powers = np.arange(degree + 1)
+        moments = delta[powers + 1] / (2 * (powers + 1))
+        denominators = np.where(powers == 1, np.inf, 2 * (powers - 1))
+        return moments - delta[abs(powers - 1)] / denominators
+
     @staticmethod
     def _call_univariate(power, variable):
         if abs(variable) <= 1:
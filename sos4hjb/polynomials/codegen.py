@@ -0,0 +1,139 @@
+'''
+Generation of straight-line Python code for the fast evaluation of
+polynomials with numeric coefficients. A polynomial is written as a
+univariate polynomial in its first variable, whose coefficients are
+polynomials in the remaining variables, and so on recursively. Univariate
+polynomials are evaluated with the Horner scheme (monomial basis) or with the
+Clenshaw recurrence (Chebyshev basis). Identical coefficient polynomials,
+within one polynomial or across the polynomials compiled together, are
+evaluated once and shared.
+
+The generated functions take a sequence with one value per variable. Values
+can also be numpy arrays of the same shape, in which case the polynomials are
+evaluated elementwise.
+'''
+
+import numpy as np
+
+import sos4hjb.polynomials as poly
+from sos4hjb.polynomials.terms import is_numeric
+
+class _Emitter:
+    '''
+    Accumulates the lines of code that evaluate the recursive representation
+    of the given polynomials.
+
+    Attributes
+    ----------
+    vector_type : type (subclass of BasisVector)
+        Type of the basis vectors of the polynomials.
+    lines : list (of str)
+        Lines of code generated so far.
+    memo : dict
+        Maps each coefficient polynomial already evaluated (identified by the
+        level of the recursion, its powers, and its coefficients) to the name
+        of the local variable that stores its value.
+    '''
+
+    def __init__(self, vector_type, n):
+        self.vector_type = vector_type
+        # Arithmetic on Python floats is much faster than on numpy scalars.
+        self.lines = ['if type(x) is np.ndarray and x.ndim == 1: x = x.tolist()']
+        if n > 0:
+            self.lines.append(', '.join(f'x{j}' for j in range(n)) + (', = x' if n == 1 else ' = x'))
+        if vector_type is poly.ChebyshevVector:
+            self.lines += [f'y{j} = 2 * x{j}' for j in range(n)]
+        self.memo = {}
+
+    def _temporary(self):
+        return f't{len(self.memo)}'
+
+    def emit(self, powers, coefs, j=0):
+        '''
+        Returns the expression (a literal or the name of a local variable)
+        that evaluates to the polynomial with the given powers (columns j, j +
+        1, ... only) and coefficients.
+        '''
+        if len(coefs) == 0:
+            return '0.0'
+        if j == powers.shape[1]:
+            return repr(float(coefs.sum()))
+        column = powers[:, j]
+        if not column.any():
+            return self.emit(powers, coefs, j + 1)
+        key = (j, powers[:, j:].tobytes(), powers.shape, coefs.tobytes())
+        if key in self.memo:
+            return self.memo[key]
+        degree = column.max()
+        sub = [self.emit(powers[column == k], coefs[column == k], j + 1) for k in range(degree + 1)]
+        name = self._temporary()
+        self.memo[key] = name
+        if self.vector_type is poly.ChebyshevVector:
+            self._clenshaw(name, sub, j)
+        else:
+            self._horner(name, sub, j)
+        return name
+
+    def _horner(self, name, sub, j):
+        # Nested in a single expression, split every few levels to respect the
+        # nesting limit of the parser.
+        expression = sub[-1]
+        for k, c in enumerate(reversed(sub[:-1])):
+            if k % 50 == 49:
+                self.lines.append(f'{name} = {expression}')
+                expression = name
+            factor = f'x{j}' if expression == '1.0' else f'({expression}) * x{j}'
+            expression = factor + ('' if c == '0.0' else f' + {c}')
+        self.lines.append(f'{name} = {expression}')
+
+    def _clenshaw(self, name, sub, j):
+        # b_k = c_k + 2 x b_{k+1} - b_{k+2}, and the value is
+        # c_0 + x b_1 - b_2.
+        b1, b2 = name + 'a', name + 'b'
+        self.lines.append(f'{b1}, {b2} = {sub[-1]}, 0.0')
+        for c in reversed(sub[1:-1]):
+            self.lines.append(f'{b1}, {b2} = {c} + y{j} * {b1} - {b2}, {b1}')
+        self.lines.append(f'{name} = {sub[0]} + x{j} * {b1} - {b2}')
+
+def compile_polynomials(polynomials, variables, gradient=False):
+    '''
+    Returns a function that evaluates the given polynomials (and their
+    gradients with respect to variables, if gradient is True) at the point x,
+    a sequence with the values of variables in the same order. The function
+    returns the value of the first polynomial (followed by the numpy array
+    of the gradient) if a single polynomial is given, and a tuple otherwise.
+    The generated source code is stored in the attribute source.
+    '''
+    single = isinstance(polynomials, poly.Polynomial)
+    polynomials = [polynomials] if single else list(polynomials)
+    variables = tuple(variables)
+    vector_types = set(p.vector_type for p in polynomials if len(p) > 0)
+    if len(vector_types) > 1:
+        raise TypeError(f'polynomials must have basis vectors of the same type.')
+    vector_type = vector_types.pop() if vector_types else poly.MonomialVector
+    emitter = _Emitter(vector_type, len(variables))
+
+    # Each polynomial is followed by its partial derivatives.
+    outputs = []
+    for p in polynomials:
+        terms = [p] + ([p.derivative(v) for v in variables] if gradient else [])
+        names = []
+        for q in terms:
+            powers, coefs = q.to_arrays(variables)
+            if not is_numeric(coefs):
+                raise TypeError(f'only polynomials with numeric coefficients can be compiled.')
+            names.append(emitter.emit(powers, coefs))
+        if gradient:
+            outputs.append(f'{names[0]}, np.array(({", ".join(names[1:])}{"," if len(names) == 2 else ""}))')
+        else:
+            outputs.append(names[0])
+
+    # Assemble and compile the function.
+    returned = outputs[0] if single else ', '.join(f'({o})' if gradient else o for o in outputs) + ','
+    body = emitter.lines + [f'return {returned}']
+    source = 'def evaluate(x):\n' + ''.join(f'    {line}\n' for line in body)
+    namespace = {'np': np}
+    exec(compile(source, '<compiled polynomial>', 'exec'), namespace)
+    evaluate = namespace['evaluate']
+    evaluate.source = source
+    return evaluate
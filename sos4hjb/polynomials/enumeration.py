@@ -0,0 +1,133 @@
+'''
+Enumeration of the powers of the basis vectors in n variables up to a given
+degree, in the order of BasisVector.construct_basis: graded by total degree
+and, within each degree, lexicographic on the rows of powers. Rows are
+generated lazily in blocks, the degrees excluded by the parity filters are
+skipped without being generated, and the position of a row in the
+enumeration (its rank) is computed in closed form from binomial
+coefficients, without listing the rows that precede it.
+
+By the hockey-stick identity, the rows of degree d in n variables whose
+first power is smaller than q are C(d + n - 1, n - 1) - C(d - q + n - 1,
+n - 1) (with n - 1 variables left and remaining degree d, d - 1, ...). The
+rank of a row within its degree is the sum of these counts over the leading
+variables.
+'''
+
+from functools import lru_cache
+import numpy as np
+
+@lru_cache(maxsize=32)
+def binomials(size):
+    '''
+    Read-only table with C(a, b) in the entry (a, b), for a, b <= size.
+    '''
+    table = np.zeros((size + 1, size + 1), dtype=np.int64)
+    table[:, 0] = 1
+    for a in range(1, size + 1):
+        table[a, 1:] = table[a - 1, 1:] + table[a - 1, :-1]
+    table.flags.writeable = False
+    return table
+
+def _degrees(degree, even, odd):
+    return [d for d in range(degree + 1) if (even and d % 2 == 0) or (odd and d % 2)]
+
+def count_of_degree(n, degree):
+    '''
+    Number of basis vectors in n variables with the given total degree.
+    '''
+    if n == 0:
+        return int(degree == 0)
+    return int(binomials(n + degree)[n + degree - 1, n - 1])
+
+def basis_size(n, degree, even=True, odd=True):
+    '''
+    Number of basis vectors in construct_basis for n variables.
+    '''
+    return sum(count_of_degree(n, d) for d in _degrees(degree, even, odd))
+
+@lru_cache(maxsize=256)
+def degree_offsets(n, degree, even=True, odd=True):
+    '''
+    Read-only array with the rank of the first row of each degree d <=
+    degree (and -1 for the degrees excluded by the parity filters).
+    '''
+    offsets = - np.ones(degree + 1, dtype=np.int64)
+    offset = 0
+    for d in _degrees(degree, even, odd):
+        offsets[d] = offset
+        offset += count_of_degree(n, d)
+    offsets.flags.writeable = False
+    return offsets
+
+def rank_powers(powers, degree, even=True, odd=True):
+    '''
+    Positions of the rows of powers in the enumeration of the basis vectors
+    with the given degree and parities. Raises a ValueError if a row is not
+    in the enumeration.
+    '''
+    powers = np.asarray(powers, dtype=np.int64)
+    if powers.ndim != 2:
+        raise ValueError(f'powers must be a matrix, got {powers.ndim} dimensions.')
+    m, n = powers.shape
+    totals = powers.sum(axis=1)
+    if np.any(powers < 0) or np.any(totals > degree):
+        raise ValueError(f'powers must be nonnegative with total degree at most {degree}.')
+    offsets = degree_offsets(n, degree, even, odd)[totals]
+    if np.any(offsets < 0):
+        raise ValueError(f'powers have total degrees excluded by the parity filters.')
+    table = binomials(n + degree)
+    ranks = offsets.copy()
+    remaining = totals.copy()
+    for i in range(n - 1):
+        left = n - 1 - i
+        ranks += table[remaining + left, left] - table[remaining - powers[:, i] + left, left]
+        remaining -= powers[:, i]
+    return ranks
+
+def unrank_powers(ranks, n, degree, even=True, odd=True):
+    '''
+    Rows of powers in the given positions of the enumeration of the basis
+    vectors in n variables with the given degree and parities.
+    '''
+    ranks = np.asarray(ranks, dtype=np.int64).reshape(-1)
+    offsets = degree_offsets(n, degree, even, odd)
+    size = basis_size(n, degree, even, odd)
+    if np.any(ranks < 0) or np.any(ranks >= size):
+        raise ValueError(f'ranks must be in the range [0, {size}).')
+
+    # Total degree of each row, from the offsets of the included degrees.
+    degrees = np.flatnonzero(offsets >= 0)
+    totals = degrees[np.searchsorted(offsets[degrees], ranks, side='right') - 1]
+    ranks = ranks - offsets[totals]
+
+    # Each power q is the largest one whose count of preceding rows,
+    # C(r + left, left) - C(r - q + left, left), does not exceed the residual
+    # rank. Since C(s + left, left) increases with s, the remaining degree s =
+    # r - q is found by binary search in a column of the binomial table.
+    table = binomials(n + degree)
+    powers = np.zeros((len(ranks), n), dtype=int)
+    remaining = totals.copy()
+    for i in range(n - 1):
+        left = n - 1 - i
+        column = table[left:left + degree + 1, left]
+        total = table[remaining + left, left]
+        rest = np.searchsorted(column, total - ranks, side='left')
+        powers[:, i] = remaining - rest
+        ranks = ranks - (total - column[rest])
+        remaining = rest
+    if n > 0:
+        powers[:, - 1] = remaining
+    return powers
+
+def graded_powers(n, degree, even=True, odd=True, block=4096):
+    '''
+    Generator of the rows of powers of the basis vectors in n variables with
+    the given degree and parities, in blocks of at most block rows.
+    '''
+    for d in _degrees(degree, even, odd):
+        start = degree_offsets(n, degree, even, odd)[d]
+        count = count_of_degree(n, d)
+        for first in range(0, count, block):
+            ranks = np.arange(start + first, start + min(first + block, count))
+            yield unrank_powers(ranks, n, degree, even, odd)
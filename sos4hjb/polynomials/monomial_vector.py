@@ -1,15 +1,16 @@
-from copy import deepcopy
+import numpy as np
 from numpy.polynomial.chebyshev import poly2cheb
 
 import sos4hjb.polynomials as poly
+from sos4hjb.polynomials.terms import (packable, pack_powers, unpack_keys,
+    unique_terms, tabulated_univariate)
 
 class MonomialVector(poly.BasisVector):
     '''
     Monomial of the form v1 ** p1 * v2 ** p2 * ... * vn ** pn.
     '''
 
-    def __init__(self, power_dict):
-        super().__init__(power_dict)
+    __slots__ = ()
 
     def __mul__(self, monomial):
         self._verify_multiplicand(monomial)
@@ -22,13 +23,11 @@ class MonomialVector(poly.BasisVector):
         if power == 0:
             monomial = MonomialVector({})
         else:
-            monomial = deepcopy(self)
-            monomial[variable] -= 1
+            monomial = self.replace(variable, power - 1)
         return poly.Polynomial({monomial: power})
 
     def integral(self, variable):
-        monomial = deepcopy(self)
-        monomial[variable] += 1
+        monomial = self.replace(variable, self[variable] + 1)
         return poly.Polynomial({monomial: 1 / (self[variable] + 1)})
 
     def in_chebyshev_basis(self):
@@ -39,6 +38,57 @@ class MonomialVector(poly.BasisVector):
             res *= poly.Polynomial(dict(zip(basis, c)))
         return res
 
+    @staticmethod
+    def _multiply_terms(variables, powers1, powers2):
+        '''
+        Vectorized multiplication: each row of powers is packed in an integer
+        key, so that the powers of all the products are obtained by summing
+        the keys, and the distinct products by sorting the sums.
+        '''
+        left, right = [i.reshape(-1) for i in np.indices((len(powers1), len(powers2)))]
+        radices = powers1.max(axis=0, initial=0) + powers2.max(axis=0, initial=0) + 1
+        if not packable(radices):
+            powers, groups = unique_terms(powers1[left] + powers2[right])
+        else:
+            keys = pack_powers(powers1, radices)[left] + pack_powers(powers2, radices)[right]
+            keys, groups = np.unique(keys, return_inverse=True)
+            powers = unpack_keys(keys, radices)
+        return powers, left, right, groups.reshape(-1), np.ones(len(left))
+
+    @staticmethod
+    def _derivative_univariate(powers):
+        terms = np.flatnonzero(powers)
+        return terms, powers[terms] - 1, powers[terms]
+
+    @staticmethod
+    def _integral_univariate(powers):
+        terms = np.arange(len(powers))
+        return terms, powers + 1, 1 / (powers + 1)
+
+    @staticmethod
+    def _basis_change_univariate(vector_type):
+        if vector_type != poly.ChebyshevVector:
+            raise TypeError(f'cannot express MonomialVector in terms of {vector_type.__name__}.')
+        return lambda powers: tabulated_univariate(powers, lambda p: poly2cheb([0] * p + [1]))
+
+    @staticmethod
+    def _univariate_table(values, degree):
+        '''
+        Table (len(values) x degree + 1) of the powers of the given values.
+        '''
+        table = np.ones((len(values), degree + 1), dtype=values.dtype)
+        table[:, 1:] = values[:, None]
+        return np.cumprod(table, axis=1)
+
+    @classmethod
+    def _univariate_moments(cls, degree, lb, ub):
+        '''
+        Integrals of the powers 0, ..., degree over the interval [lb, ub].
+        '''
+        table = cls._univariate_table(np.array([lb, ub], dtype=float), degree + 1)
+        powers = np.arange(1, degree + 2)
+        return (table[1, powers] - table[0, powers]) / powers
+
     @staticmethod
     def _call_univariate(power, variable):
         return variable ** power
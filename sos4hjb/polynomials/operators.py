@@ -0,0 +1,173 @@
+from functools import lru_cache
+import numpy as np
+import scipy.sparse as sp
+
+import sos4hjb.polynomials as poly
+from sos4hjb.polynomials.terms import (sort_variables, align_powers,
+    unique_terms, linear_map)
+
+class LinearMap:
+    '''
+    Linear map between polynomials, represented as a sparse matrix that acts
+    on the coefficients. The ith column of the matrix contains the image of
+    the ith input basis vector, expressed in the output basis.
+
+    Attributes
+    ----------
+    vector_type : type (subclass of BasisVector)
+        Type of the output basis vectors.
+    variables : tuple (of Variable)
+        Variables associated with the columns of powers.
+    powers : numpy.ndarray (dtype int, shape output terms x variables)
+        Powers of the output basis vectors.
+    matrix : scipy.sparse.csr_matrix (shape output terms x input terms)
+        Matrix of the linear map.
+    '''
+
+    def __init__(self, vector_type, variables, powers, matrix):
+        self.vector_type = vector_type
+        self.variables = variables
+        self.powers = powers
+        self.matrix = sp.csr_matrix(matrix)
+
+    def __call__(self, coefs):
+        '''
+        Returns the image of the polynomial with the given coefficients (array
+        or vector expression) in the input basis.
+        '''
+        coefs = linear_map(self.matrix, coefs)
+        return poly.Polynomial.from_arrays(self.vector_type, self.variables, self.powers, coefs)
+
+    def output_basis(self):
+        return [self.vector_type(dict(zip(self.variables, row))) for row in self.powers.tolist()]
+
+def gram_map(basis):
+    '''
+    Linear map from the upper-triangular entries Q[i, j], i <= j, of a
+    symmetric matrix (ordered as in numpy.triu_indices) to the coefficients
+    of the quadratic form b' Q b, with b the given basis. The map is cached,
+    so that SOS polynomials with the same basis share it.
+    '''
+    return _basis_map('gram', basis, None)
+
+def _gram_map(vector_type, variables, powers):
+    m = len(powers)
+    output_powers, left, right, groups, weights = vector_type._multiply_terms(variables, powers, powers)
+
+    # Only the products b_i * b_j with i <= j are kept, the off-diagonal ones
+    # count twice.
+    upper = left <= right
+    left, right = left[upper], right[upper]
+    pairs = left * m - left * (left - 1) // 2 + right - left
+    weights = weights[upper] * np.where(left == right, 1, 2)
+    matrix = sp.csr_matrix((weights, (groups[upper], pairs)), (len(output_powers), m * (m + 1) // 2))
+    return LinearMap(vector_type, variables, output_powers, matrix)
+
+def derivative_map(basis, variable):
+    return _basis_map('derivative', basis, variable)
+
+def integral_map(basis, variable):
+    return _basis_map('integral', basis, variable)
+
+def basis_change_map(basis, vector_type):
+    return _basis_map('basis_change', basis, vector_type)
+
+def _basis_map(kind, basis, argument):
+    vector_type, variables, powers = poly.Polynomial._basis_arrays(basis)
+    return terms_map(kind, vector_type, variables, powers, argument)
+
+def terms_map(kind, vector_type, variables, powers, argument):
+    '''
+    Linear map of the given kind ('derivative', 'integral', 'basis_change', or
+    'gram') for the basis with the given matrix of powers. Maps are cached, so that
+    repeated operations on polynomials with the same terms (e.g. decision
+    polynomials) do not recompute them.
+    '''
+    powers = np.ascontiguousarray(powers, dtype=int)
+    return _cached_map(kind, vector_type, tuple(variables), powers.shape, powers.tobytes(), argument)
+
+@lru_cache(maxsize=256)
+def _cached_map(kind, vector_type, variables, shape, data, argument):
+    powers = np.frombuffer(data, dtype=int).reshape(shape)
+    if kind == 'derivative':
+        return _univariate_map(vector_type, variables, powers, argument, vector_type._derivative_univariate)
+    elif kind == 'integral':
+        return _univariate_map(vector_type, variables, powers, argument, vector_type._integral_univariate)
+    elif kind == 'basis_change':
+        return _basis_change_map(vector_type, variables, powers, argument)
+    elif kind == 'gram':
+        return _gram_map(vector_type, variables, powers)
+    raise ValueError(f'unknown linear map {kind}.')
+
+def _univariate_map(vector_type, variables, powers, variable, univariate_map):
+    '''
+    Map that takes the univariate basis vector of the given variable, in each
+    term, to a combination of univariate basis vectors of the same variable.
+    '''
+    output_variables = sort_variables(variables + (variable,))
+    output_powers = align_powers(powers, variables, output_variables)
+    j = output_variables.index(variable)
+    terms, column, weights = univariate_map(output_powers[:, j])
+    output_powers = output_powers[terms]
+    output_powers[:, j] = column
+    return _from_elementary(vector_type, output_variables, output_powers, terms, weights, len(powers))
+
+def _basis_change_map(vector_type, variables, powers, output_type):
+    '''
+    The basis change acts on each variable separately, so the univariate
+    change of basis is applied one variable at a time.
+    '''
+    if output_type == vector_type:
+        return LinearMap(vector_type, variables, powers, sp.identity(len(powers)))
+    univariate_map = vector_type._basis_change_univariate(output_type)
+    terms = np.arange(len(powers))
+    weights = np.ones(len(powers))
+    output_powers = powers.copy()
+    for j in range(len(variables)):
+        t, column, w = univariate_map(output_powers[:, j])
+        output_powers = output_powers[t]
+        output_powers[:, j] = column
+        terms = terms[t]
+        weights = weights[t] * w
+    return _from_elementary(output_type, variables, output_powers, terms, weights, len(powers))
+
+def _from_elementary(vector_type, variables, powers, terms, weights, size):
+    powers, groups = unique_terms(powers)
+    matrix = sp.csr_matrix((weights, (groups, terms)), (len(powers), size))
+    return LinearMap(vector_type, variables, powers, matrix)
+
+def moment_vector(basis, variables, lbs, ubs):
+    '''
+    Integrals of the basis vectors over the box lbs <= variables <= ubs. The
+    inner product of this vector with the coefficients of a polynomial in the
+    given basis is the definite integral of the polynomial over the box.
+    '''
+    vector_type, basis_variables, powers = poly.Polynomial._basis_arrays(basis)
+    missing = set(basis_variables) - set(variables)
+    if missing:
+        raise ValueError(f'basis vectors depend on variables {missing} that are not integrated.')
+    powers = align_powers(powers, basis_variables, tuple(variables))
+    return terms_moments(vector_type, variables, powers, lbs, ubs)
+
+def terms_moments(vector_type, variables, powers, lbs, ubs):
+    '''
+    Integrals over the box lbs <= variables <= ubs of the basis vectors with
+    the given matrix of powers (one column per variable). Moment vectors are
+    cached and returned as read-only arrays.
+    '''
+    if not len(variables) == len(lbs) == len(ubs):
+        raise ValueError(f'integration range and variables have different lenghts.')
+    powers = np.ascontiguousarray(powers, dtype=int)
+    lbs = tuple(float(lb) for lb in lbs)
+    ubs = tuple(float(ub) for ub in ubs)
+    return _cached_moments(vector_type, tuple(variables), powers.shape, powers.tobytes(), lbs, ubs)
+
+@lru_cache(maxsize=256)
+def _cached_moments(vector_type, variables, shape, data, lbs, ubs):
+    powers = np.frombuffer(data, dtype=int).reshape(shape)
+    moments = np.ones(len(powers))
+    for column, lb, ub in zip(powers.T, lbs, ubs):
+        table = vector_type._univariate_moments(column.max(initial=0), lb, ub)
+        moments *= table[column]
+    moments.flags.writeable = False
+    return moments
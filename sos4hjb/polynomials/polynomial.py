@@ -1,80 +1,445 @@
 from math import prod
 from operator import eq, ne, gt
-from numbers import Number
-from copy import deepcopy
+from numbers import Number, Real
+
+import numpy as np
+import scipy.sparse as sp
 
 import sos4hjb.polynomials as poly
+from sos4hjb.polynomials.terms import (sort_variables, align_powers,
+    unique_terms, lexsort_terms, coefficient_array, is_expression, is_numeric,
+    as_objects, to_python, nonzero_coefficients, segment_sum,
+    scale_coefficients, dot_coefficients, concatenate_coefficients,
+    multiply_coefficients)
+from sos4hjb.polynomials.operators import terms_map, terms_moments, gram_map
+from sos4hjb.polynomials.codegen import compile_polynomials
 
 class Polynomial:
     '''
-    Polynomial expressed as the linear combination of basis vectors. Written in
-    such a way that coef_dict never contains an item with value equal to zero.
+    Polynomial expressed as the linear combination of basis vectors. The terms
+    are stored as a matrix of powers, with one row per basis vector and one
+    column per variable, and an array of coefficients. Written in such a way
+    that no coefficient is equal to zero, no two rows of the powers are equal,
+    and each variable has a nonzero power in at least one row.
 
     Attributes
     ----------
-    coef_dict : dict (key : BasisVector, value : float)
-        Dictionary that maps each basis vector to its coefficient.
+    vector_type : type (subclass of BasisVector) or None
+        Type of the basis vectors, None if the polynomial has no terms.
+    _variables : tuple (of Variable)
+        Variables associated with the columns of the powers, sorted by name
+        and index.
+    _powers : numpy.ndarray (dtype int, shape terms x variables)
+        Power of each variable in each basis vector.
+    _coefs : numpy.ndarray (shape terms) or vector expression
+        Coefficient of each basis vector. The dtype is float if all the
+        coefficients are numbers, object otherwise. Vector expressions of a
+        modeling library (e.g. a cvxpy Variable) are also allowed, and are
+        only ever transformed through sparse matrix products.
     '''
 
     def __init__(self, coef_dict):
         self._verify_vectors(coef_dict.keys())
-        self.coef_dict = {v: c for v, c in coef_dict.items() if optimistic(c, ne, 0)}
+        vector_type, variables, powers = self._basis_arrays(list(coef_dict))
+        coefs = coefficient_array(coef_dict.values())
+        self._set_terms(vector_type, variables, powers, coefs)
+
+    @classmethod
+    def from_basis(cls, basis, coefs):
+        '''
+        Linear combination of the given basis vectors, with coefficients given
+        as an array or as a vector expression (e.g. a cvxpy Variable).
+        '''
+        cls._verify_vectors(basis)
+        return cls.from_arrays(*cls._basis_arrays(basis), coefs)
+
+    @staticmethod
+    def _basis_arrays(vectors):
+        vector_type = type(vectors[0]) if len(vectors) > 0 else None
+        variables = sort_variables(var for vec in vectors for var in vec.variables())
+        position = {v: i for i, v in enumerate(variables)}
+        powers = np.zeros((len(vectors), len(variables)), dtype=int)
+        for i, vector in enumerate(vectors):
+            for v, p in vector:
+                powers[i, position[v]] = p
+        return vector_type, variables, powers
+
+    @classmethod
+    def from_arrays(cls, vector_type, variables, powers, coefs):
+        '''
+        Constructs a polynomial from the matrix of powers (one row per term,
+        one column per variable) and the array of coefficients. Rows of powers
+        that appear multiple times have their coefficients summed. The
+        coefficients can also be a vector expression (e.g. a cvxpy Variable).
+        '''
+        powers = np.array(powers, dtype=int)
+        powers = powers.reshape(len(powers), len(variables))
+        if is_numeric(coefs):
+            coefs = coefs.astype(float)
+        elif isinstance(coefs, (np.ndarray, list, tuple)):
+            coefs = coefficient_array(coefs)
+        if coefs.shape[0] != len(powers):
+            raise ValueError(f'got {len(powers)} rows of powers and {coefs.shape[0]} coefficients.')
+        if len(powers) > 0 and not issubclass(vector_type, poly.BasisVector):
+            raise TypeError(f'basis vectors must be subclasses of BasisVector, got {vector_type.__name__}')
+        if np.any(powers < 0):
+            raise ValueError('powers must be nonnegative integers.')
+        p = cls.__new__(cls)
+        p._set_terms(vector_type, tuple(variables), powers, coefs, combine=True)
+        return p
+
+    def __reduce__(self):
+
+        # Compact picklable form: variables, powers with the smallest integer
+        # type, and coefficients.
+        dtype = np.min_scalar_type(self._powers.max(initial=0))
+        return Polynomial.from_arrays, (self.vector_type, self._variables, self._powers.astype(dtype), self._coefs)
+
+    def to_arrays(self, variables=None):
+        '''
+        Returns the matrix of powers and the array of coefficients. If
+        variables is given, the columns of powers are associated with these.
+        '''
+        if variables is None:
+            variables = self._variables
+        missing = set(self._variables) - set(variables)
+        if missing:
+            raise ValueError(f'missing variables {missing} in the given ordering.')
+        return align_powers(self._powers, self._variables, tuple(variables)), self._coefs
+
+    def _set_terms(self, vector_type, variables, powers, coefs, combine=False):
+
+        # Sum coefficients of repeated basis vectors.
+        if combine and len(powers) > 1:
+            unique, groups = unique_terms(powers)
+            if len(unique) < len(powers):
+                powers = unique
+                coefs = segment_sum(coefs, groups, len(powers))
+
+        # Remove zero coefficients and variables that do not appear.
+        keep = nonzero_coefficients(coefs)
+        if not keep.all():
+            powers = powers[keep]
+            coefs = coefs[keep]
+        used = powers.any(axis=0)
+        key = lambda i: (variables[i].name, variables[i].index)
+        order = sorted((i for i in range(len(variables)) if used[i]), key=key)
+        self._variables = tuple(variables[i] for i in order)
+        self._powers = powers[:, order]
+        self._coefs = coefs
+        self.vector_type = vector_type if len(powers) > 0 else None
+
+    def _assign(self, other):
+        self.vector_type = other.vector_type
+        self._variables = other._variables
+        self._powers = other._powers
+        self._coefs = other._coefs
+
+    def _copy(self, coefs=None):
+        p = Polynomial.__new__(Polynomial)
+        p._assign(self)
+        p._powers = self._powers.copy()
+        if coefs is None:
+            coefs = self._coefs if is_expression(self._coefs) else self._coefs.copy()
+        p._coefs = coefs
+        return p
+
+    def _find(self, vector):
+        position = {v: i for i, v in enumerate(self._variables)}
+        if any(v not in position for v in vector.variables()):
+            return None
+        row = np.zeros(len(self._variables), dtype=int)
+        for v, p in vector:
+            row[position[v]] = p
+        matches = np.flatnonzero((self._powers == row).all(axis=1))
+        return matches[0] if len(matches) > 0 else None
+
+    @property
+    def coef_dict(self):
+        return dict(self)
 
     def __getitem__(self, vector):
-        return self.coef_dict[vector] if vector in self.coef_dict else 0
+        if not isinstance(vector, poly.BasisVector) or type(vector) != self.vector_type:
+            return 0
+        i = self._find(vector)
+        return 0 if i is None else to_python(self._coefs[i:i + 1])[0]
 
     def __setitem__(self, vector, coef):
-        if pessimistic(coef, eq, 0):
-            self.coef_dict.pop(vector, None)
+        self._verify_vectors([vector] if len(self) == 0 else [vector, self.vector_type({})])
+        addend = Polynomial({vector: 1})
+        variables = sort_variables(self._variables + addend._variables)
+        powers = align_powers(self._powers, self._variables, variables)
+        row = align_powers(addend._powers, addend._variables, variables)
+
+        # Numeric coefficients stay in a float array.
+        if is_numeric(self._coefs) and isinstance(coef, Real):
+            coefs = np.append(self._coefs.astype(float), float(coef))
+        else:
+            coefs = np.empty(len(self) + 1, dtype=object)
+            coefs[:-1] = as_objects(self._coefs)
+            coefs[-1] = coef
+        matches = np.flatnonzero((powers == row).all(axis=1))
+        if len(matches) > 0:
+            coefs[matches[0]] = coef
+            coefs = coefs[:-1]
         else:
-            self.coef_dict[vector] = coef
-            self._verify_vectors(self.vectors())
+            powers = np.vstack((powers, row))
+        if coefs.dtype == object:
+            coefs = coefficient_array(coefs)
+        self._set_terms(type(vector), variables, powers, coefs)
 
     def __eq__(self, other):
         # Comparison with 0 (float) is needed, e.g., in assertAlmostEqual(p, q)
         # where p and q are two polynomials. Since what the unittest libray does
         # is round(p - q, 7) == 0.
         other = Polynomial({}) if other == 0 else other
-        return self.coef_dict == other.coef_dict
+        if len(self) != len(other) or self._variables != other._variables:
+            return False
+        if len(self) == 0:
+            return True
+        if self.vector_type != other.vector_type:
+            return False
+        if not is_numeric(self._coefs) or not is_numeric(other._coefs):
+            return self.coef_dict == other.coef_dict
+        self_order = lexsort_terms(self._powers)
+        other_order = lexsort_terms(other._powers)
+        return np.array_equal(self._powers[self_order], other._powers[other_order]) and \
+            np.array_equal(self._coefs[self_order], other._coefs[other_order])
     
     def __ne__(self, other):
         return not self == other
 
     def __len__(self):
-        return len(self.coef_dict)
+        return len(self._powers)
 
     def __iter__(self):
-        return iter(self.coef_dict.items())
+        return zip(self.vectors(), self.coefficients())
 
     def __call__(self, evaluation_dict):
-        return sum(v(evaluation_dict) * c for v, c in self)
+        values = self._evaluate_columns(evaluation_dict, self._variables)
+        return dot_coefficients(values, self._coefs)
 
     def substitute(self, evaluation_dict):
-        return sum([v.substitute(evaluation_dict) * c for v, c in self], Polynomial({}))
+        substituted = [v for v in self._variables if v in evaluation_dict]
+        values = self._evaluate_columns(evaluation_dict, substituted)
+        kept = [i for i, v in enumerate(self._variables) if v not in evaluation_dict]
+        variables = tuple(self._variables[i] for i in kept)
+        coefs = scale_coefficients(self._coefs, values)
+        return Polynomial._from_terms(self.vector_type, variables, self._powers[:, kept], coefs)
+
+    def _evaluate_columns(self, evaluation_dict, variables):
+        '''
+        Returns the product of the univariate basis vectors, for the given
+        variables, in each term of the polynomial.
+        '''
+        values = np.ones(len(self), dtype=float)
+        for v in variables:
+            powers = self._powers[:, self._variables.index(v)]
+            x = coefficient_array([evaluation_dict[v]])
+            table = self.vector_type._univariate_table(x, powers.max())[0]
+            values = values * table[powers]
+        return values
+
+    def evaluate(self, points, variables, chunk_size=2 ** 18):
+        '''
+        Evaluates the polynomial at a batch of points.
+
+        Parameters
+        ----------
+        points : numpy.ndarray (shape N x n)
+            Each row is a point, the ith column contains the values of the ith
+            variable in variables.
+        variables : list (of Variable, length n)
+            Ordering of the variables in the columns of points. Must contain
+            all the variables of the polynomial.
+        chunk_size : int
+            Approximate number of entries of the matrix of basis-vector values
+            (points x terms) that are stored at once.
+
+        Returns
+        -------
+        numpy.ndarray (shape N)
+            Value of the polynomial at each point.
+        '''
+        points = self._align_points(points, variables)
+        step = max(chunk_size // max(len(self), 1), 1)
+        tree = self._prefix_tree()
+        values = [dot_coefficients(self._basis_values(points[i:i + step], tree).T, self._coefs)
+                  for i in range(0, len(points), step)]
+        return np.concatenate(values) if len(values) > 0 else np.zeros(0)
+
+    def _align_points(self, points, variables):
+        points = np.asarray(points)
+        if points.dtype != object:
+            points = points.astype(float)
+        variables = list(variables)
+        if points.ndim != 2 or points.shape[1] != len(variables):
+            raise ValueError(f'points must have shape N x {len(variables)}, got {points.shape}.')
+        missing = set(self._variables) - set(variables)
+        if missing:
+            raise ValueError(f'missing values for variables {missing}.')
+        return points[:, [variables.index(v) for v in self._variables]]
+
+    def evaluate_derivatives(self, points, variables, hessian=True, chunk_size=2 ** 18):
+        '''
+        Evaluates the polynomial, its gradient, and its Hessian at a batch of
+        points. The partial derivatives are obtained with the cached
+        derivative maps, and the basis vectors of the polynomial and of all
+        its derivatives are evaluated together, sharing the tables of the
+        univariate basis vectors. Parameters are as in evaluate, the
+        coefficients must be numeric.
+
+        Returns
+        -------
+        numpy.ndarray (shape N)
+            Value of the polynomial at each point.
+        numpy.ndarray (shape N x n)
+            Gradient with respect to variables at each point.
+        numpy.ndarray (shape N x n x n)
+            Hessian at each point, returned only if hessian is True.
+        '''
+        points = self._align_points(points, variables)
+        if not is_numeric(self._coefs):
+            raise TypeError(f'derivatives can be evaluated only for numeric coefficients.')
+        n = len(variables)
+
+        # Polynomial, first derivatives, and second derivatives (upper
+        # triangle only), all with the columns of powers of self.
+        gradient = [self.derivative(v) for v in variables]
+        polynomials = [self] + gradient
+        pairs = [(i, j) for i in range(n) for j in range(i, n)] if hessian else []
+        polynomials += [gradient[i].derivative(variables[j]) for i, j in pairs]
+
+        # Union of the terms, and matrix of the coefficients of each
+        # polynomial in the union.
+        powers = [align_powers(p._powers, p._variables, self._variables) for p in polynomials]
+        union, groups = unique_terms(np.vstack(powers))
+        rows = np.repeat(np.arange(len(polynomials)), [len(p) for p in polynomials])
+        coefs = np.concatenate([p._coefs for p in polynomials])
+        matrix = sp.csr_matrix((coefs, (rows, groups)), (len(polynomials), len(union)))
+        union = Polynomial._from_terms(self.vector_type, self._variables, union, np.ones(len(union)), False)
+
+        # Batch evaluation of all the polynomials.
+        step = max(chunk_size // max(len(union), 1), 1)
+        tree = union._prefix_tree()
+        values = [(matrix @ union._basis_values(points[i:i + step], tree)).T
+                  for i in range(0, len(points), step)]
+        values = np.vstack(values) if len(values) > 0 else np.zeros((0, len(polynomials)))
+        results = (values[:, 0], values[:, 1:n + 1])
+        if hessian:
+            hessians = np.zeros((len(points), n, n))
+            for k, (i, j) in enumerate(pairs):
+                hessians[:, i, j] = hessians[:, j, i] = values[:, n + 1 + k]
+            results += (hessians,)
+        return results
+
+    def evaluate_grid(self, axes, variables):
+        '''
+        Evaluates the polynomial on a tensor grid. Since the basis vectors are
+        products of univariate polynomials, the coefficients are arranged in a
+        tensor (one dimension per variable) that is contracted with the table
+        of the univariate basis vectors of each axis, without ever forming
+        the values of the basis vectors at the grid points.
+
+        Parameters
+        ----------
+        axes : list (of numpy.ndarray)
+            Values of the grid along each variable.
+        variables : list (of Variable, same length as axes)
+            Variable associated with each axis. Must contain all the variables
+            of the polynomial.
+
+        Returns
+        -------
+        numpy.ndarray (shape len(axes[0]) x len(axes[1]) x ...)
+            Value of the polynomial at each point of the grid.
+        '''
+        if len(axes) != len(variables):
+            raise ValueError(f'got {len(axes)} axes for {len(variables)} variables.')
+        axes = [np.asarray(axis, dtype=float).reshape(-1) for axis in axes]
+        if len(self) == 0:
+            return np.zeros(tuple(len(axis) for axis in axes))
+        powers, coefs = self.to_arrays(variables)
+        if not is_numeric(coefs):
+            raise TypeError(f'grid evaluation requires numeric coefficients.')
+        degrees = powers.max(axis=0)
+        tensor = np.zeros(tuple(degrees + 1))
+        np.add.at(tensor, tuple(powers.T), coefs)
+        for axis, degree in zip(axes, degrees):
+            table = self.vector_type._univariate_table(axis, degree)
+            tensor = np.tensordot(tensor, table, axes=(0, 1))
+        return tensor
+
+    def compile(self, variables=None, gradient=False):
+        '''
+        Fast evaluator of the polynomial, and of its gradient if requested,
+        generated by codegen.compile_polynomials. The evaluator takes a
+        sequence with the values of variables (by default, the variables of
+        the polynomial) and returns the value, or the value and the gradient.
+        '''
+        return compile_polynomials(self, self._variables if variables is None else variables, gradient)
+
+    def _prefix_tree(self):
+        '''
+        Products of univariate basis vectors are shared among terms: the
+        distinct prefixes of the rows of powers (first j columns) are listed
+        level by level, each prefix pointing to its parent at level j - 1.
+        Returns, for each level, the parents and the last power of the
+        prefixes, and the index of the full prefix of each term.
+        '''
+        levels = []
+        parents = np.zeros(len(self), dtype=int)
+        for j in range(len(self._variables)):
+            prefixes, first, inverse = np.unique(self._powers[:, :j + 1], axis=0,
+                return_index=True, return_inverse=True)
+            levels.append((parents[first], prefixes[:, j]))
+            parents = inverse.reshape(-1)
+        return levels, parents
+
+    def _basis_values(self, points, tree=None):
+        '''
+        Returns the matrix (terms x points) of the values of the basis vectors,
+        where the columns of points are ordered as the variables of self.
+        '''
+        levels, terms = self._prefix_tree() if tree is None else tree
+        values = np.ones((1, len(points)), dtype=points.dtype)
+        for j, (parents, powers) in enumerate(levels):
+            table = self.vector_type._univariate_table(points[:, j], powers.max())
+            values = values[parents] * np.ascontiguousarray(table.T)[powers]
+        return values[terms]
+
+    @classmethod
+    def _from_terms(cls, vector_type, variables, powers, coefs, combine=True):
+        p = cls.__new__(cls)
+        p._set_terms(vector_type, variables, powers, coefs, combine)
+        return p
 
     def __pos__(self):
-        return deepcopy(self)
+        return self._copy()
 
     def __neg__(self):
-        return Polynomial({v: - c for v, c in self})
+        return self._copy(- self._coefs)
 
     def __abs__(self):
-        return Polynomial({v: abs(c) for v, c in self})
+        coefs = self._coefs if is_numeric(self._coefs) else as_objects(self._coefs)
+        return self._copy(np.abs(coefs))
 
     def __round__(self, digits=0):
-        return Polynomial({v: round(c, digits) for v, c in self})
+        if is_numeric(self._coefs):
+            coefs = np.round(self._coefs, digits)
+        else:
+            coefs = coefficient_array(round(c, digits) for c in as_objects(self._coefs))
+        return Polynomial._from_terms(self.vector_type, self._variables, self._powers, coefs, False)
 
     def __add__(self, other):
         if isinstance(other, Polynomial):
-            vectors = set(self.vectors() + other.vectors())
-            return Polynomial({v: self[v] + other[v] for v in vectors})
+            return Polynomial._sum([self, other])
         else:
             return NotImplemented
 
     def __iadd__(self, other):
         if isinstance(other, Polynomial):
-            for v, c in other:
-                self[v] += c
+            self._assign(self + other)
             return self
         else:
             return NotImplemented
@@ -82,32 +447,33 @@ class Polynomial:
     def __radd__(self, other):
         # Defines 0 + self. Useful to use sum() on a list of polynomials.
         if pessimistic(other, eq, 0):
-            return deepcopy(self)
+            return self._copy()
         else:
             return NotImplemented
 
     def __sub__(self, other):
         # Does not use __add__ to avoid the overhead of __neg__.
         if isinstance(other, Polynomial):
-            vectors = set(self.vectors() + other.vectors())
-            return Polynomial({v: self[v] - other[v] for v in vectors})
+            return Polynomial._sum([self, other], [1, - 1])
         else:
             return NotImplemented
 
     def __isub__(self, other):
         if isinstance(other, Polynomial):
-            for v, c in other:
-                self[v] -= c
+            self._assign(self - other)
             return self
         else:
             return NotImplemented
 
     def __mul__(self, other):
         if isinstance(other, Polynomial):
-            return sum([(vs * vo) * (cs * co) for vs, cs in self for vo, co in other], Polynomial({}))
+            return self._multiply(other)
+        elif isinstance(other, Number):
+            coefs = self._coefs * other
         else:
             # Tries to treat other as a scalar (allows, e.g., symbolic coefficients).
-            return Polynomial({v: c * other for v, c in self})
+            coefs = coefficient_array(c * other for c in as_objects(self._coefs))
+        return Polynomial._from_terms(self.vector_type, self._variables, self._powers, coefs, False)
 
     def __imul__(self, other):
         return self * other
@@ -121,35 +487,84 @@ class Polynomial:
         if power == 0:
             if len(self) == 0:
                 raise ValueError('Undefined result for 0 ** 0.')
-            vector_type = type(self.vectors()[0])
-            return Polynomial({vector_type({}): 1})
+            return Polynomial({self.vector_type({}): 1})
 
         # Fall back to the multiplication method.
         return prod([self] * (power - 1), start=self)
 
+    def _multiply(self, other):
+        '''
+        Multiplication kernel: the basis type lists all the elementary
+        products between the terms of the two polynomials, already grouped by
+        resulting basis vector, and the coefficients are accumulated in bulk.
+        '''
+        if len(self) == 0 or len(other) == 0:
+            return Polynomial({})
+        self._verify_vectors([self.vector_type({}), other.vector_type({})])
+        variables = sort_variables(self._variables + other._variables)
+        powers1 = align_powers(self._powers, self._variables, variables)
+        powers2 = align_powers(other._powers, other._variables, variables)
+        terms = self.vector_type._multiply_terms(variables, powers1, powers2)
+        powers, left, right, groups, weights = terms
+        coefs = multiply_coefficients(self._coefs, other._coefs, left, right, groups, weights, len(powers))
+        return Polynomial._from_terms(self.vector_type, variables, powers, coefs, False)
+
+    @staticmethod
+    def _sum(polynomials, signs=None):
+        '''
+        Sums the given polynomials (each multiplied by the corresponding sign)
+        by stacking their terms and summing repeated terms in a single pass.
+        '''
+        signs = [1] * len(polynomials) if signs is None else signs
+        nonzero = [i for i, p in enumerate(polynomials) if len(p) > 0]
+        polynomials = [polynomials[i] for i in nonzero]
+        signs = [signs[i] for i in nonzero]
+        Polynomial._verify_vectors([p.vector_type({}) for p in polynomials])
+        if len(polynomials) == 0:
+            return Polynomial({})
+        variables = sort_variables(v for p in polynomials for v in p._variables)
+        powers = np.vstack([align_powers(p._powers, p._variables, variables) for p in polynomials])
+        coefs = concatenate_coefficients([p._coefs if s == 1 else - p._coefs for p, s in zip(polynomials, signs)])
+        return Polynomial._from_terms(polynomials[0].vector_type, variables, powers, coefs)
+
+    def _apply_map(self, kind, argument):
+        if len(self) == 0:
+            return Polynomial({})
+        linear_map = terms_map(kind, self.vector_type, self._variables, self._powers, argument)
+        return linear_map(self._coefs)
+
     def derivative(self, variable):
-        return sum([v.derivative(variable) * c for v, c in self], Polynomial({}))
+        if variable not in self._variables:
+            return Polynomial({})
+        return self._apply_map('derivative', variable)
 
     def jacobian(self, variables):
         return [self.derivative(v) for v in variables]
 
     def integral(self, variable):
-        return sum([v.integral(variable) * c for v, c in self], Polynomial({}))
+        return self._apply_map('integral', variable)
 
     def definite_integral(self, variables, lbs, ubs):
         if not len(variables) == len(lbs) == len(ubs):
             raise ValueError(f'integration range and variables have different lenghts.')
-        integral = self
-        for v, lb, ub in zip(variables, lbs, ubs):
-            integral = integral.integral(v)
-            integral = integral.substitute({v: ub}) - integral.substitute({v: lb})
-        return integral
+        if len(self) == 0:
+            return Polynomial({})
+
+        # Each term is scaled by the integrals of its univariate factors.
+        all_variables = sort_variables(self._variables + tuple(variables))
+        powers = align_powers(self._powers, self._variables, all_variables)
+        integrated = [all_variables.index(v) for v in variables]
+        moments = terms_moments(self.vector_type, variables, powers[:, integrated], lbs, ubs)
+        kept = [i for i in range(len(all_variables)) if i not in integrated]
+        variables = tuple(all_variables[i] for i in kept)
+        coefs = scale_coefficients(self._coefs, moments)
+        return Polynomial._from_terms(self.vector_type, variables, powers[:, kept], coefs)
 
     def in_chebyshev_basis(self):
-        return sum([v.in_chebyshev_basis() * c for v, c in self], Polynomial({}))
+        return self._apply_map('basis_change', poly.ChebyshevVector)
 
     def in_monomial_basis(self):
-        return sum([v.in_monomial_basis() * c for v, c in self], Polynomial({}))
+        return self._apply_map('basis_change', poly.MonomialVector)
 
     def __repr__(self):
 
@@ -167,7 +582,7 @@ class Polynomial:
 
             # Just represent the coefficient if vector is 1.
             if len(vector) == 0:
-                r += str(coef)
+                r += self._repr_coef(coef)
             else:
 
                 # Just represent - if coefficient is -1.
@@ -176,33 +591,41 @@ class Polynomial:
 
                 # Represent coefficient if different from +1.
                 elif optimistic(coef, ne, 1):
-                    r += str(coef)
+                    r += self._repr_coef(coef)
 
                 # Add representation of vector.
                 r += vector.__repr__()
 
         return r
             
+    @staticmethod
+    def _repr_coef(coef):
+        # Numeric coefficients are stored as floats, represent integers without
+        # the trailing decimal.
+        if isinstance(coef, float) and coef.is_integer():
+            return str(int(coef))
+        return str(coef)
+
     def _repr_latex_(self):
         return '$' + self.__repr__() + '$'
 
     def vectors(self):
-        return list(self.coef_dict)
+        return [self.vector_type(dict(zip(self._variables, row))) for row in self._powers.tolist()]
 
     def variables(self):
-        return list(set(var for vec in self.vectors() for var in vec.variables()))
+        return list(self._variables)
 
     def coefficients(self):
-        return list(self.coef_dict.values())
+        return to_python(self._coefs)
 
     def degree(self):
-        return max(v.degree() for v in self.vectors()) if len(self) > 0 else 0
+        return int(self._powers.sum(axis=1).max()) if len(self) > 0 else 0
 
     def is_odd(self):
-        return all(v.is_odd() for v in self.vectors()) if len(self) > 0 else False
+        return bool(np.all(self._powers.sum(axis=1) % 2 == 1)) if len(self) > 0 else False
 
     def is_even(self):
-        return all(v.is_even() for v in self.vectors())
+        return bool(np.all(self._powers.sum(axis=1) % 2 == 0))
 
     # ToDo: find a way to get rid of this method (currently needed bcs of definite_integral).
     def to_scalar(self):
@@ -212,13 +635,10 @@ class Polynomial:
 
     @classmethod
     def quadratic_form(cls, basis, Q):
-        p = cls({})
-        for i, bi in enumerate(basis):
-            for j, bj in enumerate(basis[i:]):
-                j += i
-                coef = 1 if i == j else 2
-                p += (bi * bj) * (Q[i, j] * coef)
-        return p
+        if len(basis) == 0:
+            return cls({})
+        rows, columns = np.triu_indices(len(basis))
+        return gram_map(basis)(Q[rows, columns])
 
     @staticmethod
     def _verify_vectors(vectors):
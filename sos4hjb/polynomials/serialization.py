@@ -0,0 +1,163 @@
+'''
+Compact binary files of named polynomials with numeric coefficients (e.g. a
+library of value functions and the policies derived from them). A file
+contains
+
+- a magic string and the length of the header,
+- a JSON header with the table of the variables (name and index), one entry
+  per polynomial (basis type, columns of the variables table, and position
+  of the terms), and user metadata,
+- the packed matrix of powers of all the polynomials, with the smallest
+  unsigned integer type, and the array of all the coefficients (float64),
+  both aligned to 64 bytes.
+
+Files are loaded through a read-only memory map: the polynomials are
+constructed only when accessed, and their coefficients are views of the map,
+so that processes loading the same file share the same physical memory.
+'''
+
+import json
+from collections.abc import Mapping
+import numpy as np
+
+import sos4hjb.polynomials as poly
+from sos4hjb.polynomials.terms import sort_variables, is_numeric
+
+MAGIC = b'SOS4HJB\x01'
+ALIGNMENT = 64
+
+def save_polynomials(path, polynomials, metadata=None):
+    '''
+    Writes the given dictionary of polynomials (keys must be strings) to the
+    file at path, with an optional JSON-serializable dictionary of metadata
+    (e.g. the optimal cost of the program the polynomials come from).
+    '''
+
+    # Table of the variables and entries of the polynomials.
+    variables = sort_variables(v for p in polynomials.values() for v in p.variables())
+    position = {v: i for i, v in enumerate(variables)}
+    entries = {}
+    powers = []
+    coefs = []
+    start = powers_start = 0
+    for name, p in polynomials.items():
+        if not isinstance(name, str):
+            raise TypeError(f'polynomial names must be strings, got {type(name).__name__}.')
+        p_powers, p_coefs = p.to_arrays()
+        if not is_numeric(p_coefs):
+            raise TypeError(f'only polynomials with numeric coefficients can be saved, {name} is not.')
+        entries[name] = {
+            'basis': None if p.vector_type is None else p.vector_type.__name__,
+            'columns': [position[v] for v in p.variables()],
+            'start': start,
+            'powers_start': powers_start,
+            'terms': len(p)
+        }
+        powers.append(p_powers.reshape(-1))
+        coefs.append(p_coefs)
+        start += len(p)
+        powers_start += p_powers.size
+    powers = np.concatenate(powers) if powers else np.zeros(0, dtype=int)
+    powers = powers.astype(np.min_scalar_type(powers.max(initial=0)))
+    coefs = np.concatenate(coefs) if coefs else np.zeros(0)
+
+    # Header, with the arrays placed after it at aligned offsets.
+    header = {
+        'variables': [[v.name, v.index] for v in variables],
+        'entries': entries,
+        'metadata': {} if metadata is None else metadata,
+        'powers': {'dtype': powers.dtype.str, 'size': len(powers), 'offset': 0},
+        'coefs': {'dtype': '<f8', 'size': len(coefs), 'offset': 0}
+    }
+
+    # Leave room for the digits of the offsets.
+    offset = len(MAGIC) + 8 + len(json.dumps(header)) + 40
+    header['powers']['offset'] = _aligned(offset)
+    header['coefs']['offset'] = _aligned(header['powers']['offset'] + powers.nbytes)
+    encoded = json.dumps(header).encode()
+    if len(MAGIC) + 8 + len(encoded) > header['powers']['offset']:
+        raise RuntimeError(f'header of {len(encoded)} bytes does not fit before the arrays.')
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(encoded)).tobytes())
+        f.write(encoded)
+        for array, spec in ((powers, header['powers']), (coefs.astype('<f8'), header['coefs'])):
+            f.write(b'\0' * (spec['offset'] - f.tell()))
+            f.write(array.tobytes())
+
+def load_polynomials(path, mmap=True):
+    '''
+    Opens a file written by save_polynomials. Returns a read-only mapping
+    from the names to the polynomials, with the metadata in its attribute
+    metadata. If mmap is False, the arrays are read in memory.
+    '''
+    return PolynomialLibrary(path, mmap)
+
+def _aligned(offset):
+    return - (- offset // ALIGNMENT) * ALIGNMENT
+
+class PolynomialLibrary(Mapping):
+    '''
+    Polynomials stored in a file written by save_polynomials.
+
+    Attributes
+    ----------
+    path : str
+        Path of the file.
+    mmap : bool
+        Whether the arrays are memory mapped or read in memory.
+    metadata : dict
+        Metadata stored with the polynomials.
+    _variables : list (of Variable)
+        Table of the variables.
+    _entries : dict
+        Description of each polynomial, as in the header of the file.
+    _powers, _coefs : numpy.ndarray
+        Flat arrays of all the powers and of all the coefficients.
+    '''
+
+    def __init__(self, path, mmap=True):
+        self.path = path
+        self.mmap = mmap
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{path} is not a polynomial file.')
+            length = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+            header = json.loads(f.read(length))
+        self.metadata = header['metadata']
+        self._variables = [poly.Variable(name, index) for name, index in header['variables']]
+        self._entries = header['entries']
+        self._powers, self._coefs = [self._read(header[key]) for key in ('powers', 'coefs')]
+
+    def _read(self, spec):
+        if spec['size'] == 0:
+            return np.zeros(0, dtype=spec['dtype'])
+        if self.mmap:
+            return np.memmap(self.path, spec['dtype'], 'r', spec['offset'], (spec['size'],))
+        return np.fromfile(self.path, spec['dtype'], spec['size'], offset=spec['offset'])
+
+    def __getitem__(self, name):
+        entry = self._entries[name]
+        variables = tuple(self._variables[i] for i in entry['columns'])
+        shape = (entry['terms'], len(variables))
+        start = entry['powers_start']
+        powers = self._powers[start:start + shape[0] * shape[1]].astype(int).reshape(shape)
+        coefs = np.asarray(self._coefs[entry['start']:entry['start'] + shape[0]]).view(np.ndarray)
+        vector_type = None if entry['basis'] is None else getattr(poly, entry['basis'], None)
+        if entry['basis'] is not None and not (isinstance(vector_type, type) and issubclass(vector_type, poly.BasisVector)):
+            raise ValueError(f'unknown basis type {entry["basis"]}.')
+
+        # The stored terms are already canonical, hence they are not
+        # combined and the coefficients are not copied.
+        return poly.Polynomial._from_terms(vector_type, variables, powers, coefs, combine=False)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __reduce__(self):
+        # Worker processes reopen the file instead of receiving the arrays.
+        return type(self), (self.path, self.mmap)
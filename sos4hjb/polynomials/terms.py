@@ -0,0 +1,219 @@
+'''
+Helpers for the array representation of polynomials: an integer matrix of
+powers, with one row per term and one column per variable, and an array of
+coefficients, with one entry per term.
+
+Coefficients can be stored in three ways: a float numpy array (numeric
+coefficients), an object numpy array (e.g. scalar symbolic expressions), or a
+vector expression of a modeling library (e.g. a cvxpy Variable). The last one
+is never split into scalar expressions by the operations below, which act on
+it only through sparse matrix products.
+'''
+
+import numpy as np
+import scipy.sparse as sp
+from numbers import Number, Real
+
+def sort_variables(variables):
+    return tuple(sorted(set(variables), key=lambda v: (v.name, v.index)))
+
+def align_powers(powers, variables, new_variables):
+    '''
+    Expresses the matrix of powers, whose columns are associated with the
+    given variables, in terms of new_variables (a superset of variables).
+    '''
+    if tuple(variables) == tuple(new_variables):
+        return powers
+    aligned = np.zeros((powers.shape[0], len(new_variables)), dtype=int)
+    if len(variables) > 0:
+        position = {v: i for i, v in enumerate(new_variables)}
+        aligned[:, [position[v] for v in variables]] = powers
+    return aligned
+
+def packable(radices):
+    '''
+    Rows of powers with the ith entry smaller than radices[i] can be packed
+    in a single int64 key if the product of the radices is small enough.
+    '''
+    return np.prod(np.asarray(radices, dtype=float)) < 2 ** 62
+
+def pack_powers(powers, radices):
+    '''
+    Packs each row of powers in an integer (mixed-radix representation).
+    '''
+    strides = np.cumprod(np.concatenate(([1], radices)))[:len(radices)].astype(np.int64)
+    return powers.astype(np.int64) @ strides
+
+def unpack_keys(keys, radices):
+    powers = np.empty((len(keys), len(radices)), dtype=int)
+    for j, radix in enumerate(radices):
+        keys, powers[:, j] = np.divmod(keys, radix)
+    return powers
+
+def unique_terms(powers):
+    '''
+    Returns the distinct rows of the matrix of powers, and the array that maps
+    each row of powers to the corresponding distinct row.
+    '''
+    if powers.shape[1] == 0 or len(powers) == 0:
+        unique = np.zeros((min(len(powers), 1), powers.shape[1]), dtype=int)
+        return unique, np.zeros(len(powers), dtype=int)
+    radices = powers.max(axis=0) + 1
+    if packable(radices):
+        keys, inverse = np.unique(pack_powers(powers, radices), return_inverse=True)
+        return unpack_keys(keys, radices), inverse.reshape(-1)
+    unique, inverse = np.unique(powers, axis=0, return_inverse=True)
+    return unique, inverse.reshape(-1)
+
+def tabulated_univariate(powers, images):
+    '''
+    Univariate map that takes the basis vector with power p to the
+    combination of basis vectors with coefficients images(p). Returns the
+    index of the term each output comes from, the power, and the weight of
+    each output.
+    '''
+    terms, column, weights = [np.zeros(0, dtype=int)] * 2 + [np.zeros(0)]
+    for p in np.unique(powers):
+        rows = np.flatnonzero(powers == p)
+        image = np.asarray(images(p), dtype=float)
+        q = np.flatnonzero(image)
+        terms = np.concatenate((terms, np.repeat(rows, len(q))))
+        column = np.concatenate((column, np.tile(q, len(rows))))
+        weights = np.concatenate((weights, np.tile(image[q], len(rows))))
+    return terms, column, weights
+
+def lexsort_terms(powers):
+    if powers.shape[1] == 0:
+        return np.arange(len(powers))
+    return np.lexsort(powers.T)
+
+def coefficient_array(coefs):
+    '''
+    Numeric coefficients are stored in a float array, everything else (e.g.
+    symbolic expressions) in an array of objects.
+    '''
+    coefs = list(coefs)
+    if all(isinstance(c, Real) for c in coefs):
+        return np.array(coefs, dtype=float)
+    array = np.empty(len(coefs), dtype=object)
+    for i, c in enumerate(coefs):
+        array[i] = c
+    return array
+
+def is_expression(coefs):
+    return not isinstance(coefs, np.ndarray)
+
+def is_numeric(coefs):
+    return isinstance(coefs, np.ndarray) and coefs.dtype != object
+
+def as_objects(coefs):
+    if not is_expression(coefs):
+        return coefs.astype(object)
+    array = np.empty(coefs.shape[0], dtype=object)
+    for i in range(coefs.shape[0]):
+        array[i] = coefs[i]
+    return array
+
+def to_python(coefs):
+    return coefs.tolist() if is_numeric(coefs) else list(as_objects(coefs))
+
+def nonzero_coefficients(coefs):
+    if is_numeric(coefs):
+        return coefs != 0
+    if is_expression(coefs):
+        return np.ones(coefs.shape[0], dtype=bool)
+    return np.array([not isinstance(c, Number) or c != 0 for c in coefs], dtype=bool)
+
+def linear_map(matrix, coefs):
+    '''
+    Product of a sparse matrix with the array of coefficients.
+    '''
+    matrix = sp.csr_matrix(matrix)
+    if is_numeric(coefs) or is_expression(coefs):
+        return matrix @ coefs
+    result = np.zeros(matrix.shape[0], dtype=object)
+    for i, (start, end) in enumerate(zip(matrix.indptr[:-1], matrix.indptr[1:])):
+        weights = matrix.data[start:end].tolist()
+        result[i] = sum(w * c for w, c in zip(weights, coefs[matrix.indices[start:end]]))
+    return result
+
+def segment_sum(coefs, groups, size):
+    '''
+    Sums the coefficients that belong to the same group.
+    '''
+    if is_numeric(coefs):
+        return np.bincount(groups, weights=coefs, minlength=size)
+    if is_expression(coefs):
+        ones = np.ones(len(groups))
+        matrix = sp.csr_matrix((ones, (groups, np.arange(len(groups)))), (size, len(groups)))
+        return linear_map(matrix, coefs)
+    sums = np.zeros(size, dtype=object)
+    np.add.at(sums, groups, coefs)
+    return sums
+
+def scale_coefficients(coefs, scale):
+    '''
+    Elementwise multiplication of the coefficients by the given array.
+    '''
+    scale = np.asarray(scale)
+    if is_expression(coefs):
+        if scale.dtype == object:
+            return as_objects(coefs) * scale
+        return linear_map(sp.diags(scale.astype(float)), coefs)
+    if is_numeric(coefs) and scale.dtype != object:
+        return coefs * scale
+    return coefs.astype(object) * scale.astype(object)
+
+def dot_coefficients(values, coefs):
+    '''
+    Product of the given array (vector or matrix) with the coefficients.
+    '''
+    values = np.asarray(values)
+    if values.dtype == object or not (is_numeric(coefs) or is_expression(coefs)):
+        return values.astype(object) @ as_objects(coefs)
+    return values @ coefs
+
+def concatenate_coefficients(arrays):
+    expressions = [is_expression(c) for c in arrays]
+    if not any(expressions):
+        return np.concatenate(arrays)
+    if any(not e and not is_numeric(c) for c, e in zip(arrays, expressions)):
+        return np.concatenate([as_objects(c) for c in arrays])
+
+    # Numeric arrays and vector expressions are stacked through sparse maps.
+    sizes = [c.shape[0] for c in arrays]
+    offsets = np.cumsum([0] + sizes)
+    concatenation = 0
+    for c, size, offset in zip(arrays, sizes, offsets):
+        rows = np.arange(size) + offset
+        embedding = sp.csr_matrix((np.ones(size), (rows, np.arange(size))), (offsets[-1], size))
+        concatenation = concatenation + linear_map(embedding, c)
+    return concatenation
+
+def multiply_coefficients(coefs1, coefs2, left, right, groups, weights, size):
+    '''
+    Coefficients of the product of two polynomials. The kth elementary product
+    multiplies the terms left[k] and right[k], is scaled by weights[k], and is
+    accumulated in the term groups[k] of the product.
+    '''
+    numeric1 = is_numeric(coefs1)
+    numeric2 = is_numeric(coefs2)
+    if numeric1 and numeric2:
+        products = weights * coefs1[left] * coefs2[right]
+        return np.bincount(groups, weights=products, minlength=size)
+
+    # If one of the two factors is numeric, the product is linear in the other.
+    if numeric2:
+        matrix = sp.csr_matrix((weights * coefs2[right], (groups, left)), (size, coefs1.shape[0]))
+        return linear_map(matrix, coefs1)
+    if numeric1:
+        matrix = sp.csr_matrix((weights * coefs1[left], (groups, right)), (size, coefs2.shape[0]))
+        return linear_map(matrix, coefs2)
+
+    # Vector expressions with an elementwise product (e.g. parameters times
+    # decision variables in the conic backend).
+    if is_expression(coefs1) and is_expression(coefs2) and hasattr(coefs1, 'multiply'):
+        products = linear_map(sp.diags(weights), coefs1[left]).multiply(coefs2[right])
+        return segment_sum(products, groups, size)
+    products = as_objects(coefs1)[left] * as_objects(coefs2)[right] * weights.astype(object)
+    return segment_sum(products, groups, size)
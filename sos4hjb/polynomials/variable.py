@@ -1,6 +1,10 @@
+from weakref import WeakValueDictionary
+
 class Variable:
     '''
-    Elementary variable for a polynomial.
+    Elementary variable for a polynomial. Variables are immutable and
+    interned: constructing a variable with the same name and index as an
+    existing one returns the existing object, hence equality is identity.
 
     Attributes
     ----------
@@ -10,23 +14,48 @@ class Variable:
         Index of the variable. If equal to 0, the variable will have no index.
     _hash : int
         Stored (and not computed on the fly) to accelerate comparisons.
+    _table : WeakValueDictionary
+        Table of the existing variables, keyed by type, name, and index.
     '''
 
-    def __init__(self, name, index=0):
-        self._verify_name(name)
-        self._verify_index(index)
-        self.name = name
-        self.index = index
-        self._hash = hash((self.name, self.index))
+    __slots__ = ('name', 'index', '_hash', '__weakref__')
+    _table = WeakValueDictionary()
+
+    def __new__(cls, name, index=0):
+        cls._verify_name(name)
+        cls._verify_index(index)
+        key = (cls, name, int(index))
+        variable = cls._table.get(key)
+        if variable is None:
+            variable = object.__new__(cls)
+            object.__setattr__(variable, 'name', name)
+            object.__setattr__(variable, 'index', int(index))
+            object.__setattr__(variable, '_hash', hash((name, int(index))))
+            cls._table[key] = variable
+        return variable
+
+    def __setattr__(self, attribute, value):
+        raise AttributeError(f'{type(self).__name__} is immutable.')
 
     def __hash__(self):
         return self._hash
 
     def __eq__(self, variable):
-        return self._hash == variable._hash
+        return self is variable
     
     def __ne__(self, variable):
-        return not self == variable
+        return self is not variable
+
+    def __reduce__(self):
+        # The hash of strings changes across processes, hence it is recomputed
+        # when unpickling. Unpickled variables are interned too.
+        return type(self), (self.name, self.index)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __repr__(self):
         representation = self.name
@@ -0,0 +1,38 @@
+import unittest
+
+from sos4hjb.polynomials import (Variable, MonomialVector, ChebyshevVector,
+                                 Polynomial)
+from sos4hjb.optimization.basis_selection import newton_polytope_basis
+
+class TestBasisSelection(unittest.TestCase):
+
+    x = Variable.multivariate('x', 3)
+
+    def test_newton_polytope_basis(self):
+
+        # Sparse sum of squares.
+        M = MonomialVector
+        q1 = Polynomial({M({self.x[0]: 2, self.x[1]: 1}): 1, M({self.x[2]: 1}): - 1})
+        q2 = Polynomial({M({self.x[1]: 2, self.x[2]: 1}): 1, M({self.x[0]: 1}): 2})
+        p = q1 ** 2 + q2 ** 2
+        basis = M.construct_basis(self.x, 3)
+        reduced = newton_polytope_basis(p, basis)
+        self.assertTrue(len(reduced) < len(basis))
+        for v in q1.vectors() + q2.vectors():
+            self.assertTrue(v in reduced)
+        self.assertTrue(M({}) not in reduced)
+        self.assertTrue(M({self.x[1]: 3}) not in reduced)
+
+        # Diagonal consistency: x_1 x_2 is in half the Newton polytope but
+        # its square cannot be matched.
+        p = Polynomial({M({self.x[0]: 4, self.x[1]: 2}): 1, M({self.x[0]: 2, self.x[1]: 4}): 1, M({}): 1})
+        basis = M.construct_basis(self.x[:2], 3)
+        reduced = newton_polytope_basis(p, basis)
+        self.assertEqual(set(reduced), {M({}), M({self.x[0]: 2, self.x[1]: 1}), M({self.x[0]: 1, self.x[1]: 2})})
+
+        # Chebyshev basis vectors below the monomials that are kept.
+        C = ChebyshevVector
+        p = Polynomial({C({self.x[0]: 4}): 1, C({self.x[1]: 2}): 1})
+        basis = C.construct_basis(self.x[:2], 2)
+        reduced = newton_polytope_basis(p, basis)
+        self.assertEqual(set(reduced), {C({}), C({self.x[0]: 1}), C({self.x[1]: 1}), C({self.x[0]: 2})})
@@ -0,0 +1,30 @@
+import unittest
+
+from sos4hjb.polynomials import Variable, MonomialVector, Polynomial
+from sos4hjb.optimization.cvx import SosProgram
+from sos4hjb.optimization.batch import solve_many
+
+x = Variable('x')
+
+def build_lower_bound(config):
+
+    # Largest constant below x^4 + a x^2 + 1.
+    prog = SosProgram()
+    gamma, c = prog.add_polynomial([MonomialVector({})])
+    p = Polynomial({MonomialVector({x: 4}): 1, MonomialVector({x: 2}): config['a'], MonomialVector({}): 1})
+    prog.add_sos_constraint(p - gamma)
+    prog.add_linear_cost(- gamma({x: 0}))
+    return prog, {'gamma': gamma}
+
+class TestBatch(unittest.TestCase):
+
+    def test_solve_many(self):
+
+        configs = [{'a': a} for a in (0, - 1, - 2)]
+        for workers in (1, 2):
+            results = solve_many(build_lower_bound, configs, workers=workers)
+            self.assertEqual([r['config'] for r in results], configs)
+            for r, bound in zip(results, (1, .75, 0)):
+                self.assertAlmostEqual(- r['minimum'], bound, places=4)
+                self.assertAlmostEqual(r['values']['gamma']({x: 0}), bound, places=4)
+                self.assertTrue(r['build_time'] >= 0 and r['solve_time'] >= 0)
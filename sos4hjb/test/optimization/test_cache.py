@@ -0,0 +1,87 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+
+from sos4hjb.polynomials import Variable, MonomialVector, Polynomial
+from sos4hjb.optimization import cvx, conic
+from sos4hjb.optimization.cache import SolveCache, fingerprint
+
+x = Variable('x')
+Programs = (cvx.SosProgram, conic.SosProgram)
+
+def build_lower_bound(SosProgram, a):
+
+    # Largest constant below x^4 + a x^2 + 1.
+    prog = SosProgram()
+    gamma, c = prog.add_polynomial([MonomialVector({})])
+    p = Polynomial({MonomialVector({x: 4}): 1, MonomialVector({x: 2}): a, MonomialVector({}): 1})
+    prog.add_sos_constraint(p - gamma)
+    prog.add_linear_cost(- gamma({x: 0}))
+    return prog, gamma
+
+class TestSolveCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_solve(self):
+
+        for SosProgram in Programs:
+            cache = SolveCache(os.path.join(self.directory.name, SosProgram.__module__))
+
+            # First solve calls the solver.
+            prog, gamma = build_lower_bound(SosProgram, - 1)
+            self.assertFalse(cache.solve(prog))
+            minimum = prog.minimum()
+            gamma_opt = prog.substitute_minimizer(gamma)
+            self.assertAlmostEqual(minimum, - .75, places=4)
+
+            # Identical program constructed again is restored from the cache,
+            # without calling the solver.
+            prog, gamma = build_lower_bound(SosProgram, - 1)
+            prog.solve = None
+            self.assertTrue(cache.solve(prog))
+            self.assertEqual(prog.minimum(), minimum)
+            self.assertEqual(prog.substitute_minimizer(gamma), gamma_opt)
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+            # Different data give a different fingerprint.
+            prog, gamma = build_lower_bound(SosProgram, - 2)
+            key = fingerprint(prog)
+            self.assertNotEqual(key, fingerprint(build_lower_bound(SosProgram, - 1)[0]))
+            self.assertEqual(key, fingerprint(build_lower_bound(SosProgram, - 2)[0]))
+            self.assertFalse(cache.solve(prog))
+            self.assertAlmostEqual(prog.minimum(), 0, places=4)
+            self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+            # Infeasible programs are cached as well.
+            prog, gamma = build_lower_bound(SosProgram, - 1)
+            prog.add_linear_constraint(gamma({x: 0}) >= 1)
+            self.assertFalse(cache.solve(prog))
+            prog, gamma = build_lower_bound(SosProgram, - 1)
+            prog.add_linear_constraint(gamma({x: 0}) >= 1)
+            self.assertTrue(cache.solve(prog))
+            self.assertEqual(prog.minimum(), np.inf)
+
+            cache.clear()
+            self.assertEqual(cache.size(), 0)
+
+    def test_eviction(self):
+
+        # Each entry fits in the cache, but not two of them.
+        cache = SolveCache(self.directory.name)
+        prog = build_lower_bound(conic.SosProgram, - 1)[0]
+        cache.solve(prog)
+        cache.max_bytes = cache.size() + 1
+        for a in (0, - 2):
+            cache.solve(build_lower_bound(conic.SosProgram, a)[0])
+        self.assertLessEqual(cache.size(), cache.max_bytes)
+        self.assertEqual(len(os.listdir(self.directory.name)), 1)
+
+        # The most recent entry is kept.
+        self.assertTrue(cache.solve(build_lower_bound(conic.SosProgram, - 2)[0]))
+        self.assertFalse(cache.solve(build_lower_bound(conic.SosProgram, - 1)[0]))
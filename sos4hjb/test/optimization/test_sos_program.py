@@ -3,6 +3,7 @@ import numpy as np
 
 from sos4hjb.polynomials import (Variable, MonomialVector, ChebyshevVector,
                                  Polynomial)
+from sos4hjb.optimization.dsos import refine_basis_changes
 
 def make_test_sos_program(SosProgram):
 
@@ -81,6 +82,21 @@ def make_test_sos_program(SosProgram):
                 poly_opt_gram += Polynomial.quadratic_form(basis_o, gram_opt_o)
                 self.assertAlmostEqual(poly_opt, poly_opt_gram, places=4)
 
+        def test_substitute_minimizer_no_solution(self):
+
+            for Vector in Vectors:
+
+                # Nonnegative polynomial constrained to be negative.
+                prog = SosProgram()
+                basis = Vector.construct_basis(self.x, 1)
+                poly, gram, cons = prog.add_sos_polynomial(basis)
+                self.assertIsNone(prog.substitute_minimizer(poly))
+                prog.add_linear_constraint(poly(self.one) <= - 1)
+                prog.solve()
+                self.assertEqual(prog.minimum(), np.inf)
+                self.assertIsNone(prog.substitute_minimizer(poly))
+                self.assertIsNone(prog.substitute_minimizer(gram))
+
         def test_add_sos_constraint(self):
 
             # Fit free polynomial in 2 points, and minimize value at a third.
@@ -147,8 +163,171 @@ def make_test_sos_program(SosProgram):
                 with self.assertRaises(ValueError):
                     prog.add_sos_constraint(poly)
 
+        def test_add_sos_constraint_newton_polytope(self):
+
+            for Vector in Vectors:
+
+                # Sparse SOS polynomial.
+                q1 = Polynomial({Vector({self.x[0]: 3}): 1, Vector({self.x[1]: 1}): - 1})
+                q2 = Polynomial({Vector({self.x[1]: 2}): 1})
+                p = q1 ** 2 + q2 ** 2
+                prog = SosProgram()
+                p_sos, gram = prog.add_sos_constraint(p, newton_polytope=True)[:2]
+                size = sum(g.shape[0] for g in gram) if isinstance(gram, list) else gram.shape[0]
+                self.assertTrue(size < len(Vector.construct_basis(self.x, 3)))
+                prog.solve()
+                self.assertAlmostEqual(prog.minimum(), 0, places=4)
+
+                # Polynomial that is not SOS.
+                p = Polynomial({Vector({self.x[0]: 4}): 1, Vector({self.x[0]: 1, self.x[1]: 1}): 1})
+                prog = SosProgram()
+                prog.add_sos_constraint(p, newton_polytope=True)
+                prog.solve()
+                self.assertEqual(prog.minimum(), np.inf)
+
+        def test_add_sos_constraint_correlative_sparsity(self):
+
+            for Vector in Vectors:
+
+                # Chained SOS polynomial.
+                x = Variable.multivariate('x', 3)
+                q1 = Polynomial({Vector({x[0]: 1}): 1, Vector({x[1]: 2}): - 1})
+                q2 = Polynomial({Vector({x[1]: 1}): 1, Vector({x[2]: 2}): - 1})
+                p = q1 ** 2 + q2 ** 2 + Polynomial({Vector({}): 1})
+                prog = SosProgram()
+                p_sos, gram = prog.add_sos_constraint(p, correlative_sparsity=True)[:2]
+                self.assertEqual(len(gram), 2)
+                prog.solve()
+                self.assertAlmostEqual(prog.minimum(), 0, places=4)
+                p_opt = prog.substitute_minimizer(p_sos)
+                self.assertAlmostEqual(p_opt, p, places=4)
+
+        def test_add_sos_constraint_symmetry_reduction(self):
+
+            for Vector in Vectors:
+
+                # Polynomial symmetric in x_1 and x_2.
+                x1, x2 = self.x
+                q1 = Polynomial({Vector({x1: 2}): 1, Vector({x2: 2}): 1, Vector({}): - 1})
+                q2 = Polynomial({Vector({x1: 1}): 1, Vector({x2: 1}): 1})
+                p = q1 ** 2 + q2 ** 2
+                basis = Vector.construct_basis(self.x, 2)
+                prog = SosProgram()
+                p_sos, gram = prog.add_sos_constraint(p, symmetry_reduction=True)[:2]
+                self.assertTrue(max(g.shape[0] for g in gram) < len(basis))
+                prog.solve()
+                self.assertAlmostEqual(prog.minimum(), 0, places=4)
+                p_opt = prog.substitute_minimizer(p_sos)
+                self.assertAlmostEqual(p_opt, p, places=4)
+
+        def test_add_sos_constraint_cone(self):
+
+            # Lower bound on a polynomial with LP, SOCP, and SDP constraints.
+            for Vector in Vectors:
+                x1, x2 = self.x
+                p = Polynomial({Vector({x1: 4}): 1, Vector({x2: 4}): 1, Vector({x1: 1, x2: 1}): - 3, Vector({x1: 2}): 1})
+                def build(cone, changes=None):
+                    prog = SosProgram()
+                    gamma = prog.add_polynomial([Vector({})])[0]
+                    prog.add_linear_cost(gamma(self.zero))
+                    gram = prog.add_sos_constraint(p + gamma, cone=cone, changes=changes)[1]
+                    prog.solve()
+                    return prog, gram
+                bounds = {cone: build(cone)[0].minimum() for cone in ('psd', 'sdd', 'dd')}
+                self.assertTrue(bounds['psd'] <= bounds['sdd'] + 1e-4)
+                self.assertTrue(bounds['sdd'] <= bounds['dd'] + 1e-4)
+                with self.assertRaises(ValueError):
+                    build('nsd')
+
+                # Iterative change of basis.
+                costs = refine_basis_changes(lambda changes: build('dd', changes), 2)[2]
+                self.assertAlmostEqual(costs[0], bounds['dd'], places=4)
+                for cost, next_cost in zip(costs[:-1], costs[1:]):
+                    self.assertTrue(next_cost <= cost + 1e-4)
+                self.assertTrue(costs[-1] < costs[0])
+                self.assertTrue(costs[-1] >= bounds['psd'] - 1e-4)
+
+        def test_solve_warm_start(self):
+
+            for Vector in Vectors:
+
+                # Lower bound of a polynomial with degree 2 and 4 multipliers.
+                x1, x2 = self.x
+                q = Polynomial({Vector({x1: 2}): 1, Vector({x2: 1}): - 1})
+                f = q ** 2 + Polynomial({Vector({x1: 1}): 1})
+                def build(degree):
+                    prog = SosProgram()
+                    p = prog.add_polynomial(Vector.construct_basis(self.x, degree))[0]
+                    prog.add_sos_constraint(f - p)
+                    prog.add_linear_cost(- p(self.one) - p(self.zero))
+                    return prog, p
+                prog, p = build(2)
+                prog.solve()
+                p_opt = prog.substitute_minimizer(p)
+                prog, p = build(4)
+                prog.solve()
+                cold = prog.minimum()
+                prog, p = build(4)
+                prog.solve(warm_start=[(p, p_opt)])
+                self.assertAlmostEqual(prog.minimum(), cold, places=4)
+
         @staticmethod
         def _is_psd(A, tol=1e-7):
             return all(np.linalg.eig(A)[0] > - tol)
 
     return TestSosProgram
+
+def make_test_parametric_sos_program(SosProgram):
+
+    Vectors = (MonomialVector, ChebyshevVector)
+
+    class TestParametricSosProgram(unittest.TestCase):
+
+        x = Variable('x')
+
+        def test_add_parametric_polynomial(self):
+
+            for Vector in Vectors:
+
+                # Lower bound of x^2 + theta x + 1 (in the monomial basis),
+                # which is 1 - theta^2 / 4.
+                prog = SosProgram()
+                basis = [Vector({}), Vector({self.x: 1})]
+                p, theta = prog.add_parametric_polynomial(basis, value=[1, 0])
+                x2 = Polynomial({MonomialVector({self.x: 2}): 1})
+                p += x2 if Vector == MonomialVector else x2.in_chebyshev_basis()
+                gamma = prog.add_polynomial([Vector({})])[0]
+                prog.add_sos_constraint(p - gamma)
+                prog.add_linear_cost(- gamma({self.x: 0}))
+                for t in [0, 1, - 1.5]:
+                    prog.set_parameter_values(theta, [1, t])
+                    prog.solve()
+                    self.assertAlmostEqual(prog.minimum(), t ** 2 / 4 - 1, places=4)
+                    gamma_opt = prog.substitute_minimizer(gamma)
+                    self.assertAlmostEqual(gamma_opt({self.x: 0}), 1 - t ** 2 / 4, places=4)
+
+        def test_parametric_bounds(self):
+
+            for Vector in Vectors:
+
+                # Lower bound of x on the set theta - x^2 >= 0, which is
+                # - sqrt(theta), with a constant S-procedure multiplier that
+                # multiplies the parameter.
+                prog = SosProgram()
+                r, theta = prog.add_parametric_polynomial([Vector({})], value=[1])
+                x2 = Polynomial({MonomialVector({self.x: 2}): 1})
+                g = r - (x2 if Vector == MonomialVector else x2.in_chebyshev_basis())
+                lam = prog.add_sos_polynomial([Vector({})])[0]
+                gamma = prog.add_polynomial([Vector({})])[0]
+                x = Polynomial({Vector({self.x: 1}): 1})
+                prog.add_sos_constraint(x - gamma - lam * g)
+                prog.add_linear_cost(- gamma({self.x: 0}))
+                for t in [1, .25, 4]:
+                    prog.set_parameter_values(theta, [t])
+                    prog.solve()
+                    self.assertAlmostEqual(prog.minimum(), t ** .5, places=4)
+                    gamma_opt = prog.substitute_minimizer(gamma)
+                    self.assertAlmostEqual(gamma_opt({self.x: 0}), - t ** .5, places=4)
+
+    return TestParametricSosProgram
+
@@ -0,0 +1,70 @@
+import unittest
+
+from sos4hjb.polynomials import Variable, MonomialVector, Polynomial
+from sos4hjb.optimization.conic import SosProgram
+from sos4hjb.test.optimization.test_sos_program import (make_test_sos_program,
+                                                        make_test_parametric_sos_program)
+
+class TestSosProgram(make_test_sos_program(SosProgram)):
+
+    def test_solve_warm_start(self):
+
+        # Clarabel, the default solver, ignores the warm start, and the user
+        # is warned about it.
+        with self.assertWarns(UserWarning):
+            super().test_solve_warm_start()
+
+class TestParametricSosProgram(make_test_parametric_sos_program(SosProgram)):
+    pass
+
+class RecordingWorkspace:
+    '''
+    Wraps an SCS workspace and records the arguments of its solves.
+    '''
+
+    def __init__(self, workspace):
+        self.workspace = workspace
+        self.calls = []
+
+    def solve(self, **kwargs):
+        self.calls.append(kwargs)
+        return self.workspace.solve(**kwargs)
+
+    def update(self, **kwargs):
+        return self.workspace.update(**kwargs)
+
+class TestWarmStartScs(unittest.TestCase):
+
+    def test_solve_warm_start(self):
+
+        # Lower bound of a polynomial with degree 2 and 4 multipliers.
+        x = Variable.multivariate('x', 2)
+        q = Polynomial({MonomialVector({x[0]: 2}): 1, MonomialVector({x[1]: 1}): - 1})
+        f = q ** 2 + Polynomial({MonomialVector({x[0]: 1}): 1})
+        zero = {xi: 0 for xi in x}
+        def build(degree):
+            prog = SosProgram('scs')
+            p = prog.add_polynomial(MonomialVector.construct_basis(x, degree))[0]
+            prog.add_sos_constraint(f - p)
+            prog.add_linear_cost(- p(zero))
+            return prog, p
+        prog, p = build(2)
+        prog.solve()
+        p_opt = prog.substitute_minimizer(p)
+
+        # The lifted solution reaches SCS as initial primal point.
+        prog, p = build(4)
+        prog.solve()
+        cold = prog.minimum()
+        workspace = RecordingWorkspace(prog.data['scs'])
+        prog.data['scs'] = workspace
+        prog.solve(warm_start=[(p, p_opt)])
+        x0 = workspace.calls[-1]['x']
+        powers, coefs = p.to_arrays()
+        p0 = Polynomial.from_arrays(MonomialVector, p.variables(), powers, coefs.evaluate(x0))
+        self.assertAlmostEqual(p0, p_opt, places=7)
+        self.assertAlmostEqual(prog.minimum(), cold, places=3)
+
+        # Without warm start, SCS starts from its previous solution.
+        prog.solve()
+        self.assertNotIn('x', workspace.calls[-1])
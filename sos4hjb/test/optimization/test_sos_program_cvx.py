@@ -1,5 +1,15 @@
 from sos4hjb.optimization.cvx import SosProgram
-from sos4hjb.test.optimization.test_sos_program import make_test_sos_program
+from sos4hjb.test.optimization.test_sos_program import (make_test_sos_program,
+                                                        make_test_parametric_sos_program)
 
 class TestSosProgram(make_test_sos_program(SosProgram)):
+
+    def test_solve_warm_start(self):
+
+        # The solvers called through cvxpy ignore the warm start, and the user
+        # is warned about it.
+        with self.assertWarns(UserWarning):
+            super().test_solve_warm_start()
+
+class TestParametricSosProgram(make_test_parametric_sos_program(SosProgram)):
     pass
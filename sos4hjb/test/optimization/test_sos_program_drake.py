@@ -1,5 +1,33 @@
-from sos4hjb.optimization.drake import SosProgram
-from sos4hjb.test.optimization.test_sos_program import make_test_sos_program
+import unittest
 
+from sos4hjb.polynomials import Variable, MonomialVector, Polynomial
+from sos4hjb.test.optimization.test_sos_program import (make_test_sos_program,
+                                                        make_test_parametric_sos_program)
+
+try:
+    from sos4hjb.optimization.drake import SosProgram
+    HAVE_PYDRAKE = True
+except ImportError:
+    SosProgram = None
+    HAVE_PYDRAKE = False
+
+@unittest.skipUnless(HAVE_PYDRAKE, 'pydrake is not installed.')
 class TestSosProgram(make_test_sos_program(SosProgram)):
     pass
+
+@unittest.skipUnless(HAVE_PYDRAKE, 'pydrake is not installed.')
+class TestParametricSosProgram(make_test_parametric_sos_program(SosProgram)):
+
+    def test_parametric_bounds(self):
+
+        # Drake parameters are decision variables fixed by equality
+        # constraints, hence the S-procedure multiplier cannot multiply them.
+        x = Variable('x')
+        prog = SosProgram()
+        r, theta = prog.add_parametric_polynomial([MonomialVector({})], value=[1])
+        g = r - Polynomial({MonomialVector({x: 2}): 1})
+        lam = prog.add_sos_polynomial([MonomialVector({})])[0]
+        with self.assertRaises(ValueError):
+            prog.add_sos_constraint(Polynomial({MonomialVector({x: 1}): 1}) - lam * g)
+        with self.assertRaises(ValueError):
+            prog.add_linear_cost((lam * r)({x: 0}))
@@ -0,0 +1,35 @@
+import unittest
+
+from sos4hjb.polynomials import Variable, MonomialVector, Polynomial
+from sos4hjb.optimization.sparsity import (correlative_sparsity_graph,
+                                           chordal_extension, maximal_cliques,
+                                           correlative_cliques)
+
+class TestSparsity(unittest.TestCase):
+
+    x = Variable.multivariate('x', 4)
+
+    def test_correlative_sparsity_graph(self):
+
+        # Chain x_1 - x_2 - x_3 and isolated x_4.
+        M = MonomialVector
+        p = Polynomial({M({self.x[0]: 2, self.x[1]: 1}): 1, M({self.x[1]: 1, self.x[2]: 3}): 2, M({self.x[3]: 2}): 1})
+        graph = correlative_sparsity_graph(p)
+        self.assertEqual(graph[self.x[0]], {self.x[1]})
+        self.assertEqual(graph[self.x[1]], {self.x[0], self.x[2]})
+        self.assertEqual(graph[self.x[2]], {self.x[1]})
+        self.assertEqual(graph[self.x[3]], set())
+        self.assertEqual(correlative_cliques(p), [self.x[:2], self.x[1:3], [self.x[3]]])
+
+    def test_chordal_extension(self):
+
+        # The cycle x_1 - x_2 - x_3 - x_4 - x_1 needs one chord.
+        x = self.x
+        graph = {x[i]: {x[i - 1], x[(i + 1) % 4]} for i in range(4)}
+        extension, cliques = chordal_extension(graph)
+        edges = sum(len(neighbors) for neighbors in extension.values()) // 2
+        self.assertEqual(edges, 5)
+        cliques = maximal_cliques(cliques)
+        self.assertEqual(len(cliques), 2)
+        for clique in cliques:
+            self.assertEqual(len(clique), 3)
@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+
+from sos4hjb.polynomials import (Variable, MonomialVector, ChebyshevVector,
+                                 Polynomial)
+from sos4hjb.optimization.symmetry import (sign_symmetries,
+                                           permutation_symmetries,
+                                           symmetry_adapted_blocks)
+
+Vectors = (MonomialVector, ChebyshevVector)
+
+class TestSymmetry(unittest.TestCase):
+
+    x = Variable.multivariate('x', 4)
+
+    def _polynomial(self, Vector):
+        x = self.x
+        return Polynomial({Vector({x[0]: 4}): 1, Vector({x[1]: 4}): 1, Vector({x[0]: 1, x[1]: 1}): 2,
+                           Vector({x[2]: 2}): 1, Vector({x[3]: 2}): 1, Vector({x[2]: 1, x[3]: 1}): - 1})
+
+    def test_sign_symmetries(self):
+
+        for Vector in Vectors:
+            flips = sign_symmetries(self._polynomial(Vector))
+            self.assertEqual(flips.tolist(), [[1, 1, 0, 0], [0, 0, 1, 1]])
+
+            # Even polynomial.
+            p = Polynomial({Vector({self.x[0]: 1, self.x[1]: 1}): 1, Vector({self.x[1]: 2}): 1})
+            self.assertEqual(sign_symmetries(p).tolist(), [[1, 1]])
+
+    def test_permutation_symmetries(self):
+
+        for Vector in Vectors:
+            p = self._polynomial(Vector)
+            permutations = permutation_symmetries(p)
+            x = self.x
+            self.assertEqual(permutations, [{x[0]: x[1], x[1]: x[0]}, {x[2]: x[3], x[3]: x[2]}])
+
+            # Subsystems (y_i, z_i) that are swapped together.
+            y = Variable.multivariate('y', 2)
+            z = Variable.multivariate('z', 2)
+            p = Polynomial({Vector({y[0]: 2, z[0]: 1}): 1, Vector({y[1]: 2, z[1]: 1}): 1})
+            self.assertEqual(permutation_symmetries(p), [{y[0]: y[1], y[1]: y[0], z[0]: z[1], z[1]: z[0]}])
+
+    def test_symmetry_adapted_blocks(self):
+
+        for Vector in Vectors:
+            p = self._polynomial(Vector)
+            basis = Vector.construct_basis(self.x, 2)
+            blocks = symmetry_adapted_blocks(p, basis)
+            sizes = sorted(block.shape[0] for block in blocks)
+            self.assertEqual(sizes, [1] * 10 + [5])
+
+            # Blocks are orthogonal and cover the whole span of the basis.
+            T = np.vstack([block.toarray() for block in blocks])
+            np.testing.assert_array_almost_equal(T @ T.T, np.eye(len(basis)))
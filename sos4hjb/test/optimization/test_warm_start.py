@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+
+from sos4hjb.polynomials import (Variable, MonomialVector, ChebyshevVector,
+                                 Polynomial)
+from sos4hjb.optimization.warm_start import lift_coefficients, lift_gram
+
+Vectors = (MonomialVector, ChebyshevVector)
+
+class TestWarmStart(unittest.TestCase):
+
+    x = Variable.multivariate('x', 2)
+
+    def test_lift_coefficients(self):
+
+        for Vector in Vectors:
+
+            # Decision polynomial with symbolic coefficients.
+            basis = Vector.construct_basis(self.x, 4)
+            coefs = np.empty(len(basis), dtype=object)
+            coefs[:] = [Polynomial({MonomialVector({Variable('c', i + 1): 1}): 1}) for i in range(len(basis))]
+            p = Polynomial.from_basis(basis, coefs)
+            q = Polynomial({Vector({}): 2, Vector({self.x[0]: 1, self.x[1]: 1}): - 1})
+            lifted = lift_coefficients(p, q)
+            self.assertEqual(Polynomial.from_basis(basis, lifted), q)
+
+            # Lifting from the other basis.
+            lifted = lift_coefficients(p, q.in_monomial_basis() if Vector == ChebyshevVector else q.in_chebyshev_basis())
+            self.assertAlmostEqual(Polynomial.from_basis(basis, lifted), q)
+
+            # Terms that are not in the decision polynomial.
+            with self.assertRaises(ValueError):
+                lift_coefficients(p, Polynomial({Vector({self.x[0]: 5}): 1}))
+
+    def test_lift_gram(self):
+
+        for Vector in Vectors:
+            basis = Vector.construct_basis(self.x, 1)
+            new_basis = Vector.construct_basis(self.x, 2)
+            gram = np.array([[2, 1, 0], [1, 2, 1], [0, 1, 2]])
+            lifted = lift_gram(gram, basis, new_basis)
+            self.assertAlmostEqual(Polynomial.quadratic_form(new_basis, lifted), Polynomial.quadratic_form(basis, gram))
+            with self.assertRaises(ValueError):
+                lift_gram(gram, new_basis[:3], basis[:2])
@@ -0,0 +1,96 @@
+import unittest
+import numpy as np
+import cvxpy as cp
+
+from sos4hjb.polynomials import (Variable, MonomialVector, ChebyshevVector,
+                                 Polynomial, BasisIndex)
+
+Vectors = (MonomialVector, ChebyshevVector)
+
+class TestBasisIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.x = Variable.multivariate('x', 3)
+
+    def test_init(self):
+
+        for Vector in Vectors:
+            index = BasisIndex(Vector, self.x, 3)
+            self.assertEqual(index.variables, tuple(self.x))
+            self.assertEqual(index, BasisIndex(Vector, self.x, 3))
+            self.assertNotEqual(index, BasisIndex(Vector, self.x, 3, odd=False))
+            with self.assertRaises(ValueError):
+                BasisIndex(Vector, self.x, - 1)
+            with self.assertRaises(ValueError):
+                BasisIndex(Vector, self.x * 2, 3)
+
+    def test_index_vectors(self):
+
+        for Vector in Vectors:
+            for even, odd in ((True, True), (True, False), (False, True)):
+                index = BasisIndex(Vector, self.x, 3, even, odd)
+                basis = Vector.construct_basis(self.x, 3, even, odd)
+                self.assertEqual(len(index), len(basis))
+                self.assertEqual(list(index), basis)
+                self.assertEqual([index.index(v) for v in basis], list(range(len(basis))))
+                self.assertEqual(index.vectors([2, 0]), [basis[2], basis[0]])
+                self.assertTrue(all(v in index for v in basis))
+            index = BasisIndex(Vector, self.x, 3, odd=False)
+            self.assertFalse(Vector({self.x[0]: 1}) in index)
+            self.assertFalse(Vector({self.x[0]: 4}) in index)
+            self.assertFalse(Vector({Variable('y'): 2}) in index)
+            with self.assertRaises(ValueError):
+                index.index(Vector({self.x[0]: 1}))
+
+    def test_rank(self):
+
+        for Vector in Vectors:
+            index = BasisIndex(Vector, self.x, 3)
+
+            # Columns in a different order, and an additional variable that
+            # does not appear.
+            y = Variable('y')
+            powers = np.array([[0, 1, 0, 1], [0, 0, 0, 2]])
+            ranks = index.rank(powers, [y, self.x[2], self.x[0], self.x[1]])
+            basis = Vector.construct_basis(self.x, 3)
+            self.assertEqual(basis[ranks[0]], Vector({self.x[2]: 1, self.x[1]: 1}))
+            self.assertEqual(basis[ranks[1]], Vector({self.x[1]: 2}))
+            with self.assertRaises(ValueError):
+                index.rank([[1, 0, 0, 0]], [y, self.x[2], self.x[0], self.x[1]])
+
+    def test_dense_sparse(self):
+
+        for Vector in Vectors:
+            index = BasisIndex(Vector, self.x, 3)
+            v0 = Vector({self.x[0]: 2, self.x[2]: 1})
+            v1 = Vector({self.x[1]: 1})
+            p = Polynomial({v0: 2.5, v1: - 1})
+            q = Polynomial({v1: 3, Vector({}): 2})
+
+            # Sum as the sum of the dense vectors.
+            dense = index.to_dense(p)
+            self.assertEqual(dense.shape, (len(index),))
+            self.assertEqual(dense[index.index(v0)], 2.5)
+            self.assertEqual(index.from_dense(dense + index.to_dense(q)), p + q)
+
+            # Sparse vectors.
+            ranks, coefs = index.to_sparse(p)
+            self.assertTrue(np.all(np.diff(ranks) > 0))
+            self.assertEqual(index.from_sparse(ranks, coefs), p)
+            self.assertEqual(index.to_sparse(Polynomial({}))[0].shape, (0,))
+
+            # Coefficients given by a vector expression.
+            c = cp.Variable(2)
+            pc = Polynomial.from_basis([v0, v1], c)
+            c.value = np.array([2.5, - 1])
+            np.testing.assert_array_almost_equal(index.to_dense(pc).value, dense)
+            np.testing.assert_array_almost_equal(index.to_sparse(pc)[1].value, coefs)
+
+            # Errors.
+            with self.assertRaises(ValueError):
+                index.to_dense(Polynomial({Vector({self.x[0]: 4}): 1}))
+            with self.assertRaises(ValueError):
+                index.from_dense(np.ones(3))
+            Other = [V for V in Vectors if V is not Vector][0]
+            with self.assertRaises(TypeError):
+                index.to_dense(Polynomial({Other({self.x[0]: 1}): 1}))
@@ -1,4 +1,5 @@
 import unittest
+import gc
 
 from sos4hjb.polynomials import (Variable, BasisVector, MonomialVector,
                                  ChebyshevVector, Polynomial)
@@ -51,34 +52,33 @@ class TestBasisVector(unittest.TestCase):
         with self.assertRaises(TypeError):
             v['a']
 
-        # Setter.
-        v[x] = 12
-        v[z] = 6
-        self.assertEqual(v[x], 12)
-        self.assertEqual(v[y], 2)
-        self.assertEqual(v[z], 6)
-        self.assertEqual(len(v), 3)
+        # Immutable, setting returns a new vector.
+        with self.assertRaises(TypeError):
+            v[x] = 12
+        w = v.replace(x, 12).replace(z, 6)
+        self.assertEqual(v[x], 5)
+        self.assertEqual(w[x], 12)
+        self.assertEqual(w[y], 2)
+        self.assertEqual(w[z], 6)
+        self.assertEqual(len(w), 3)
 
         # Delete instead of setting to zero.
-        v[z] = 0
-        self.assertEqual(v[z], 0)
-        self.assertEqual(len(v), 2)
-
-        # Do not set if zero.
-        v[z] = 0
-        self.assertEqual(v[z], 0)
+        w = w.replace(z, 0)
+        self.assertEqual(w[z], 0)
+        self.assertEqual(len(w), 2)
+        self.assertIs(w.replace(z, 0), w)
 
         # Non-variable variable.
         with self.assertRaises(TypeError):
-            v['z'] = 5
+            v.replace('z', 5)
         with self.assertRaises(TypeError):
-            v[4] = 5
+            v.replace(4, 5)
 
         # Non-integer power.
         with self.assertRaises(ValueError):
-            v[z] = 1.5
+            v.replace(z, 1.5)
         with self.assertRaises(ValueError):
-            v[z] = - 2
+            v.replace(z, - 2)
 
     def test_eq_ne(self):
 
@@ -94,6 +94,27 @@ class TestBasisVector(unittest.TestCase):
         self.assertTrue(v2 != v3)
         self.assertTrue(v3 == v4)
 
+        # Interned: equal vectors are the same object.
+        self.assertIs(v1, v2)
+        self.assertIs(v3, v4)
+        self.assertIsNot(MonomialVector({x: 5}), ChebyshevVector({x: 5}))
+        self.assertFalse(MonomialVector({x: 5}) == ChebyshevVector({x: 5}))
+        with self.assertRaises(AttributeError):
+            v1._hash = 0
+        with self.assertRaises(TypeError):
+            v1.power_dict[x] = 2
+
+        # Vectors that are no longer referenced are freed, together with
+        # their variables.
+        for Vector in Vectors:
+            w = Variable.multivariate('w_interned', 4)
+            basis = Vector.construct_basis(w, 10)
+            size = len(Vector._table)
+            del w, basis
+            gc.collect()
+            self.assertLess(len(Vector._table), size - 1000)
+            self.assertFalse(any(key[1] == 'w_interned' for key in Variable._table.keys()))
+
     def test_len(self):
 
         v = BasisVector({})
@@ -127,7 +148,7 @@ class TestBasisVector(unittest.TestCase):
         self.assertFalse(v.is_even())
 
         # Even.
-        v[y] = 3
+        v = v.replace(y, 3)
         self.assertEqual(v.degree(), 8)
         self.assertTrue(v.is_even())
         self.assertFalse(v.is_odd())
@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+from itertools import product
+
+from sos4hjb.polynomials.enumeration import (binomials, count_of_degree,
+                                             basis_size, rank_powers,
+                                             unrank_powers, graded_powers)
+
+class TestEnumeration(unittest.TestCase):
+
+    def test_binomials(self):
+
+        table = binomials(6)
+        self.assertEqual(table[6, 3], 20)
+        self.assertEqual(table[4, 0], 1)
+        self.assertEqual(table[2, 5], 0)
+        self.assertFalse(table.flags.writeable)
+
+    def test_basis_size(self):
+
+        self.assertEqual(count_of_degree(3, 2), 6)
+        self.assertEqual(count_of_degree(0, 0), 1)
+        self.assertEqual(count_of_degree(0, 2), 0)
+        self.assertEqual(basis_size(3, 3), 20)
+        self.assertEqual(basis_size(3, 3, odd=False), 7)
+        self.assertEqual(basis_size(3, 3, even=False), 13)
+
+    def test_graded_powers(self):
+
+        # Brute-force enumeration, sorted by degree and lexicographically.
+        for n, degree in ((1, 5), (2, 4), (3, 3), (4, 2)):
+            rows = [r for r in product(range(degree + 1), repeat=n) if sum(r) <= degree]
+            rows.sort(key=lambda r: (sum(r), r))
+            for even, odd in ((True, True), (True, False), (False, True)):
+                expected = [r for r in rows if (even and sum(r) % 2 == 0) or (odd and sum(r) % 2)]
+                powers = np.vstack(list(graded_powers(n, degree, even, odd, block=3)))
+                self.assertEqual([tuple(r) for r in powers.tolist()], expected)
+
+                # Rank and unrank are inverse of each other.
+                ranks = rank_powers(powers, degree, even, odd)
+                np.testing.assert_array_equal(ranks, np.arange(len(expected)))
+                np.testing.assert_array_equal(unrank_powers(ranks, n, degree, even, odd), powers)
+
+    def test_rank_unrank_errors(self):
+
+        with self.assertRaises(ValueError):
+            rank_powers([[2, 2]], 3)
+        with self.assertRaises(ValueError):
+            rank_powers([[1, 0]], 3, odd=False)
+        with self.assertRaises(ValueError):
+            rank_powers([[- 1, 2]], 3)
+        with self.assertRaises(ValueError):
+            unrank_powers([10], 2, 3)
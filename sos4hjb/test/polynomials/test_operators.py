@@ -0,0 +1,111 @@
+import unittest
+import numpy as np
+
+from sos4hjb.polynomials import (Variable, MonomialVector, ChebyshevVector,
+                                 Polynomial)
+from sos4hjb.polynomials.operators import (derivative_map, integral_map,
+                                           basis_change_map, moment_vector,
+                                           gram_map)
+
+Vectors = (MonomialVector, ChebyshevVector)
+
+class TestOperators(unittest.TestCase):
+
+    x = Variable.multivariate('x', 2)
+    y = Variable('y')
+
+    def test_derivative_integral_map(self):
+
+        for Vector in Vectors:
+
+            # Maps agree with the methods of the polynomial.
+            basis = Vector.construct_basis(self.x, 4)
+            coefs = np.arange(1, len(basis) + 1) / 3
+            p = Polynomial(dict(zip(basis, coefs)))
+            for v in self.x + [self.y]:
+                D = derivative_map(basis, v)
+                self.assertEqual(D.matrix.shape[1], len(basis))
+                self.assertAlmostEqual(D(coefs), p.derivative(v))
+                I = integral_map(basis, v)
+                self.assertAlmostEqual(I(coefs), p.integral(v))
+
+            # Image of each basis vector.
+            D = derivative_map(basis, self.x[0])
+            output_basis = D.output_basis()
+            for i, v in enumerate(basis):
+                image = Polynomial(dict(zip(output_basis, D.matrix[:, i].toarray().flatten())))
+                self.assertEqual(image, v.derivative(self.x[0]))
+
+            # Maps are cached.
+            self.assertTrue(derivative_map(basis, self.x[0]) is D)
+
+    def test_basis_change_map(self):
+
+        basis = MonomialVector.construct_basis(self.x, 5)
+        coefs = np.arange(1, len(basis) + 1) / 7
+        p = Polynomial(dict(zip(basis, coefs)))
+        M2T = basis_change_map(basis, ChebyshevVector)
+        p_cheb = M2T(coefs)
+        self.assertAlmostEqual(p_cheb, p.in_chebyshev_basis())
+        T2M = basis_change_map(M2T.output_basis(), MonomialVector)
+        p_mon = T2M(M2T.matrix @ coefs)
+        self.assertAlmostEqual(p_mon, p)
+
+        # Change to the same basis is the identity.
+        M2M = basis_change_map(basis, MonomialVector)
+        self.assertEqual(M2M(coefs), p)
+
+    def test_gram_map(self):
+
+        for Vector in Vectors:
+
+            # Map agrees with the pairwise products of the basis.
+            basis = Vector.construct_basis(self.x, 2)
+            m = len(basis)
+            Q = np.arange(m ** 2).reshape(m, m) / 7
+            Q = Q + Q.T
+            G = gram_map(basis)
+            rows, columns = np.triu_indices(m)
+            self.assertEqual(G.matrix.shape[1], m * (m + 1) // 2)
+            p = sum((bi * bj) * Q[i, j] for i, bi in enumerate(basis) for j, bj in enumerate(basis))
+            self.assertAlmostEqual(G(Q[rows, columns]), p)
+
+            # Map is cached.
+            self.assertTrue(gram_map(list(basis)) is G)
+
+    def test_moment_vector(self):
+
+        for Vector in Vectors:
+
+            # Inner product with coefficients gives the definite integral.
+            basis = Vector.construct_basis(self.x, 6)
+            coefs = np.cos(np.arange(len(basis)))
+            p = Polynomial(dict(zip(basis, coefs)))
+            lbs = [- 1.5, .3]
+            ubs = [2, 1.2]
+            moments = moment_vector(basis, self.x, lbs, ubs)
+            integral = p.definite_integral(self.x, lbs, ubs).to_scalar()
+            self.assertAlmostEqual(moments @ coefs, integral)
+
+            # Check against iterated indefinite integration.
+            for v, m in zip(basis, moments):
+                q = Polynomial({v: 1})
+                for xi, lb, ub in zip(self.x, lbs, ubs):
+                    q = q.integral(xi)
+                    q = q.substitute({xi: ub}) - q.substitute({xi: lb})
+                self.assertAlmostEqual(q.to_scalar(), m)
+
+            # Integration over a variable the basis does not depend on.
+            moments_y = moment_vector(basis, self.x + [self.y], lbs + [0], ubs + [3])
+            np.testing.assert_allclose(moments_y, moments * 3)
+
+            # Moments are cached and read-only.
+            self.assertTrue(moment_vector(basis, self.x, lbs, ubs) is moments)
+            with self.assertRaises(ValueError):
+                moments[0] = 1
+
+            # Missing variables and wrong lengths.
+            with self.assertRaises(ValueError):
+                moment_vector(basis, self.x[:1], lbs[:1], ubs[:1])
+            with self.assertRaises(ValueError):
+                moment_vector(basis, self.x, lbs[:1], ubs)
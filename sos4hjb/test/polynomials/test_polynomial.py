@@ -1,4 +1,5 @@
 import unittest
+import pickle
 import numpy as np
 
 from sos4hjb.polynomials import (Variable, BasisVector, MonomialVector,
@@ -45,6 +46,48 @@ class TestPolynomial(unittest.TestCase):
         with self.assertRaises(TypeError):
             Polynomial({m: 2, c: 3.22})
 
+    def test_from_arrays_to_arrays(self):
+
+        for Vector in Vectors:
+
+            # Round trip.
+            x = Variable('x')
+            y = Variable('y')
+            z = Variable('z')
+            v0 = Vector({x: 4, y: 1})
+            v1 = Vector({x: 5, z: 2})
+            p = Polynomial({v0: 2, v1: 3.22})
+            powers, coefs = p.to_arrays([z, y, x])
+            np.testing.assert_array_equal(powers, [[0, 1, 4], [2, 0, 5]])
+            np.testing.assert_array_equal(coefs, [2, 3.22])
+            q = Polynomial.from_arrays(Vector, [z, y, x], powers, coefs)
+            self.assertEqual(p, q)
+
+            # Repeated rows are summed, zeros and unused variables removed.
+            powers = [[1, 0, 0], [1, 0, 0], [0, 2, 0]]
+            q = Polynomial.from_arrays(Vector, [x, y, z], powers, [1, 2.5, 0])
+            self.assertEqual(q, Polynomial({Vector({x: 1}): 3.5}))
+            self.assertEqual(q.variables(), [x])
+
+            # Wrong sizes or powers.
+            with self.assertRaises(ValueError):
+                Polynomial.from_arrays(Vector, [x, y, z], powers, [1, 2])
+            with self.assertRaises(ValueError):
+                Polynomial.from_arrays(Vector, [x], [[- 1]], [1])
+            with self.assertRaises(ValueError):
+                p.to_arrays([x, y])
+
+    def test_pickle(self):
+
+        for Vector in Vectors:
+
+            # Pickling goes through the compact array form.
+            x = Variable('x')
+            y = Variable('y')
+            p = Polynomial({Vector({x: 4, y: 1}): 2, Vector({x: 5}): 3.22, Vector({}): - 1})
+            self.assertEqual(pickle.loads(pickle.dumps(p)), p)
+            self.assertEqual(pickle.loads(pickle.dumps(Polynomial({}))), Polynomial({}))
+
     def test_getter_setter(self):
 
         for Vector in Vectors:
@@ -78,6 +121,17 @@ class TestPolynomial(unittest.TestCase):
             p[v2] = 0
             self.assertEqual(p[v2], 0)
 
+            # Numeric coefficients stay numeric, also when set in an empty
+            # polynomial, and symbolic ones are stored as objects.
+            self.assertEqual(p._coefs.dtype, float)
+            q = Polynomial({})
+            q[v0] = 3
+            self.assertEqual(q._coefs.dtype, float)
+            self.assertEqual(Vector({x: 5}).derivative(x)._coefs.dtype, float)
+            self.assertEqual(Vector({x: 5}).integral(x)._coefs.dtype, float)
+            q[v1] = Polynomial({Vector({y: 1}): 1})
+            self.assertEqual(q._coefs.dtype, object)
+
             # Non-vector in the vectors.
             with self.assertRaises(TypeError):
                 p[2] = 5
@@ -106,6 +160,136 @@ class TestPolynomial(unittest.TestCase):
             value = v0(eval_dict) * 3.5 + v1(eval_dict) * .5
             self.assertAlmostEqual(p(eval_dict), value)
 
+    def test_evaluate(self):
+
+        for Vector in Vectors:
+
+            # Batch evaluation matches pointwise evaluation.
+            x = Variable('x')
+            y = Variable('y')
+            z = Variable('z')
+            v0 = Vector({x: 1, y: 2})
+            v1 = Vector({x: 3, z: 5})
+            v2 = Vector({})
+            p = Polynomial({v0: 3.5, v1: .5, v2: - 1})
+            points = np.random.default_rng(0).uniform(- 2, 2, (50, 4))
+            variables = [z, Variable('w'), x, y]
+            values = p.evaluate(points, variables)
+            self.assertEqual(values.shape, (50,))
+            for point, value in zip(points, values):
+                self.assertAlmostEqual(p(dict(zip(variables, point))), value)
+
+            # Evaluation in chunks.
+            values_chunks = p.evaluate(points, variables, chunk_size=10)
+            np.testing.assert_allclose(values, values_chunks)
+
+            # Zero polynomial.
+            values = Polynomial({}).evaluate(points, variables)
+            np.testing.assert_array_equal(values, np.zeros(50))
+
+            # Wrong shapes or missing variables.
+            with self.assertRaises(ValueError):
+                p.evaluate(points[:, :3], variables)
+            with self.assertRaises(ValueError):
+                p.evaluate(points[0], variables)
+            with self.assertRaises(ValueError):
+                p.evaluate(points[:, :3], variables[:3])
+
+    def test_evaluate_derivatives(self):
+
+        for Vector in Vectors:
+
+            # Match the evaluation of the derivatives one by one.
+            x = Variable('x')
+            y = Variable('y')
+            z = Variable('z')
+            p = Polynomial({Vector({x: 1, y: 2}): 3.5, Vector({x: 3, z: 5}): .5, Vector({}): - 1})
+            points = np.random.default_rng(0).uniform(- 2, 2, (30, 4))
+            variables = [z, Variable('w'), x, y]
+            values, gradients, hessians = p.evaluate_derivatives(points, variables, chunk_size=50)
+            self.assertEqual(gradients.shape, (30, 4))
+            self.assertEqual(hessians.shape, (30, 4, 4))
+            np.testing.assert_allclose(values, p.evaluate(points, variables))
+            for i, u in enumerate(variables):
+                pu = p.derivative(u)
+                np.testing.assert_allclose(gradients[:, i], pu.evaluate(points, variables))
+                for j, v in enumerate(variables):
+                    puv = pu.derivative(v).evaluate(points, variables)
+                    np.testing.assert_allclose(hessians[:, i, j], puv, atol=1e-12)
+
+            # Without Hessian.
+            results = p.evaluate_derivatives(points, variables, hessian=False)
+            self.assertEqual(len(results), 2)
+            np.testing.assert_allclose(results[1], gradients)
+
+            # Zero polynomial and non-numeric coefficients.
+            values, gradients, hessians = Polynomial({}).evaluate_derivatives(points, variables)
+            np.testing.assert_array_equal(hessians, np.zeros((30, 4, 4)))
+            with self.assertRaises(TypeError):
+                Polynomial({Vector({x: 1}): 'a'}).evaluate_derivatives(points, variables)
+
+    def test_evaluate_grid(self):
+
+        for Vector in Vectors:
+
+            # Grid evaluation matches batch evaluation.
+            x = Variable('x')
+            y = Variable('y')
+            z = Variable('z')
+            p = Polynomial({Vector({x: 1, y: 2}): 3.5, Vector({x: 3, z: 5}): .5, Vector({}): - 1})
+            axes = [np.linspace(- 1, 1, 4), np.linspace(0, 2, 3), np.linspace(- 2, 1, 5)]
+            variables = [y, z, x]
+            values = p.evaluate_grid(axes, variables)
+            self.assertEqual(values.shape, (4, 3, 5))
+            grids = np.meshgrid(*axes, indexing='ij')
+            points = np.column_stack([g.ravel() for g in grids])
+            np.testing.assert_allclose(values.ravel(), p.evaluate(points, variables))
+
+            # Zero polynomial and errors.
+            np.testing.assert_array_equal(Polynomial({}).evaluate_grid(axes, variables), np.zeros((4, 3, 5)))
+            with self.assertRaises(ValueError):
+                p.evaluate_grid(axes[:2], variables)
+            with self.assertRaises(ValueError):
+                p.evaluate_grid(axes[:2], variables[:2])
+
+    def test_compile(self):
+
+        for Vector in Vectors:
+
+            # Value and gradient match pointwise evaluation.
+            x = Variable('x')
+            y = Variable('y')
+            z = Variable('z')
+            basis = Vector.construct_basis([x, y, z], 5)
+            coefs = np.random.default_rng(0).uniform(- 1, 1, len(basis))
+            p = Polynomial.from_basis(basis, coefs)
+            variables = [z, x, y]
+            point = np.array([.3, - .8, .5])
+            eval_dict = dict(zip(variables, point))
+            value, gradient = p.compile(variables, gradient=True)(point)
+            self.assertAlmostEqual(value, p(eval_dict))
+            self.assertEqual(gradient.shape, (3,))
+            for v, g in zip(variables, gradient):
+                self.assertAlmostEqual(g, p.derivative(v)(eval_dict))
+            self.assertAlmostEqual(p.compile(variables)(list(point)), p(eval_dict))
+
+            # Elementwise evaluation of arrays.
+            points = np.random.default_rng(1).uniform(- 1, 1, (20, 3))
+            values = p.compile(variables)(points.T)
+            np.testing.assert_allclose(values, p.evaluate(points, variables))
+
+            # Constant and zero polynomials.
+            value, gradient = Polynomial({Vector({}): 2}).compile([x], gradient=True)([.5])
+            self.assertEqual(value, 2)
+            np.testing.assert_array_equal(gradient, [0])
+            self.assertEqual(Polynomial({}).compile([x])([.5]), 0)
+
+            # Missing variables and non-numeric coefficients.
+            with self.assertRaises(ValueError):
+                p.compile([x, y])
+            with self.assertRaises(TypeError):
+                Polynomial({Vector({x: 1}): 'a'}).compile()
+
     def test_substitute(self):
 
         for Vector in Vectors:
@@ -232,6 +416,7 @@ class TestPolynomial(unittest.TestCase):
             p1 = Polynomial({v1: 2, v0: 3.33})
             p01 = Polynomial({v0: -3.33, v1: .5, v2: 3})
             self.assertEqual(p0 - p1, p01)
+            self.assertEqual(Polynomial({}) - p1, - p1)
             with self.assertRaises(TypeError):
                 p0 - 2
             with self.assertRaises(TypeError):
@@ -301,6 +486,32 @@ class TestPolynomial(unittest.TestCase):
             self.assertEqual(p0q, 0)
             self.assertTrue(isinstance(p0q, Polynomial))
 
+    def test_mul_kernel(self):
+
+        for Vector in Vectors:
+
+            # Compare with the sum of the products of the single terms.
+            x = Variable.multivariate('x', 3)
+            rng = np.random.default_rng(0)
+            basis = Vector.construct_basis(x, 3)
+            p0 = Polynomial(dict(zip(basis, rng.normal(size=len(basis)))))
+            p1 = Polynomial(dict(zip(basis[:8], rng.normal(size=8))))
+            p01 = sum([(v0 * v1) * (c0 * c1) for v0, c0 in p0 for v1, c1 in p1])
+            self.assertAlmostEqual(p0 * p1, p01)
+
+            # Symbolic times numeric coefficients (polynomials in y are used as
+            # symbolic coefficients).
+            y = Polynomial({Vector({Variable('y'): 1}): 1})
+            p0_sym = Polynomial({v: y * c for v, c in p0})
+            p01_sym = p0_sym * p1
+            self.assertEqual(len(p01_sym), len(p01))
+            for v, c in p01_sym:
+                self.assertAlmostEqual(c, y * p01[v])
+
+            # Constant polynomials, whose terms have no variables.
+            c = Polynomial({Vector({}): 2})
+            self.assertEqual(c * c, Polynomial({Vector({}): 4}))
+
     def test_pow(self):
 
         for Vector in Vectors:
@@ -424,13 +635,13 @@ class TestPolynomial(unittest.TestCase):
             lbs = [-3, -2, 2.12]
             ubs = [-1, 4, 5]
             px = px.substitute({x: -1}) - px.substitute({x: -3})
-            self.assertEqual(p.definite_integral([x], lbs[:1], ubs[:1]), px)
+            self.assertAlmostEqual(p.definite_integral([x], lbs[:1], ubs[:1]), px)
             pxy = px.integral(y)
             pxy = pxy.substitute({y: 4}) - pxy.substitute({y: -2})
-            self.assertEqual(p.definite_integral([x, y], lbs[:2], ubs[:2]), pxy)
+            self.assertAlmostEqual(p.definite_integral([x, y], lbs[:2], ubs[:2]), pxy)
             pxyz = pxy.integral(z)
             pxyz = pxyz.substitute({z: 5}) - pxyz.substitute({z: 2.12})
-            self.assertEqual(p.definite_integral([x, y, z], lbs, ubs), pxyz)
+            self.assertAlmostEqual(p.definite_integral([x, y, z], lbs, ubs), pxyz)
 
             # Definite wrong lengths.
             with self.assertRaises(ValueError):
@@ -483,12 +694,14 @@ class TestPolynomial(unittest.TestCase):
             self.assertFalse(p.is_odd())
 
             # Not even nor odd.
-            v0[y] += 1
+            v0 = v0.replace(y, v0[y] + 1)
+            p = Polynomial({v0: 2.5, v1: 3})
             self.assertFalse(p.is_odd())
             self.assertFalse(p.is_even())
 
             # Odd.
-            v1[y] += 1
+            v1 = v1.replace(y, v1[y] + 1)
+            p = Polynomial({v0: 2.5, v1: 3})
             self.assertTrue(p.is_odd())
             self.assertFalse(p.is_even())
 
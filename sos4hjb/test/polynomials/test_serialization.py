@@ -0,0 +1,67 @@
+import unittest
+import os
+import pickle
+import tempfile
+import numpy as np
+
+from sos4hjb.polynomials import (Variable, MonomialVector, ChebyshevVector,
+                                 Polynomial)
+from sos4hjb.polynomials.serialization import (save_polynomials,
+                                               load_polynomials)
+
+Vectors = (MonomialVector, ChebyshevVector)
+
+class TestSerialization(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'library.sos')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_save_load(self):
+
+        # Polynomials with different variables, bases, and sizes.
+        x = Variable.multivariate('x', 3)
+        y = Variable('y')
+        rng = np.random.default_rng(0)
+        polynomials = {}
+        for Vector in Vectors:
+            for variables in (x, x[1:], [y, x[0]]):
+                basis = Vector.construct_basis(variables, 4)
+                name = f'{Vector.__name__}{len(variables)}{variables[0]}'
+                polynomials[name] = Polynomial.from_basis(basis, rng.normal(size=len(basis)))
+        polynomials['large'] = Polynomial({MonomialVector({y: 300}): 1})
+        polynomials['zero'] = Polynomial({})
+        metadata = {'minimum': - 1.5, 'degree': 4}
+        save_polynomials(self.path, polynomials, metadata)
+
+        for mmap in (True, False):
+            library = load_polynomials(self.path, mmap)
+            self.assertEqual(list(library), list(polynomials))
+            self.assertEqual(len(library), len(polynomials))
+            self.assertEqual(library.metadata, metadata)
+            for name, p in polynomials.items():
+                self.assertEqual(library[name], p)
+                self.assertEqual(library[name].vector_type, p.vector_type)
+
+        # Loaded polynomials behave as the original ones, and the library is
+        # reopened when unpickled.
+        library = load_polynomials(self.path)
+        p = polynomials['MonomialVector3x_{1}']
+        q = library['MonomialVector3x_{1}']
+        self.assertEqual(q * q - p * p, Polynomial({}))
+        self.assertEqual(pickle.loads(pickle.dumps(library))['large'], polynomials['large'])
+
+    def test_errors(self):
+
+        x = Variable('x')
+        with self.assertRaises(TypeError):
+            save_polynomials(self.path, {1: Polynomial({MonomialVector({x: 1}): 1})})
+        with self.assertRaises(TypeError):
+            save_polynomials(self.path, {'p': Polynomial({MonomialVector({x: 1}): 'a'})})
+        with open(self.path, 'wb') as f:
+            f.write(b'not a polynomial file')
+        with self.assertRaises(ValueError):
+            load_polynomials(self.path)
@@ -44,6 +44,14 @@ class TestVariable(unittest.TestCase):
         self.assertFalse(x1 == x2)
         self.assertTrue(x1 != x2)
 
+        # Interned and immutable.
+        self.assertIs(Variable('x', 1), x1)
+        self.assertIsNot(x1, x2)
+        with self.assertRaises(AttributeError):
+            x1.index = 2
+        with self.assertRaises(AttributeError):
+            x1.value = 2
+
     def test_repr(self):
 
         # Variable without index.
@@ -0,0 +1,76 @@
+import unittest
+
+from sos4hjb.polynomials import Variable, MonomialVector, ChebyshevVector
+from sos4hjb.optimization.cvx import SosProgram
+from sos4hjb.hjb import box_constraints, hjb_bases, value_function_lower_bound
+
+Vectors = (MonomialVector, ChebyshevVector)
+x = Variable('x')
+u = Variable('u')
+
+class TestHjb(unittest.TestCase):
+
+    def test_box_constraints(self):
+        for Vector in Vectors:
+            X = box_constraints([x, u], [- 1, 0], [1, 2], Vector)
+            self.assertEqual(len(X), 2)
+            self.assertAlmostEqual(X[0]({x: .5}), .75)
+            self.assertAlmostEqual(X[1]({u: 3}), - 3)
+            self.assertEqual(X[0].vector_type, Vector)
+            self.assertRaises(ValueError, box_constraints, [x], [- 1, 0], [1, 2], Vector)
+
+    def test_hjb_bases(self):
+        for Vector in Vectors:
+            value_basis, multiplier_basis = hjb_bases(Vector, (x,), (u,), 4)
+            self.assertEqual(list(value_basis), Vector.construct_basis([x], 4))
+            self.assertEqual(list(multiplier_basis), Vector.construct_basis([x, u], 2))
+            self.assertIs(hjb_bases(Vector, (x,), (u,), 4)[0], value_basis)
+            value_basis = hjb_bases(Vector, (x,), (u,), 4, odd=False)[0]
+            self.assertEqual(list(value_basis), Vector.construct_basis([x], 4, odd=False))
+
+    def test_value_function_lower_bound(self):
+
+        # Integrator with quadratic cost: the input limits are not active
+        # for |x| <= .5, and the value function is x^2.
+        for Vector in Vectors:
+            make = Vector.make_polynomial
+            f = [make(u)]
+            l = make(x) ** 2 + make(u) ** 2
+            X = box_constraints([x], [- .5], [.5], Vector)
+            U = box_constraints([u], [- 1], [1], Vector)
+            for degree in (2, 4):
+                J, obj = value_function_lower_bound(SosProgram, [x], [u], f, l, X, U, degree, [- .5], [.5])
+                self.assertAlmostEqual(obj, 1 / 12, places=4)
+                for xi in (- .5, .2, .4):
+                    self.assertAlmostEqual(J({x: xi}), xi ** 2, places=3)
+            self.assertRaises(ValueError, value_function_lower_bound, SosProgram, [x], [u], f * 2, l, X, U, 2, [- .5], [.5])
+
+    def test_asymmetric_dynamics(self):
+
+        # Dynamics that are not symmetric with respect to the origin: the
+        # defaults match the program written term by term with full bases,
+        # while even bases give a lower bound.
+        for Vector in Vectors:
+            make = Vector.make_polynomial
+            f = [make(x) ** 2 * .5 + make(u)]
+            l = make(x) ** 2 + make(u) ** 2
+            X = box_constraints([x], [- 1], [1], Vector)
+            U = box_constraints([u], [- .5], [.5], Vector)
+            degree = 4
+
+            prog = SosProgram()
+            J = prog.add_polynomial(Vector.construct_basis([x], degree))[0]
+            prog.add_linear_cost(- J.definite_integral([x], [- 1], [1]).to_scalar())
+            basis = Vector.construct_basis([x, u], degree // 2)
+            lamx = prog.add_sos_polynomial(basis)[0]
+            lamu = prog.add_sos_polynomial(basis)[0]
+            prog.add_sos_constraint(J.derivative(x) * f[0] + l - lamx * X[0] - lamu * U[0])
+            prog.add_linear_constraint(J({x: 0}) <= 0)
+            prog.solve()
+            reference = - prog.minimum()
+
+            obj = value_function_lower_bound(SosProgram, [x], [u], f, l, X, U, degree, [- 1], [1])[1]
+            self.assertAlmostEqual(obj, reference, places=3)
+            obj_even = value_function_lower_bound(SosProgram, [x], [u], f, l, X, U, degree, [- 1], [1],
+                odd=False, even_multipliers=True)[1]
+            self.assertLess(obj_even, reference - .1)
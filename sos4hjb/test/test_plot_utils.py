@@ -0,0 +1,53 @@
+import unittest
+import warnings
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from sos4hjb.polynomials import Variable, MonomialVector, ChebyshevVector, Polynomial
+from sos4hjb.plot_utils import level_plot
+
+Vectors = (MonomialVector, ChebyshevVector)
+
+class TestPlotUtils(unittest.TestCase):
+
+    def tearDown(self):
+        plt.close('all')
+
+    def plotted_values(self, y, **kwargs):
+        plt.figure()
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            level_plot(y, np.array([- 1, - 2]), np.array([1, 2]), resolution=5, **kwargs)
+        return np.asarray(plt.gca().images[0].get_array())
+
+    def test_level_plot(self):
+
+        x = Variable.multivariate('x', 3)
+        x1 = np.linspace(- 1, 1, 5)
+        x2 = np.linspace(- 2, 2, 5)
+        for Vector in Vectors:
+
+            # Rows of the image are associated with the vertical axis.
+            y = Polynomial({Vector({x[1]: 1}): 1, Vector({x[2]: 2}): 3})
+            Y = self.plotted_values(y)
+            np.testing.assert_allclose(Y, y.evaluate_grid([x2, x1], [x[2], x[1]]))
+
+            # Section that depends on a single variable.
+            p = y * Polynomial({Vector({x[0]: 1}): 1}) + Polynomial({Vector({x[2]: 1}): 1})
+            section = p.substitute({x[0]: 0})
+            self.assertEqual(section.variables(), [x[2]])
+            Y = self.plotted_values(section)
+            expected = section.evaluate(x1.reshape(-1, 1), [x[2]])
+            np.testing.assert_allclose(Y, np.tile(expected, (5, 1)))
+            Y = self.plotted_values(section, variables=[x[1], x[2]])
+            np.testing.assert_allclose(Y, np.tile(section.evaluate(x2.reshape(-1, 1), [x[2]]), (5, 1)).T)
+
+            # Constant polynomial.
+            Y = self.plotted_values(Polynomial({Vector({}): 2.5}))
+            np.testing.assert_allclose(Y, 2.5 * np.ones((5, 5)))
+
+            # Too many variables.
+            with self.assertRaises(ValueError):
+                self.plotted_values(p)